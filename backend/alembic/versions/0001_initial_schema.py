@@ -0,0 +1,94 @@
+"""Initial schema: documents, document versions and golden answers.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+department = sa.Enum("D2COM", "B2B", "S2B2C", "MARCOM", name="department")
+document_status = sa.Enum(
+    "DRAFT", "PENDING_APPROVAL", "APPROVED", "PUBLISHED", "ARCHIVED", name="documentstatus"
+)
+classification = sa.Enum("PUBLIC", "INTERNAL", "CONFIDENTIAL", name="classification")
+trust_label = sa.Enum("ASSUMPTION", "VERIFIED", "POLICY", "DEPRECATED", name="trustlabel")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "documents",
+        sa.Column("id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column("title", sa.String(500), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("department", department, nullable=False),
+        sa.Column("status", document_status, nullable=False),
+        sa.Column("classification", classification, nullable=False),
+        sa.Column("owner_email", sa.String(255), nullable=False),
+        sa.Column("drive_file_id", sa.String(100), nullable=True),
+        sa.Column("drive_folder_path", sa.String(500), nullable=True),
+        sa.Column("notebooklm_source_id", sa.String(100), nullable=True),
+        sa.Column("file_type", sa.String(20), nullable=True),
+        sa.Column("file_size_bytes", sa.Integer(), nullable=True),
+        sa.Column("review_date", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "document_versions",
+        sa.Column("id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column(
+            "document_id",
+            postgresql.UUID(as_uuid=False),
+            sa.ForeignKey("documents.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("version_number", sa.Integer(), nullable=False),
+        sa.Column("changelog", sa.Text(), nullable=True),
+        sa.Column("archive_path", sa.String(500), nullable=True),
+        sa.Column("published_path", sa.String(500), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "golden_answers",
+        sa.Column("id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column("question", sa.Text(), nullable=False),
+        sa.Column("answer", sa.Text(), nullable=False),
+        sa.Column("department", department, nullable=False),
+        sa.Column("trust_label", trust_label, nullable=False),
+        sa.Column(
+            "source_document_ids",
+            postgresql.ARRAY(sa.String()).with_variant(sa.JSON(), "sqlite"),
+            nullable=False,
+        ),
+        sa.Column("citations", sa.Text(), nullable=True),
+        sa.Column("verified_by", sa.String(255), nullable=True),
+        sa.Column("verified_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("next_review_date", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("usage_count", sa.Integer(), nullable=False),
+        sa.Column("helpful_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("golden_answers")
+    op.drop_table("document_versions")
+    op.drop_table("documents")
+    bind = op.get_bind()
+    for enum_type in (trust_label, classification, document_status, department):
+        enum_type.drop(bind, checkfirst=True)
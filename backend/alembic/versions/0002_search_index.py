@@ -0,0 +1,116 @@
+"""Full-text search index over documents and golden answers.
+
+PostgreSQL: accent-insensitive ``search_vector`` generated columns with GIN
+indexes, plus trigram indexes on titles/questions for fuzzy matching. The
+generated columns are recomputed by PostgreSQL on every row write, so the
+index is maintained incrementally.
+
+SQLite: an FTS5 table kept in sync by triggers, used by local development
+and tests.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, entity label, weight-A column, weight-B column)
+SEARCHABLE = [
+    ("documents", "document", "title", "description"),
+    ("golden_answers", "golden_answer", "question", "answer"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        _upgrade_postgresql()
+    else:
+        _upgrade_sqlite()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        for table, _, _, _ in SEARCHABLE:
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_trgm")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+        op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
+    else:
+        for table, _, _, _ in SEARCHABLE:
+            for suffix in ("ai", "au", "ad"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_search_{suffix}")
+        op.execute("DROP TABLE IF EXISTS search_fts")
+
+
+def _upgrade_postgresql() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # unaccent() is only STABLE; generated columns and index expressions
+    # need an IMMUTABLE wrapper with the dictionary pinned.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+        """
+    )
+    for table, _, primary, secondary in SEARCHABLE:
+        op.execute(
+            f"""
+            ALTER TABLE {table} ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', f_unaccent(coalesce({primary}, ''))), 'A') ||
+                setweight(to_tsvector('simple', f_unaccent(coalesce({secondary}, ''))), 'B')
+            ) STORED
+            """
+        )
+        op.execute(
+            f"CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)"
+        )
+        op.execute(
+            f"CREATE INDEX ix_{table}_trgm ON {table} "
+            f"USING gin (f_unaccent(lower({primary})) gin_trgm_ops)"
+        )
+
+
+def _fold(expr: str) -> str:
+    # FTS5's remove_diacritics handles every Vietnamese mark except đ/Đ.
+    return f"replace(replace(coalesce({expr}, ''), 'đ', 'd'), 'Đ', 'D')"
+
+
+def _upgrade_sqlite() -> None:
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE search_fts USING fts5(
+            entity UNINDEXED, ref_id UNINDEXED, title, body,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    for table, entity, primary, secondary in SEARCHABLE:
+        insert_row = (
+            f"INSERT INTO search_fts (entity, ref_id, title, body) VALUES "
+            f"('{entity}', new.id, {_fold('new.' + primary)}, {_fold('new.' + secondary)});"
+        )
+        delete_row = f"DELETE FROM search_fts WHERE entity = '{entity}' AND ref_id = old.id;"
+        op.execute(
+            f"CREATE TRIGGER {table}_search_ai AFTER INSERT ON {table} BEGIN {insert_row} END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_search_au AFTER UPDATE OF {primary}, {secondary} "
+            f"ON {table} BEGIN {delete_row} {insert_row} END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_search_ad AFTER DELETE ON {table} BEGIN {delete_row} END"
+        )
@@ -0,0 +1,36 @@
+"""Daily dashboard metrics snapshots.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "daily_metrics",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("total_documents", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("active_documents", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("pending_approval", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("ai_queries", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("daily_metrics")
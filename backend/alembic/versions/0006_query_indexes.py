@@ -0,0 +1,78 @@
+"""Indexes for the list, approval-queue and review-cycle query shapes.
+
+Composite indexes follow the router queries: equality filters first, then
+the sort columns, so a filtered page is read in index order and stops after
+``LIMIT`` rows. Pending-approval documents and documents under a review cycle
+get partial indexes that only hold those rows.
+
+On PostgreSQL the indexes are built ``CONCURRENTLY`` (outside the migration
+transaction) so writes to large tables are not blocked while they build.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Any, Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PENDING_APPROVAL_ONLY = sa.text("status = 'PENDING_APPROVAL'")
+UNDER_REVIEW_CYCLE = sa.text("review_date IS NOT NULL AND status <> 'ARCHIVED'")
+
+# (name, table, columns, partial index predicate)
+INDEXES: list[tuple[str, str, list[str], Any]] = [
+    ("ix_documents_updated_at_id", "documents", ["updated_at", "id"], None),
+    ("ix_documents_department_updated_at", "documents", ["department", "updated_at", "id"], None),
+    ("ix_documents_status_updated_at", "documents", ["status", "updated_at", "id"], None),
+    (
+        "ix_documents_pending_approval",
+        "documents",
+        ["department", "updated_at", "id"],
+        PENDING_APPROVAL_ONLY,
+    ),
+    ("ix_documents_review_date", "documents", ["review_date"], UNDER_REVIEW_CYCLE),
+    ("ix_documents_drive_file_id", "documents", ["drive_file_id"], None),
+    (
+        "ix_document_versions_document_version",
+        "document_versions",
+        ["document_id", "version_number"],
+        None,
+    ),
+    ("ix_golden_answers_usage_count", "golden_answers", ["usage_count"], None),
+    ("ix_golden_answers_department_usage", "golden_answers", ["department", "usage_count"], None),
+    ("ix_golden_answers_trust_label_usage", "golden_answers", ["trust_label", "usage_count"], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=where,
+                sqlite_where=where,
+            )
+    if op.get_bind().dialect.name == "postgresql":
+        # Fresh planner statistics, so the new indexes are used right away
+        for table in ("documents", "document_versions", "golden_answers"):
+            op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
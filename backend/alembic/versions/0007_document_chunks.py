@@ -0,0 +1,61 @@
+"""Extracted text chunks of document versions.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("document_versions", sa.Column("content_hash", sa.String(64), nullable=True))
+    op.create_table(
+        "document_chunks",
+        sa.Column("id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column(
+            "version_id",
+            postgresql.UUID(as_uuid=False),
+            sa.ForeignKey("document_versions.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "document_id",
+            postgresql.UUID(as_uuid=False),
+            sa.ForeignKey("documents.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("char_start", sa.Integer(), nullable=False),
+        sa.Column("char_end", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index(
+        "ix_document_chunks_version_index",
+        "document_chunks",
+        ["version_id", "chunk_index"],
+        unique=True,
+    )
+    op.create_index("ix_document_chunks_document_id", "document_chunks", ["document_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_document_chunks_document_id", table_name="document_chunks")
+    op.drop_index("ix_document_chunks_version_index", table_name="document_chunks")
+    op.drop_table("document_chunks")
+    with op.batch_alter_table("document_versions") as batch_op:
+        batch_op.drop_column("content_hash")
@@ -0,0 +1,43 @@
+"""Content-addressed version files.
+
+``document_versions.content_hash`` now addresses the version's file in the
+blob store, uploaded or not extracted yet, so extraction is tracked
+separately in ``extracted_at``.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "document_versions", sa.Column("extracted_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    # Until now a hash was only set by extraction
+    op.execute(
+        "UPDATE document_versions SET extracted_at = created_at WHERE content_hash IS NOT NULL"
+    )
+    op.create_index(
+        "ix_document_versions_content_hash", "document_versions", ["content_hash"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_document_versions_content_hash", table_name="document_versions")
+    with op.batch_alter_table("document_versions") as batch_op:
+        batch_op.drop_column("extracted_at")
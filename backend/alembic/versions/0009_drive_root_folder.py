@@ -0,0 +1,36 @@
+"""Drive root folder of synced documents.
+
+The Drive sync sets a document's status from the synced root folder its file
+is under (archive, pending, published). Recording that root lets the sync set
+the status only when the file moves to another root, and otherwise leave it
+to the approval workflow in the app.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "documents", sa.Column("drive_root_folder_id", sa.String(length=100), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("documents") as batch_op:
+        batch_op.drop_column("drive_root_folder_id")
@@ -0,0 +1,60 @@
+"""One queued job per dedupe key.
+
+``enqueue`` used to check for a waiting job and then insert, so two requests
+could both queue the same work. A unique index over the dedupe keys of queued
+jobs lets ``enqueue`` insert with ON CONFLICT DO NOTHING instead. Duplicates
+already queued are removed first, keeping the one that runs first.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Enums are stored by name
+QUEUED_ONLY = sa.text("status = 'QUEUED'")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, dedupe_key FROM jobs"
+        " WHERE status = 'QUEUED' AND dedupe_key IS NOT NULL"
+        " ORDER BY dedupe_key, priority, run_at"
+    ))
+    seen = set()
+    duplicates = []
+    for job_id, dedupe_key in rows:
+        if dedupe_key in seen:
+            duplicates.append(job_id)
+        seen.add(dedupe_key)
+    for job_id in duplicates:
+        bind.execute(sa.text("DELETE FROM jobs WHERE id = :id"), {"id": job_id})
+
+    op.drop_index("ix_jobs_dedupe_key", table_name="jobs")
+    op.create_index(
+        "ix_jobs_dedupe_key",
+        "jobs",
+        ["dedupe_key"],
+        unique=True,
+        postgresql_where=QUEUED_ONLY,
+        sqlite_where=QUEUED_ONLY,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_jobs_dedupe_key", table_name="jobs")
+    op.create_index("ix_jobs_dedupe_key", "jobs", ["dedupe_key"])
@@ -0,0 +1,126 @@
+"""In-process caches shared by routers and services."""
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+_MISSING = object()
+
+
+class TTLCache:
+    """LRU cache whose entries expire after a fixed time-to-live.
+
+    ``get_or_load`` collapses concurrent loads of the same key into a single
+    call of the loader (singleflight).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped on every invalidation (``pop``/``clear``)."""
+        return self._generation
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry (marking it recently used) or ``default``."""
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._data[key]
+                self.on_evict(key, entry[1])
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` and evict the least recently used entries over ``maxsize``."""
+        replaced = self._data.pop(key, None)
+        if replaced is not None:
+            self.on_evict(key, replaced[1])
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        while len(self._data) > self.maxsize:
+            evicted_key, (_, evicted) = self._data.popitem(last=False)
+            self.on_evict(evicted_key, evicted)
+
+    def set_if_unchanged(self, key: Hashable, value: Any, generation: int) -> bool:
+        """Store ``value`` only if nothing was invalidated since ``generation`` was read."""
+        if generation != self._generation:
+            return False
+        self.set(key, value)
+        return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        self._generation += 1
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        self.on_evict(key, entry[1])
+        return entry[1]
+
+    def clear(self) -> None:
+        self._generation += 1
+        for key, (_, value) in self._data.items():
+            self.on_evict(key, value)
+        self._data.clear()
+
+    def on_evict(self, key: Hashable, value: Any) -> None:
+        """Hook called whenever an entry leaves the cache."""
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for ``key``, loading it at most once concurrently.
+
+        The loader runs in its own task, so a caller that is cancelled does not
+        cancel the load for the callers coalesced onto it. Results loaded while
+        an invalidation happened are returned but not cached.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        task, _ = self.load(key, loader)
+        return await asyncio.shield(task)
+
+    def load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> tuple[asyncio.Task, bool]:
+        """Return the load of ``key`` in flight, starting ``loader`` if there is none.
+
+        The flag is true when this call started the load. The result is cached
+        when the load finishes, as in ``get_or_load``.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task, False
+        task = asyncio.ensure_future(loader())
+        self._inflight[key] = task
+        task.add_done_callback(self._load_finished(key, self._generation))
+        return task, True
+
+    def _load_finished(self, key: Hashable, generation: int) -> Callable[[asyncio.Task], None]:
+        def callback(task: asyncio.Task) -> None:
+            self._inflight.pop(key, None)
+            if task.cancelled() or task.exception() is not None:
+                return
+            self.set_if_unchanged(key, task.result(), generation)
+
+        return callback
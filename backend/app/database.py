@@ -1,10 +1,20 @@
 """Database connection and session management."""
-from collections.abc import AsyncGenerator
+import logging
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import event, make_url, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import DeclarativeBase, Session, SessionTransaction
 
 from app.config import get_settings
+from app.telemetry import InstrumentedQueuePool, instrument_engine
 
 
 class Base(DeclarativeBase):
@@ -12,21 +22,78 @@ class Base(DeclarativeBase):
     pass
 
 
-# Create async engine
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    pool_pre_ping=True,
+
+
+def create_engine(url: str, name: str = "primary") -> AsyncEngine:
+    """Create an instrumented engine with the pool and driver settings from ``Settings``."""
+    options: dict[str, Any] = {"echo": settings.sql_echo}
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_logging_name=name,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_recycle=settings.db_pool_recycle_seconds,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+    if make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+            "server_settings": {
+                "statement_timeout": str(settings.db_statement_timeout_ms),
+                "application_name": "adg-kms-api",
+            },
+        }
+    engine = create_async_engine(url, **options)
+    instrument_engine(engine, name)
+    return engine
+
+
+# Create async engines: the primary, and the replica for reads that tolerate lag
+engine = create_engine(settings.database_url)
+read_engine = (
+    create_engine(settings.database_replica_url, "replica")
+    if settings.database_replica_url
+    else engine
 )
 
-# Session factory
+# Session factories
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
 
+# Read-only session factories. AUTOCOMMIT runs each SELECT on its own, which
+# saves the BEGIN/COMMIT round trips and leaves no transaction open between
+# statements. The session still holds its connection until it is closed, so
+# the dependencies are declared with scope="function" to release it when the
+# endpoint returns rather than after the response is sent
+read_session_maker = async_sessionmaker(
+    read_engine.execution_options(isolation_level="AUTOCOMMIT"),
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+primary_read_session_maker = async_sessionmaker(
+    engine.execution_options(isolation_level="AUTOCOMMIT"),
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+# Long streaming reads (exports). Server-side cursors need a transaction, and
+# on PostgreSQL REPEATABLE READ gives the whole export one consistent snapshot
+export_session_maker = async_sessionmaker(
+    read_engine.execution_options(isolation_level="REPEATABLE READ")
+    if read_engine.dialect.name == "postgresql"
+    else read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency that provides database session."""
@@ -39,3 +106,79 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency that provides a read-only session on the replica (or the primary).
+
+    Use for reads that tolerate replica lag (lists, search, stats), declared
+    as ``Depends(get_read_db, scope="function")`` so the session closes when
+    the endpoint returns, before the response is serialized.
+    """
+    async with read_session_maker() as session:
+        yield session
+
+
+async def get_primary_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency that provides a read-only session on the primary.
+
+    For reads that must see the caller's own writes (detail pages after an
+    update); same autocommit, no-commit behaviour as ``get_read_db``.
+    """
+    async with primary_read_session_maker() as session:
+        yield session
+
+
+async def get_export_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency that provides a snapshot session for streamed exports.
+
+    Declare with the default request scope: the session must stay open until
+    the streaming response has sent its last row. Nothing is committed. The
+    export query is one statement for the whole stream, so it gets the longer
+    ``db_export_statement_timeout_ms``.
+    """
+    async with export_session_maker() as session:
+        await set_statement_timeout(session, settings.db_export_statement_timeout_ms)
+        yield session
+
+
+async def set_statement_timeout(session: AsyncSession, timeout_ms: int) -> None:
+    """Override the statement timeout for the rest of ``session``'s transaction."""
+    if session.get_bind().dialect.name == "postgresql":
+        await session.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run ``callback`` once ``session``'s transaction has committed.
+
+    For in-process caches derived from the database: invalidating them before
+    the commit lets a concurrent load cache the old rows again. Callbacks are
+    dropped if the transaction rolls back.
+    """
+    session.sync_session.info.setdefault("after_commit", []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    if session.in_nested_transaction():
+        # A savepoint was released; the transaction can still roll back
+        return
+    for callback in session.info.pop("after_commit", []):
+        try:
+            callback()
+        except Exception:
+            logger.exception("After-commit callback %r failed", callback)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_after_commit(session: Session, transaction: SessionTransaction) -> None:
+    # Whatever is left when the outermost transaction ends was rolled back
+    if transaction.parent is None:
+        session.info.pop("after_commit", None)
+
+
+def dialect_insert(session: AsyncSession, table: Any) -> Any:
+    """INSERT for the session's dialect, supporting ``on_conflict_do_*``."""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
@@ -0,0 +1,101 @@
+"""Streaming NDJSON/CSV exports.
+
+Rows are read through a server-side cursor (``AsyncSession.stream`` with
+``yield_per``) and encoded one batch at a time, so an export of the whole
+catalog holds a single batch in memory, however many rows it has. Nothing is
+counted or paged: the cursor is simply read to the end.
+"""
+import csv
+import enum
+import io
+from collections.abc import AsyncIterator
+from datetime import date, datetime
+from typing import Any
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+
+from app.responses import ORJSON_OPTIONS
+
+
+class ExportFormat(str, enum.Enum):
+    """Định dạng file xuất."""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+# Lets Excel detect UTF-8 (Vietnamese text) when opening the CSV directly
+CSV_BOM = "\ufeff"
+# Spreadsheets run cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, list):
+        value = ";".join(str(item) for item in value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # A leading quote makes the cell plain text (CSV formula injection)
+        return f"'{value}"
+    return value
+
+
+async def _ndjson_chunks(result: AsyncResult) -> AsyncIterator[bytes]:
+    options = ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+    async for rows in result.partitions():
+        yield b"".join(orjson.dumps(row._asdict(), option=options) for row in rows)
+
+
+async def _csv_chunks(result: AsyncResult) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write(CSV_BOM)
+    writer.writerow(result.keys())
+    yield buffer.getvalue().encode()
+    async for rows in result.partitions():
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+
+
+async def stream_rows(
+    db: AsyncSession, query: Select, export_format: ExportFormat, batch_size: int
+) -> AsyncIterator[bytes]:
+    """Encoded batches of ``query``'s rows, read through a server-side cursor."""
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    chunks = _csv_chunks(result) if export_format == ExportFormat.CSV else _ndjson_chunks(result)
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        await result.close()
+
+
+def export_response(
+    db: AsyncSession,
+    query: Select,
+    export_format: ExportFormat,
+    filename: str,
+    batch_size: int,
+) -> StreamingResponse:
+    """Stream ``query`` as an attachment; ``db`` must stay open until the body is sent."""
+    return StreamingResponse(
+        stream_rows(db, query, export_format, batch_size),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"',
+        },
+    )
@@ -1,11 +1,18 @@
 """FastAPI main application."""
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
-from app.routers import chat, documents, golden_answers, stats
+from app.routers import chat, documents, golden_answers, jobs, search, stats
+from app.services import notebooklm
+from app.services.chat_history import chat_history
+from app.services.counters import golden_answer_counters
+from app.services.jobs import job_queue
+from app.services.metrics import daily_metrics
+from app.services.retrieval import retrieval_index
+from app.telemetry import CONTENT_TYPE, TelemetryMiddleware, registry
 
 
 @asynccontextmanager
@@ -13,8 +20,19 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     print("🚀 ADG KMS API starting...")
+    chat_history.start()
+    await daily_metrics.start()
+    golden_answer_counters.start()
+    job_queue.start()
+    retrieval_index.start()
     yield
     # Shutdown
+    await retrieval_index.stop()
+    await job_queue.stop()
+    await notebooklm.close()
+    await golden_answer_counters.stop()
+    await daily_metrics.stop()
+    await chat_history.stop()
     print("👋 ADG KMS API shutting down...")
 
 
@@ -36,11 +54,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request timing and SQL accounting (outermost, so it times everything)
+app.add_middleware(
+    TelemetryMiddleware,
+    slow_request_threshold_ms=settings.slow_request_threshold_ms,
+    slow_request_max_statements=settings.slow_request_max_statements,
+)
+
 # Include routers
 app.include_router(documents.router, prefix="/api/documents", tags=["Documents"])
 app.include_router(golden_answers.router, prefix="/api/golden-answers", tags=["Golden Answers"])
 app.include_router(chat.router, prefix="/api/chat", tags=["Chat"])
 app.include_router(stats.router, prefix="/api/stats", tags=["Statistics"])
+app.include_router(search.router, prefix="/api/search", tags=["Search"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
 
 
 @app.get("/")
@@ -57,3 +84,9 @@ async def root():
 async def health():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics."""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -1,5 +1,17 @@
 """Database models package."""
-from app.models.document import Document, DocumentVersion
+from app.models.chat import ChatMessage, Conversation
+from app.models.document import Document, DocumentChunk, DocumentVersion
 from app.models.golden_answer import GoldenAnswer
+from app.models.job import Job
+from app.models.metrics import DailyMetrics
 
-__all__ = ["Document", "DocumentVersion", "GoldenAnswer"]
+__all__ = [
+    "ChatMessage",
+    "Conversation",
+    "DailyMetrics",
+    "Document",
+    "DocumentChunk",
+    "DocumentVersion",
+    "GoldenAnswer",
+    "Job",
+]
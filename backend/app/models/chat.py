@@ -0,0 +1,83 @@
+"""Conversation and ChatMessage SQLAlchemy models."""
+import enum
+from datetime import datetime
+from typing import Any, Optional
+from uuid import uuid4
+
+from sqlalchemy import JSON, DateTime, Enum, ForeignKey, Index, Text, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class MessageRole(str, enum.Enum):
+    """Người gửi tin nhắn."""
+    USER = "user"
+    ASSISTANT = "assistant"
+
+
+class Conversation(Base):
+    """Cuộc hội thoại chat."""
+
+    __tablename__ = "conversations"
+
+    # Primary key
+    id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        primary_key=True,
+        default=lambda: str(uuid4())
+    )
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<Conversation {self.id[:8]}...>"
+
+
+class ChatMessage(Base):
+    """Tin nhắn trong một cuộc hội thoại."""
+
+    __tablename__ = "chat_messages"
+    __table_args__ = (
+        # History reads page through one conversation in time order
+        Index("ix_chat_messages_conversation_created", "conversation_id", "created_at", "id"),
+    )
+
+    # Primary key
+    id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        primary_key=True,
+        default=lambda: str(uuid4())
+    )
+
+    # Foreign key
+    conversation_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("conversations.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    # Content
+    role: Mapped[MessageRole] = mapped_column(Enum(MessageRole), nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    citations: Mapped[Optional[list[dict[str, Any]]]] = mapped_column(JSON, nullable=True)
+    golden_answer_id: Mapped[Optional[str]] = mapped_column(UUID(as_uuid=False), nullable=True)
+
+    # Timestamps (set by the writer so batched inserts keep message order)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<ChatMessage {self.role.value} in {self.conversation_id[:8]}...>"
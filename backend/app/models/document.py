@@ -1,10 +1,10 @@
-"""Document and DocumentVersion SQLAlchemy models."""
+"""Document, DocumentVersion and DocumentChunk SQLAlchemy models."""
 import enum
 from datetime import datetime
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import DateTime, Enum, ForeignKey, String, Text, func
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, String, Text, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -35,10 +35,39 @@ class Classification(str, enum.Enum):
     CONFIDENTIAL = "confidential"
 
 
+# Enums are stored by name
+PENDING_APPROVAL_ONLY = text("status = 'PENDING_APPROVAL'")
+UNDER_REVIEW_CYCLE = text("review_date IS NOT NULL AND status <> 'ARCHIVED'")
+
+
 class Document(Base):
     """Tài liệu trong hệ thống KMS."""
     
     __tablename__ = "documents"
+    __table_args__ = (
+        # The list endpoint pages by (updated_at, id), optionally filtered
+        Index("ix_documents_updated_at_id", "updated_at", "id"),
+        Index("ix_documents_department_updated_at", "department", "updated_at", "id"),
+        Index("ix_documents_status_updated_at", "status", "updated_at", "id"),
+        # Approval queue: small, and stays small as the archive grows
+        Index(
+            "ix_documents_pending_approval",
+            "department",
+            "updated_at",
+            "id",
+            postgresql_where=PENDING_APPROVAL_ONLY,
+            sqlite_where=PENDING_APPROVAL_ONLY,
+        ),
+        # Documents due for review, soonest first
+        Index(
+            "ix_documents_review_date",
+            "review_date",
+            postgresql_where=UNDER_REVIEW_CYCLE,
+            sqlite_where=UNDER_REVIEW_CYCLE,
+        ),
+        # Drive sync looks documents up by their Drive file
+        Index("ix_documents_drive_file_id", "drive_file_id"),
+    )
     
     # Primary key
     id: Mapped[str] = mapped_column(
@@ -68,6 +97,8 @@ class Document(Base):
     # Google Drive integration
     drive_file_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     drive_folder_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    # Synced root folder (archive/pending/published) the file was last seen under
+    drive_root_folder_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     
     # NotebookLM integration
     notebooklm_source_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
@@ -105,6 +136,12 @@ class DocumentVersion(Base):
     """Phiên bản của tài liệu."""
     
     __tablename__ = "document_versions"
+    __table_args__ = (
+        # Versions are always read per document, newest first
+        Index("ix_document_versions_document_version", "document_id", "version_number"),
+        # Blob garbage collection looks up references by content
+        Index("ix_document_versions_content_hash", "content_hash"),
+    )
     
     # Primary key
     id: Mapped[str] = mapped_column(
@@ -128,6 +165,12 @@ class DocumentVersion(Base):
     archive_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     published_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     
+    # SHA-256 of the version's file: its address in the blob store, shared by
+    # every version with the same content
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    # Set once the file's text has been extracted into chunks
+    extracted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), 
@@ -136,6 +179,60 @@ class DocumentVersion(Base):
     
     # Relationship
     document: Mapped["Document"] = relationship(back_populates="versions")
+    chunks: Mapped[list["DocumentChunk"]] = relationship(
+        back_populates="version",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="DocumentChunk.chunk_index"
+    )
     
     def __repr__(self) -> str:
         return f"<DocumentVersion v{self.version_number} of {self.document_id[:8]}...>"
+
+
+class DocumentChunk(Base):
+    """Đoạn văn bản trích xuất từ một phiên bản tài liệu."""
+
+    __tablename__ = "document_chunks"
+    __table_args__ = (
+        # Chunks are replaced and read per version, in order
+        Index("ix_document_chunks_version_index", "version_id", "chunk_index", unique=True),
+        Index("ix_document_chunks_document_id", "document_id"),
+    )
+
+    # Primary key
+    id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        primary_key=True,
+        default=lambda: str(uuid4())
+    )
+
+    # Foreign keys (document_id is denormalized for per-document lookups)
+    version_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("document_versions.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    document_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    # Content
+    chunk_index: Mapped[int] = mapped_column(nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    char_start: Mapped[int] = mapped_column(nullable=False)
+    char_end: Mapped[int] = mapped_column(nullable=False)
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+
+    # Relationship
+    version: Mapped["DocumentVersion"] = relationship(back_populates="chunks")
+
+    def __repr__(self) -> str:
+        return f"<DocumentChunk #{self.chunk_index} of {self.version_id[:8]}...>"
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import DateTime, Enum, String, Text, func
+from sqlalchemy import JSON, DateTime, Enum, Index, String, Text, func
 from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -24,6 +24,12 @@ class GoldenAnswer(Base):
     """Câu trả lời chuẩn đã được xác minh."""
     
     __tablename__ = "golden_answers"
+    __table_args__ = (
+        # The list endpoint returns the most used answers, optionally filtered
+        Index("ix_golden_answers_usage_count", "usage_count"),
+        Index("ix_golden_answers_department_usage", "department", "usage_count"),
+        Index("ix_golden_answers_trust_label_usage", "trust_label", "usage_count"),
+    )
     
     # Primary key
     id: Mapped[str] = mapped_column(
@@ -43,9 +49,9 @@ class GoldenAnswer(Base):
         default=TrustLabel.ASSUMPTION
     )
     
-    # Source documents
+    # Source documents (JSON on SQLite, which has no array type)
     source_document_ids: Mapped[list[str]] = mapped_column(
-        ARRAY(String), 
+        ARRAY(String).with_variant(JSON(), "sqlite"),
         default=list
     )
     
@@ -0,0 +1,81 @@
+"""Job SQLAlchemy model (background job queue)."""
+import enum
+from datetime import datetime, timezone
+from typing import Any, Optional
+from uuid import uuid4
+
+from sqlalchemy import JSON, DateTime, Enum, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class JobStatus(str, enum.Enum):
+    """Trạng thái job nền."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    DEAD = "dead"
+
+
+# Enums are stored by name
+QUEUED_ONLY = text("status = 'QUEUED'")
+
+
+class Job(Base):
+    """Job nền (upload nguồn NotebookLM, ...) chờ worker xử lý."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers claim ready jobs in (priority, run_at) order
+        Index("ix_jobs_claim", "status", "priority", "run_at"),
+        # At most one queued job per dedupe key; enqueue relies on it
+        Index(
+            "ix_jobs_dedupe_key",
+            "dedupe_key",
+            unique=True,
+            postgresql_where=QUEUED_ONLY,
+            sqlite_where=QUEUED_ONLY,
+        ),
+    )
+
+    # Primary key
+    id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        primary_key=True,
+        default=lambda: str(uuid4())
+    )
+
+    # What to run
+    kind: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
+    dedupe_key: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+
+    # Scheduling (lower priority runs first)
+    status: Mapped[JobStatus] = mapped_column(Enum(JobStatus), default=JobStatus.QUEUED)
+    priority: Mapped[int] = mapped_column(Integer, default=100)
+    run_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc)
+    )
+
+    # Retries
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=5)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<Job {self.kind} {self.id[:8]}... {self.status.value}>"
@@ -0,0 +1,34 @@
+"""DailyMetrics SQLAlchemy model."""
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class DailyMetrics(Base):
+    """Số liệu Dashboard theo ngày (UTC)."""
+
+    __tablename__ = "daily_metrics"
+
+    # Primary key
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    # Document totals at the end of the day
+    total_documents: Mapped[int] = mapped_column(Integer, default=0)
+    active_documents: Mapped[int] = mapped_column(Integer, default=0)
+    pending_approval: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Activity during the day
+    ai_queries: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Timestamps
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<DailyMetrics {self.day}>"
@@ -0,0 +1,100 @@
+"""Cursor encoding and row-count helpers for paginated endpoints."""
+import base64
+import binascii
+import enum
+import json
+from collections.abc import Hashable
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import ColumnElement, Select, String, func, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TTLCache
+from app.config import get_settings
+
+
+class CountMode(str, enum.Enum):
+    """Cách tính tổng số bản ghi của một trang."""
+    EXACT = "exact"            # count(*) trên toàn bộ tập đã lọc
+    ESTIMATED = "estimated"    # ước lượng từ query planner
+    CACHED = "cached"          # count(*) chính xác, lưu cache ngắn hạn
+
+
+settings = get_settings()
+_count_cache = TTLCache(maxsize=256, ttl=settings.count_cache_ttl_seconds)
+
+
+def encode_cursor(sort_value: datetime, row_id: str) -> str:
+    """Encode a keyset position as an opaque URL-safe token."""
+    raw = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a token produced by ``encode_cursor``.
+
+    Raises ``ValueError`` if the token is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), str(row_id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError("invalid cursor") from e
+
+
+def cursor_bound(column: ColumnElement, sort_value: datetime, dialect_name: str) -> ColumnElement:
+    """The cursor's timestamp as a bound value to compare with ``column``.
+
+    SQLite keeps timestamps as text and compares them as strings. ``now()``
+    server defaults store whole seconds (``YYYY-MM-DD HH:MM:SS``) but a bound
+    datetime always renders microseconds, which would sort every row of the
+    cursor's second before the cursor; render the bound the way such rows
+    are stored instead.
+    """
+    if dialect_name != "sqlite":
+        return literal(sort_value, column.type)
+    fmt = "%Y-%m-%d %H:%M:%S.%f" if sort_value.microsecond else "%Y-%m-%d %H:%M:%S"
+    return literal(sort_value.strftime(fmt), String())
+
+
+async def count_rows(
+    db: AsyncSession,
+    query: Select,
+    mode: CountMode = CountMode.EXACT,
+    cache_key: Optional[Hashable] = None,
+) -> tuple[int, bool]:
+    """Count the rows matched by ``query``.
+
+    Returns ``(total, is_exact)``. Estimates are only available on
+    PostgreSQL; other dialects fall back to an exact count.
+    """
+    if mode == CountMode.ESTIMATED and db.get_bind().dialect.name == "postgresql":
+        return await _estimate_count(db, query), False
+
+    if mode == CountMode.CACHED and cache_key is not None:
+        total = _count_cache.get(cache_key)
+        if total is None:
+            total = await _exact_count(db, query)
+            _count_cache.set(cache_key, total)
+        return total, True
+
+    return await _exact_count(db, query), True
+
+
+async def _exact_count(db: AsyncSession, query: Select) -> int:
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    return await db.scalar(count_query) or 0
+
+
+async def _estimate_count(db: AsyncSession, query: Select) -> int:
+    """Read the planner's row estimate instead of scanning the filtered set."""
+    compiled = query.order_by(None).compile(
+        dialect=db.get_bind().dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    plan = await db.scalar(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,39 @@
+"""Fast path for list endpoints: column projections serialized with orjson.
+
+List endpoints select exactly the columns their response schema exposes as
+plain rows (no ORM identity map, no per-row Pydantic validation) and return
+``ORJSONResponse`` directly. The schemas stay the ``response_model`` for the
+OpenAPI docs; a row only ever holds values the database already typed, so
+re-validating it would not catch anything.
+"""
+from typing import Any
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy.orm import InstrumentedAttribute
+
+# Timezone-aware UTC datetimes end in "Z", as in Pydantic's own JSON output
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+class ORJSONResponse(Response):
+    """JSON response rendered by orjson."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def projection(model: type, schema: type[BaseModel]) -> list[InstrumentedAttribute]:
+    """The ``model`` columns behind each field of ``schema``, in field order."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def json_response(content: Any, response: Response) -> ORJSONResponse:
+    """Render ``content`` with orjson, keeping headers already set on ``response``.
+
+    FastAPI only copies the injected ``Response``'s headers onto responses it
+    builds itself, so returned responses must carry them over (ETag etc.).
+    """
+    return ORJSONResponse(content, headers=dict(response.headers))
@@ -1,54 +1,376 @@
 """Chat API router - Integration with NotebookLM."""
-from uuid import uuid4
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from typing import Any, Optional
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas import ChatRequest, ChatResponse, Citation
+from app.config import get_settings
+from app.database import get_db, get_primary_read_db
+from app.models.chat import ChatMessage, MessageRole
+from app.models.document import Document, DocumentStatus
+from app.pagination import cursor_bound, decode_cursor, encode_cursor
+from app.schemas import (
+    ChatHistoryResponse,
+    ChatMessageResponse,
+    ChatRequest,
+    ChatResponse,
+    Citation,
+)
+from app.services import notebooklm
+from app.services.chat_cache import chat_cache
+from app.services.chat_history import chat_history
+from app.services.counters import golden_answer_counters
+from app.services.golden_index import GoldenMatch, golden_answer_index
+from app.services.metrics import daily_metrics
+from app.services.retrieval import passage_citations, retrieval_index
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
+settings = get_settings()
+
+CITATION_EXCERPT_LENGTH = 300
+FALLBACK_NOTICE = (
+    "NotebookLM hiện không phản hồi. Dưới đây là các đoạn liên quan nhất trong kho tài liệu:"
+)
+
+
+async def _golden_answer_citations(db: AsyncSession, match: GoldenMatch) -> list[Citation]:
+    """Citations stored on the golden answer, or one per source document."""
+    stored = match.answer.parsed_citations()
+    if stored:
+        required = {"source_id", "source_title", "text"}
+        return [Citation.model_validate(c) for c in stored if required <= c.keys()]
+
+    if not match.answer.source_document_ids:
+        return []
+    result = await db.execute(
+        select(Document.id, Document.title).where(
+            Document.id.in_(match.answer.source_document_ids)
+        )
+    )
+    excerpt = match.answer.answer[:CITATION_EXCERPT_LENGTH]
+    return [Citation(source_id=row.id, source_title=row.title, text=excerpt) for row in result]
+
+
+async def _golden_answer(
+    db: AsyncSession,
+    request: ChatRequest,
+) -> Optional[tuple[GoldenMatch, list[Citation]]]:
+    """Answer ``request`` from a matching golden answer, counting the use."""
+    await golden_answer_index.refresh(db)
+    match = golden_answer_index.match(
+        request.query, settings.golden_answer_match_threshold, source_ids=request.source_ids
+    )
+    if not match:
+        return None
+
+    golden_answer_counters.add(match.answer.id, "usage_count")
+    return match, await _golden_answer_citations(db, match)
+
+
+async def _fallback_answer(db: AsyncSession, request: ChatRequest) -> Optional[notebooklm.Answer]:
+    """The best passages of published documents from the local index, cited."""
+    passages = retrieval_index.search(
+        request.query,
+        settings.retrieval_top_k,
+        statuses=[DocumentStatus.PUBLISHED],
+        document_ids=request.source_ids,
+    )
+    citations = await passage_citations(db, passages, CITATION_EXCERPT_LENGTH)
+    if not citations:
+        return None
+    excerpts = (f"[{i}] {c.source_title}: {c.text}" for i, c in enumerate(citations, 1))
+    return notebooklm.Answer(text="\n\n".join([FALLBACK_NOTICE, *excerpts]), citations=citations)
+
+
+def _utc_naive(value: datetime) -> datetime:
+    """``value`` as naive UTC; SQLite hands stored timestamps back naive."""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _position(message: ChatMessageResponse) -> tuple[datetime, str]:
+    """Where ``message`` sorts in a conversation's history."""
+    return _utc_naive(message.created_at), message.id
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _conversation_id(request: ChatRequest) -> str:
+    """The request's conversation id, or a new one for a new conversation."""
+    if request.conversation_id is None:
+        return str(uuid4())
+    if not _is_uuid(request.conversation_id):
+        raise HTTPException(status_code=400, detail="conversation_id không hợp lệ")
+    return request.conversation_id
+
+
+def _answer_response(answer: notebooklm.Answer, conversation_id: str) -> ChatResponse:
+    return ChatResponse(
+        answer=answer.text,
+        citations=answer.citations,
+        conversation_id=conversation_id,
+        suggested_queries=answer.suggested_queries,
+    )
+
+
+def _record_exchange(query: str, asked_at: datetime, response: ChatResponse) -> None:
+    """Queue the question and its answer for the chat history store, and count the query."""
+    daily_metrics.record_ai_query()
+    chat_history.append(response.conversation_id, MessageRole.USER, query, created_at=asked_at)
+    chat_history.append(
+        response.conversation_id,
+        MessageRole.ASSISTANT,
+        response.answer,
+        citations=[citation.model_dump() for citation in response.citations],
+        golden_answer_id=response.golden_answer_id,
+    )
+
+
+def _sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _event_frame(event: notebooklm.AnswerEvent) -> str:
+    if event.kind == "token":
+        return _sse("token", {"text": event.data})
+    if event.kind == "citation":
+        return _sse("citation", event.data.model_dump())
+    return _sse("suggestions", {"suggested_queries": event.data})
 
 
 @router.post("/query", response_model=ChatResponse)
-async def chat_query(request: ChatRequest):
+async def chat_query(
+    request: ChatRequest,
+    db: AsyncSession = Depends(get_db),
+):
     """
     Gửi câu hỏi đến NotebookLM và nhận câu trả lời.
     
-    TODO: Integrate with NotebookLM MCP server
+    Câu hỏi khớp với một Golden Answer đã xác minh (VERIFIED/POLICY) được trả
+    lời ngay từ Golden Answer đó, không gọi NotebookLM. Các câu hỏi giống nhau
+    dùng chung câu trả lời trong cache, và các yêu cầu trùng đang chạy chỉ gọi
+    NotebookLM một lần. Khi NotebookLM lỗi hoặc quá chậm, câu trả lời gồm các
+    đoạn liên quan nhất từ chỉ mục nội dung tài liệu cục bộ.
     """
-    # Mock response for now
-    # In production, this will call NotebookLM via MCP
-    
-    conversation_id = request.conversation_id or str(uuid4())
-    
-    return ChatResponse(
-        answer=f"Đây là câu trả lời mẫu cho: '{request.query}'. "
-               "Trong phiên bản hoàn chỉnh, câu trả lời sẽ được tạo bởi NotebookLM AI.",
-        citations=[
-            Citation(
-                source_id="mock-source-1",
-                source_title="Báo cáo Marketing Q3.pdf",
-                text="Đây là trích dẫn mẫu từ tài liệu nguồn.",
-                page=15,
+    conversation_id = _conversation_id(request)
+    asked_at = datetime.now(timezone.utc)
+
+    golden = await _golden_answer(db, request)
+    if golden:
+        match, citations = golden
+        response = ChatResponse(
+            answer=match.answer.answer,
+            citations=citations,
+            conversation_id=conversation_id,
+            golden_answer_id=match.answer.id,
+        )
+    else:
+        try:
+            # The load keeps running (and is cached) if the wait times out
+            answer = await asyncio.wait_for(
+                chat_cache.get_answer(
+                    request.query,
+                    request.source_ids,
+                    lambda: notebooklm.answer(request.query, request.source_ids),
+                ),
+                settings.chat_fallback_timeout_seconds,
             )
-        ],
-        conversation_id=conversation_id,
-        suggested_queries=[
-            "Tóm tắt chiến lược B2B",
-            "Liệt kê đối thủ chính",
-            "Xu hướng thị trường Q4",
-        ],
+        except Exception:
+            fallback = await _fallback_answer(db, request)
+            if fallback is None:
+                raise
+            logger.warning(
+                "NotebookLM failed, answering %s from the local index", conversation_id,
+                exc_info=True,
+            )
+            answer = fallback
+        response = _answer_response(answer, conversation_id)
+
+    _record_exchange(request.query, asked_at, response)
+    return response
+
+
+@router.post("/query/stream")
+async def chat_query_stream(
+    request: ChatRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Như `/query` nhưng trả kết quả dần dần qua Server-Sent Events.
+
+    Thứ tự sự kiện: `meta` (conversation_id), các `token` của câu trả lời,
+    từng `citation`, `suggestions`, cuối cùng là `done` (hoặc `error`).
+    Các yêu cầu trùng đang chạy (kể cả `/query`) chỉ gọi NotebookLM một lần; khi
+    client ngắt kết nối, câu trả lời vẫn được tạo xong và lưu cache. Nếu NotebookLM lỗi
+    trước khi gửi token nào, câu trả lời lấy từ chỉ mục cục bộ như `/query`.
+    """
+    conversation_id = _conversation_id(request)
+    asked_at = datetime.now(timezone.utc)
+    golden = await _golden_answer(db, request)
+    # Release the pooled connection before streaming; the stream itself needs no DB
+    await db.commit()
+
+    async def events() -> AsyncIterator[str]:
+        if golden:
+            match, citations = golden
+            yield _sse(
+                "meta", {"conversation_id": conversation_id, "golden_answer_id": match.answer.id}
+            )
+            yield _sse("token", {"text": match.answer.answer})
+            for citation in citations:
+                yield _sse("citation", citation.model_dump())
+            _record_exchange(request.query, asked_at, ChatResponse(
+                answer=match.answer.answer,
+                citations=citations,
+                conversation_id=conversation_id,
+                golden_answer_id=match.answer.id,
+            ))
+            yield _sse("done", {})
+            return
+
+        yield _sse("meta", {"conversation_id": conversation_id, "golden_answer_id": None})
+        cache_key = chat_cache.make_key(request.query, request.source_ids)
+        cached = chat_cache.get(cache_key)
+        if cached:
+            for event in cached.events():
+                yield _event_frame(event)
+            _record_exchange(request.query, asked_at, _answer_response(cached, conversation_id))
+            yield _sse("done", {})
+            return
+
+        # Events of the answer as this request loads it. A request that joins a
+        # load already in flight replays the finished answer instead
+        live: asyncio.Queue[Optional[notebooklm.AnswerEvent]] = asyncio.Queue()
+
+        async def load() -> notebooklm.Answer:
+            collected = notebooklm.Answer()
+            try:
+                async for event in notebooklm.stream_answer(request.query, request.source_ids):
+                    collected.add(event)
+                    live.put_nowait(event)
+            finally:
+                live.put_nowait(None)
+            return collected
+
+        loading, started = chat_cache.load(cache_key, load)
+        streamed = False
+        try:
+            if started:
+                while (event := await live.get()) is not None:
+                    if await http_request.is_disconnected():
+                        logger.info(
+                            "Client disconnected, answer for %s finishes for the cache",
+                            conversation_id,
+                        )
+                        return
+                    streamed = True
+                    yield _event_frame(event)
+                answer = await asyncio.shield(loading)
+            else:
+                answer = await asyncio.shield(loading)
+                for event in answer.events():
+                    yield _event_frame(event)
+            _record_exchange(request.query, asked_at, _answer_response(answer, conversation_id))
+            yield _sse("done", {})
+        except Exception:
+            logger.exception("Streaming answer failed for %s", conversation_id)
+            fallback = None
+            if not streamed:
+                try:
+                    fallback = await _fallback_answer(db, request)
+                except Exception:
+                    logger.exception("Local fallback failed for %s", conversation_id)
+            if fallback is None:
+                yield _sse("error", {"detail": "Không thể tạo câu trả lời"})
+                return
+            for event in fallback.events():
+                yield _event_frame(event)
+            _record_exchange(request.query, asked_at, _answer_response(fallback, conversation_id))
+            yield _sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
-@router.get("/history/{conversation_id}")
-async def get_chat_history(conversation_id: str):
+@router.get("/cache/stats")
+async def get_chat_cache_stats():
+    """Thống kê cache câu trả lời chat (hit/miss/gộp yêu cầu/vô hiệu hóa)."""
+    return chat_cache.stats()
+
+
+@router.get("/history/{conversation_id}", response_model=ChatHistoryResponse)
+async def get_chat_history(
+    conversation_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_primary_read_db, scope="function"),
+):
     """
-    Lấy lịch sử chat theo conversation ID.
+    Lấy lịch sử chat theo conversation ID, tin nhắn cũ nhất trước.
     
-    TODO: Implement chat history storage
+    Truyền `cursor` (lấy từ `next_cursor`) để đọc trang tiếp theo.
     """
-    return {
-        "conversation_id": conversation_id,
-        "messages": [],
-        "message": "Chat history chưa được triển khai",
-    }
+    if not _is_uuid(conversation_id):
+        raise HTTPException(status_code=400, detail="conversation_id không hợp lệ")
+
+    query = select(ChatMessage).where(ChatMessage.conversation_id == conversation_id)
+    after: Optional[tuple[datetime, str]] = None
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Cursor không hợp lệ")
+        after = (_utc_naive(cursor_created_at), cursor_id)
+        query = query.where(
+            tuple_(ChatMessage.created_at, ChatMessage.id)
+            > tuple_(
+                cursor_bound(ChatMessage.created_at, cursor_created_at, db.get_bind().dialect.name),
+                literal(cursor_id, ChatMessage.id.type),
+            )
+        )
+    query = query.order_by(ChatMessage.created_at, ChatMessage.id).limit(limit + 1)
+
+    result = await db.execute(query)
+    messages = [ChatMessageResponse.model_validate(m) for m in result.scalars().all()]
+
+    if len(messages) <= limit:
+        # Last stored page: add messages still waiting in the write-behind buffer
+        stored_ids = {m.id for m in messages}
+        pending = (
+            ChatMessageResponse.model_validate(m)
+            for m in chat_history.pending(conversation_id)
+            if m["id"] not in stored_ids
+        )
+        messages.extend(m for m in pending if after is None or _position(m) > after)
+        messages.sort(key=_position)
+
+    next_cursor = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        next_cursor = encode_cursor(messages[-1].created_at, messages[-1].id)
+
+    return ChatHistoryResponse(
+        conversation_id=conversation_id,
+        messages=messages,
+        next_cursor=next_cursor,
+    )
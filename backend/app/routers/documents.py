@@ -1,62 +1,368 @@
 """Documents API router."""
-from typing import Optional
+import json
+import logging
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any, Optional
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
+from sqlalchemy import Select, func, insert, literal, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models.document import Department, Document, DocumentStatus
-from app.schemas import DocumentCreate, DocumentListResponse, DocumentResponse, DocumentUpdate
+from app.config import get_settings
+from app.database import (
+    after_commit,
+    get_db,
+    get_export_db,
+    get_primary_read_db,
+    get_read_db,
+    set_statement_timeout,
+)
+from app.etag import conditional_response, weak_etag
+from app.export import ExportFormat, export_response
+from app.models.document import (
+    Department,
+    Document,
+    DocumentChunk,
+    DocumentStatus,
+    DocumentVersion,
+)
+from app.pagination import (
+    CountMode,
+    count_rows,
+    cursor_bound,
+    decode_cursor,
+    encode_cursor,
+)
+from app.responses import json_response, projection
+from app.schemas import (
+    BulkDocumentResponse,
+    BulkRowError,
+    DocumentBatchResponse,
+    DocumentBulkUpdate,
+    DocumentBulkUpdateResponse,
+    DocumentCreate,
+    DocumentListResponse,
+    DocumentResponse,
+    DocumentUpdate,
+    DocumentVersionResponse,
+)
+from app.services.blobs import BlobTooLargeError, blob_store, enqueue_collection
+from app.services.bulk import document_rows, insert_documents
+from app.services.chat_cache import chat_cache
+from app.services.retrieval import retrieval_index
+from app.services.search import match_clause
+from app.services.sources import enqueue_removal, enqueue_upload
+from app.services.stats import invalidate_document_stats
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
+settings = get_settings()
+
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/jsonl", "application/json-seq"}
+
+# Moving a document into or out of these statuses makes cached chat answers
+# citing it stale
+CHAT_CACHE_INVALIDATING_STATUSES = {DocumentStatus.PUBLISHED, DocumentStatus.ARCHIVED}
+
+# Fields sent to NotebookLM; editing them on a published document re-uploads it
+NOTEBOOKLM_SOURCE_FIELDS = {"title", "description"}
+
+# Columns selected by the list endpoint: exactly what DocumentResponse exposes
+DOCUMENT_LIST_COLUMNS = projection(Document, DocumentResponse)
+
+# Approval workflow: the statuses each status may move to (enforced by bulk updates)
+STATUS_TRANSITIONS: dict[DocumentStatus, set[DocumentStatus]] = {
+    DocumentStatus.DRAFT: {DocumentStatus.PENDING_APPROVAL, DocumentStatus.ARCHIVED},
+    DocumentStatus.PENDING_APPROVAL: {
+        DocumentStatus.APPROVED,
+        DocumentStatus.PUBLISHED,
+        DocumentStatus.DRAFT,
+        DocumentStatus.ARCHIVED,
+    },
+    DocumentStatus.APPROVED: {
+        DocumentStatus.PUBLISHED,
+        DocumentStatus.DRAFT,
+        DocumentStatus.ARCHIVED,
+    },
+    DocumentStatus.PUBLISHED: {DocumentStatus.APPROVED, DocumentStatus.ARCHIVED},
+    DocumentStatus.ARCHIVED: {DocumentStatus.DRAFT},
+}
+
+MAX_BATCH_IDS = 500
+
+
+def _filter_documents(
+    query: Select,
+    department: Optional[Department],
+    status: Optional[DocumentStatus],
+    search: Optional[str],
+    dialect_name: str,
+) -> Select:
+    """Apply the list filters shared by document read endpoints."""
+    if department:
+        query = query.where(Document.department == department)
+    if status:
+        query = query.where(Document.status == status)
+    if search:
+        query = query.where(match_clause("document", search, dialect_name))
+    return query
+
+
+def _parse_ids(values: list[str]) -> list[str]:
+    """Ids from repeated and/or comma-separated query values, de-duplicated in order."""
+    ids: list[str] = []
+    for value in values:
+        for part in filter(None, (p.strip() for p in value.split(","))):
+            try:
+                ids.append(str(UUID(part)))
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Id không hợp lệ: {part}")
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"Tối đa {MAX_BATCH_IDS} id mỗi lần")
+    return ids
+
+
+def _invalidates_chat_answers(old_status: DocumentStatus, new_status: DocumentStatus) -> bool:
+    return old_status != new_status and bool(
+        {old_status, new_status} & CHAT_CACHE_INVALIDATING_STATUSES
+    )
+
+
+async def _sync_notebooklm_source(
+    db: AsyncSession,
+    document_id: str,
+    old_status: DocumentStatus,
+    new_status: DocumentStatus,
+    changed_fields: set[str],
+    source_id: Optional[str],
+) -> None:
+    """NotebookLM only holds published documents; sync it in the background."""
+    if new_status == DocumentStatus.PUBLISHED and (
+        old_status != DocumentStatus.PUBLISHED or changed_fields & NOTEBOOKLM_SOURCE_FIELDS
+    ):
+        await enqueue_upload(db, document_id)
+    elif old_status == DocumentStatus.PUBLISHED and new_status != DocumentStatus.PUBLISHED:
+        await enqueue_removal(db, document_id, source_id)
 
 
 @router.get("/", response_model=DocumentListResponse)
 async def list_documents(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     department: Optional[Department] = None,
     status: Optional[DocumentStatus] = None,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    count_mode: CountMode = CountMode.EXACT,
+    db: AsyncSession = Depends(get_read_db, scope="function"),
 ):
-    """Lấy danh sách tài liệu với phân trang và lọc."""
-    query = select(Document)
+    """
+    Lấy danh sách tài liệu với phân trang và lọc.
     
-    # Filters
-    if department:
-        query = query.where(Document.department == department)
-    if status:
-        query = query.where(Document.status == status)
-    if search:
-        query = query.where(Document.title.ilike(f"%{search}%"))
+    `search` tìm không dấu trên tiêu đề và mô tả qua chỉ mục full-text.
+
+    Truyền `cursor` (lấy từ `next_cursor` của trang trước) để phân trang theo
+    keyset `(updated_at, id)` thay vì OFFSET; khi đó `page` được bỏ qua.
+
+    Trả về `ETag`; gửi lại qua `If-None-Match` để nhận 304 khi trang không đổi.
+    """
+    query = _filter_documents(
+        select(*DOCUMENT_LIST_COLUMNS), department, status, search, db.get_bind().dialect.name
+    )
     
     # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query) or 0
+    total, total_is_exact = await count_rows(
+        db, query, count_mode, cache_key=("documents", department, status, search)
+    )
     
     # Pagination
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    query = query.order_by(Document.updated_at.desc())
+    if cursor:
+        try:
+            cursor_updated_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Cursor không hợp lệ")
+        query = query.where(
+            tuple_(Document.updated_at, Document.id)
+            < tuple_(
+                cursor_bound(Document.updated_at, cursor_updated_at, db.get_bind().dialect.name),
+                literal(cursor_id, Document.id.type),
+            )
+        )
+    else:
+        query = query.offset((page - 1) * page_size)
+
+    # Fetch one extra row to know whether another page exists
+    query = query.order_by(Document.updated_at.desc(), Document.id.desc()).limit(page_size + 1)
     
     result = await db.execute(query)
-    documents = result.scalars().all()
-    
-    return DocumentListResponse(
-        items=[DocumentResponse.model_validate(doc) for doc in documents],
-        total=total,
-        page=page,
-        page_size=page_size,
+    documents = result.all()
+
+    next_cursor = None
+    if len(documents) > page_size:
+        documents = documents[:page_size]
+        next_cursor = encode_cursor(documents[-1].updated_at, documents[-1].id)
+
+    etag = weak_etag(
+        total, total_is_exact, page, next_cursor, [(doc.id, doc.updated_at) for doc in documents]
+    )
+    if not_modified := conditional_response(request, response, etag):
+        return not_modified
+
+    # Rows come straight from the typed columns; skip per-row model validation
+    return json_response(
+        {
+            "items": [doc._asdict() for doc in documents],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_is_exact": total_is_exact,
+            "next_cursor": next_cursor,
+        },
+        response,
+    )
+
+
+@router.get("/export")
+async def export_documents(
+    format: ExportFormat = ExportFormat.NDJSON,
+    department: Optional[Department] = None,
+    status: Optional[DocumentStatus] = None,
+    search: Optional[str] = None,
+    db: AsyncSession = Depends(get_export_db),
+):
+    """
+    Xuất toàn bộ tài liệu (NDJSON hoặc CSV) dạng stream.
+
+    Bộ lọc giống `GET /api/documents/`. Dữ liệu được đọc qua server-side cursor
+    và gửi theo từng lô, nên có thể xuất cả kho tài liệu mà không cần phân trang.
+    """
+    query = _filter_documents(
+        select(*DOCUMENT_LIST_COLUMNS), department, status, search, db.get_bind().dialect.name
+    ).order_by(Document.updated_at.desc(), Document.id.desc())
+    return export_response(db, query, format, "documents", settings.export_batch_size)
+
+
+@router.get("/batch", response_model=DocumentBatchResponse)
+async def get_documents_batch(
+    response: Response,
+    ids: list[str] = Query(...),
+    db: AsyncSession = Depends(get_primary_read_db, scope="function"),
+):
+    """
+    Lấy nhiều tài liệu theo id trong một truy vấn.
+
+    Truyền `ids` lặp lại (`?ids=a&ids=b`) hoặc phân tách bằng dấu phẩy. Kết quả
+    giữ thứ tự yêu cầu; id không tồn tại được trả về trong `missing`.
+    """
+    document_ids = _parse_ids(ids)
+    result = await db.execute(
+        select(*DOCUMENT_LIST_COLUMNS).where(Document.id.in_(document_ids))
+    )
+    found = {row.id: row._asdict() for row in result}
+
+    return json_response(
+        {
+            "items": [found[i] for i in document_ids if i in found],
+            "missing": [i for i in document_ids if i not in found],
+        },
+        response,
+    )
+
+
+@router.patch("/batch", response_model=DocumentBulkUpdateResponse)
+async def bulk_update_documents(
+    body: DocumentBulkUpdate,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Cập nhật nhiều tài liệu cùng lúc (ví dụ duyệt hàng loạt).
+
+    `changes` được áp dụng cho mọi id bằng một câu UPDATE. Khi đổi `status`, mọi
+    tài liệu phải được phép chuyển từ trạng thái hiện tại sang trạng thái mới.
+    Nếu có id không tồn tại (404) hoặc chuyển trạng thái không hợp lệ (409),
+    không tài liệu nào được cập nhật.
+    """
+    changes = body.changes.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="Không có thay đổi nào")
+    document_ids = list(dict.fromkeys(str(i) for i in body.ids))
+    await set_statement_timeout(db, settings.db_bulk_statement_timeout_ms)
+
+    # Current statuses, locked until commit so the checks below stay true.
+    # Rows are locked in id order, so overlapping bulk updates cannot deadlock
+    result = await db.execute(
+        select(Document.id, Document.status)
+        .where(Document.id.in_(document_ids))
+        .order_by(Document.id)
+        .with_for_update()
+    )
+    old_statuses: dict[str, DocumentStatus] = dict(result.all())
+
+    missing = [i for i in document_ids if i not in old_statuses]
+    if missing:
+        raise HTTPException(
+            status_code=404, detail={"message": "Không tìm thấy tài liệu", "ids": missing}
+        )
+    new_status = changes.get("status")
+    if new_status is not None:
+        invalid = [
+            {"id": document_id, "status": status.value}
+            for document_id, status in old_statuses.items()
+            if status != new_status and new_status not in STATUS_TRANSITIONS[status]
+        ]
+        if invalid:
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "message": f"Không thể chuyển sang trạng thái {new_status.value}",
+                    "documents": invalid,
+                },
+            )
+
+    result = await db.execute(
+        update(Document)
+        .where(Document.id.in_(document_ids))
+        .values(**changes)
+        .returning(*DOCUMENT_LIST_COLUMNS),
+        execution_options={"synchronize_session": False},
+    )
+    documents = result.all()
+
+    status_changed = any(doc.status != old_statuses[doc.id] for doc in documents)
+    if status_changed or "department" in changes:
+        after_commit(db, invalidate_document_stats)
+    stale_answers = [
+        doc.id for doc in documents if _invalidates_chat_answers(old_statuses[doc.id], doc.status)
+    ]
+    if stale_answers:
+        after_commit(db, lambda: chat_cache.invalidate_documents(stale_answers))
+    for doc in documents:
+        await _sync_notebooklm_source(
+            db, doc.id, old_statuses[doc.id], doc.status, set(changes), doc.notebooklm_source_id
+        )
+
+    return json_response(
+        {"updated": len(documents), "items": [doc._asdict() for doc in documents]}, response
     )
 
 
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: str,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_primary_read_db, scope="function"),
 ):
-    """Lấy chi tiết một tài liệu."""
+    """Lấy chi tiết một tài liệu (hỗ trợ `If-None-Match`/304)."""
     result = await db.execute(
         select(Document).where(Document.id == document_id)
     )
@@ -65,6 +371,11 @@ async def get_document(
     if not document:
         raise HTTPException(status_code=404, detail="Không tìm thấy tài liệu")
     
+    if not_modified := conditional_response(
+        request, response, weak_etag(document.id, document.updated_at)
+    ):
+        return not_modified
+
     return DocumentResponse.model_validate(document)
 
 
@@ -78,10 +389,97 @@ async def create_document(
     db.add(document)
     await db.flush()
     await db.refresh(document)
+    after_commit(db, invalidate_document_stats)
     
     return DocumentResponse.model_validate(document)
 
 
+async def _bulk_records(request: Request) -> AsyncIterator[Any]:
+    """Records of a bulk body: a JSON array, or NDJSON read as it streams in."""
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if media_type not in NDJSON_MEDIA_TYPES:
+        try:
+            records = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body không phải JSON hợp lệ")
+        if not isinstance(records, list):
+            raise HTTPException(status_code=400, detail="Body phải là mảng JSON hoặc NDJSON")
+        for record in records:
+            yield record
+        return
+
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+@router.post("/bulk", response_model=BulkDocumentResponse)
+async def bulk_create_documents(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Tạo nhiều tài liệu trong một yêu cầu.
+
+    Body là mảng JSON các `DocumentCreate`, hoặc NDJSON (`application/x-ndjson`,
+    mỗi dòng một tài liệu) để gửi dạng stream. Các dòng hợp lệ được lưu theo
+    từng lô; dòng lỗi được trả về kèm vị trí (`index`, tính từ 0) và lý do.
+    """
+    created = 0
+    errors: list[BulkRowError] = []
+    chunk: list[DocumentCreate] = []
+    chunk_indexes: list[int] = []
+
+    async def insert_chunk() -> None:
+        nonlocal created
+        try:
+            # Savepoint per chunk: a failing chunk does not undo the others
+            async with db.begin_nested():
+                await insert_documents(db, document_rows(chunk))
+        except Exception as exc:
+            logger.exception("Bulk insert of %d documents failed", len(chunk))
+            errors.extend(
+                BulkRowError(index=index, errors=[{"type": "database", "msg": str(exc.__cause__ or exc)}])
+                for index in chunk_indexes
+            )
+        else:
+            created += len(chunk)
+        chunk.clear()
+        chunk_indexes.clear()
+
+    index = 0
+    async for record in _bulk_records(request):
+        try:
+            if isinstance(record, bytes):
+                document = DocumentCreate.model_validate_json(record)
+            else:
+                document = DocumentCreate.model_validate(record)
+        except ValidationError as exc:
+            errors.append(BulkRowError(
+                index=index,
+                errors=exc.errors(include_url=False, include_context=False, include_input=False),
+            ))
+        else:
+            chunk.append(document)
+            chunk_indexes.append(index)
+            if len(chunk) >= settings.bulk_insert_chunk_size:
+                await insert_chunk()
+        index += 1
+    if chunk:
+        await insert_chunk()
+
+    if created:
+        after_commit(db, invalidate_document_stats)
+
+    return BulkDocumentResponse(created=created, failed=len(errors), errors=errors)
+
+
 @router.patch("/{document_id}", response_model=DocumentResponse)
 async def update_document(
     document_id: str,
@@ -97,6 +495,8 @@ async def update_document(
     if not document:
         raise HTTPException(status_code=404, detail="Không tìm thấy tài liệu")
     
+    old_status = document.status
+    old_department = document.department
     update_data = doc_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(document, field, value)
@@ -104,6 +504,20 @@ async def update_document(
     await db.flush()
     await db.refresh(document)
     
+    if _invalidates_chat_answers(old_status, document.status):
+        after_commit(db, lambda: chat_cache.invalidate_documents([document_id]))
+    if document.status != old_status or document.department != old_department:
+        after_commit(db, invalidate_document_stats)
+
+    await _sync_notebooklm_source(
+        db,
+        document_id,
+        old_status,
+        document.status,
+        set(update_data),
+        document.notebooklm_source_id,
+    )
+
     return DocumentResponse.model_validate(document)
 
 
@@ -121,4 +535,162 @@ async def delete_document(
     if not document:
         raise HTTPException(status_code=404, detail="Không tìm thấy tài liệu")
     
+    await enqueue_removal(db, document_id, document.notebooklm_source_id)
+    content_hashes = await db.scalars(
+        select(DocumentVersion.content_hash)
+        .where(
+            DocumentVersion.document_id == document_id,
+            DocumentVersion.content_hash.is_not(None),
+        )
+        .distinct()
+    )
+    await enqueue_collection(db, list(content_hashes))
     await db.delete(document)
+    after_commit(db, lambda: chat_cache.invalidate_documents([document_id]))
+    after_commit(db, lambda: retrieval_index.remove_document(document_id))
+    after_commit(db, invalidate_document_stats)
+
+
+async def _reuse_extraction(db: AsyncSession, version: DocumentVersion) -> None:
+    """Copy the chunks of an already extracted version with the same content."""
+    source_id = (await db.execute(
+        select(DocumentVersion.id)
+        .where(
+            DocumentVersion.content_hash == version.content_hash,
+            DocumentVersion.extracted_at.is_not(None),
+        )
+        .order_by(DocumentVersion.extracted_at.desc())
+        .limit(1)
+    )).scalar()
+    if source_id is None:
+        return
+
+    result = await db.execute(
+        select(
+            DocumentChunk.chunk_index,
+            DocumentChunk.text,
+            DocumentChunk.char_start,
+            DocumentChunk.char_end,
+        ).where(DocumentChunk.version_id == source_id)
+    )
+    chunks = [
+        {"version_id": version.id, "document_id": version.document_id, **row._asdict()}
+        for row in result
+    ]
+    if chunks:
+        await db.execute(insert(DocumentChunk), chunks)
+    version.extracted_at = func.now()
+
+
+@router.get("/{document_id}/versions", response_model=list[DocumentVersionResponse])
+async def list_document_versions(
+    document_id: str,
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+):
+    """Danh sách phiên bản của tài liệu, mới nhất trước."""
+    result = await db.execute(
+        select(DocumentVersion)
+        .where(DocumentVersion.document_id == document_id)
+        .order_by(DocumentVersion.version_number.desc())
+    )
+    return [DocumentVersionResponse.model_validate(v) for v in result.scalars().all()]
+
+
+@router.post("/{document_id}/versions", response_model=DocumentVersionResponse, status_code=201)
+async def create_document_version(
+    document_id: str,
+    request: Request,
+    response: Response,
+    filename: Optional[str] = Query(None, max_length=500),
+    changelog: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Tải lên file của phiên bản mới; body là nội dung file gốc.
+
+    File được lưu theo mã SHA-256 nên nội dung trùng chỉ lưu một lần. Nếu nội
+    dung giống phiên bản mới nhất thì không tạo phiên bản mới và không tải lại
+    lên NotebookLM (trả về 200 kèm phiên bản hiện có). Nội dung đã từng được
+    trích xuất văn bản thì dùng lại các đoạn đã trích xuất.
+    """
+    exists = await db.execute(select(Document.id).where(Document.id == document_id))
+    if exists.scalar() is None:
+        raise HTTPException(status_code=404, detail="Không tìm thấy tài liệu")
+    # Don't hold a pooled connection while the file streams in
+    await db.commit()
+
+    try:
+        blob = await blob_store.put(request.stream())
+    except BlobTooLargeError:
+        raise HTTPException(status_code=413, detail="File vượt quá dung lượng cho phép")
+    if not blob.size_bytes:
+        # Never referenced: uploads of empty files are always rejected
+        await blob_store.delete(blob.content_hash)
+        raise HTTPException(status_code=400, detail="File rỗng")
+
+    # Lock the document so concurrent uploads number their versions in turn
+    result = await db.execute(
+        select(Document).where(Document.id == document_id).with_for_update()
+    )
+    document = result.scalar_one_or_none()
+    if not document:
+        await enqueue_collection(db, [blob.content_hash])
+        await db.commit()
+        raise HTTPException(status_code=404, detail="Không tìm thấy tài liệu")
+
+    latest = (await db.execute(
+        select(DocumentVersion)
+        .where(DocumentVersion.document_id == document_id)
+        .order_by(DocumentVersion.version_number.desc())
+        .limit(1)
+    )).scalar_one_or_none()
+    if latest is not None and latest.content_hash == blob.content_hash:
+        response.status_code = 200
+        return DocumentVersionResponse.model_validate(latest)
+
+    version = DocumentVersion(
+        document_id=document_id,
+        version_number=latest.version_number + 1 if latest else 1,
+        changelog=changelog,
+        content_hash=blob.content_hash,
+    )
+    db.add(version)
+    await db.flush()
+    await _reuse_extraction(db, version)
+
+    document.file_size_bytes = blob.size_bytes
+    if filename:
+        document.file_type = Path(filename).suffix.lstrip(".").lower()[:20] or document.file_type
+    if document.status == DocumentStatus.PUBLISHED:
+        await enqueue_upload(db, document_id)
+        after_commit(db, lambda: chat_cache.invalidate_documents([document_id]))
+
+    await db.flush()
+    await db.refresh(version)
+    return DocumentVersionResponse.model_validate(version)
+
+
+@router.get("/{document_id}/versions/{version_id}/content")
+async def get_document_version_content(
+    document_id: str,
+    version_id: str,
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+):
+    """Tải về file của một phiên bản."""
+    result = await db.execute(
+        select(DocumentVersion.content_hash, Document.title, Document.file_type)
+        .join(Document, Document.id == DocumentVersion.document_id)
+        .where(DocumentVersion.id == version_id, DocumentVersion.document_id == document_id)
+    )
+    row = result.first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Không tìm thấy phiên bản")
+    if not row.content_hash or not blob_store.exists(row.content_hash):
+        raise HTTPException(status_code=404, detail="Phiên bản không có file lưu trữ")
+
+    filename = f"{row.title}.{row.file_type}" if row.file_type else row.title
+    return FileResponse(
+        blob_store.path(row.content_hash),
+        media_type="application/octet-stream",
+        filename=filename,
+    )
@@ -1,47 +1,98 @@
 """Golden Answers API router."""
-from typing import Optional
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import Select, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.config import get_settings
+from app.database import after_commit, get_db, get_export_db, get_primary_read_db, get_read_db
+from app.etag import conditional_response, weak_etag
+from app.export import ExportFormat, export_response
 from app.models.document import Department
 from app.models.golden_answer import GoldenAnswer, TrustLabel
+from app.responses import json_response, projection
 from app.schemas import GoldenAnswerCreate, GoldenAnswerResponse
+from app.services.counters import golden_answer_counters
+from app.services.golden_index import golden_answer_index
 
 router = APIRouter()
+settings = get_settings()
+
+# Columns selected by the list endpoint: exactly what GoldenAnswerResponse exposes
+GOLDEN_ANSWER_LIST_COLUMNS = projection(GoldenAnswer, GoldenAnswerResponse)
+
+
+def _version(answer: Any) -> tuple:
+    """What identifies one version of a golden answer in responses.
+
+    The counters are included because write-behind increments can land
+    within the same ``updated_at`` tick.
+    """
+    return answer.id, answer.updated_at, answer.usage_count, answer.helpful_count
+
+
+def _list_query(
+    department: Optional[Department],
+    trust_label: Optional[TrustLabel],
+    limit: Optional[int] = None,
+) -> Select:
+    """The most used golden answers, optionally filtered."""
+    query = select(*GOLDEN_ANSWER_LIST_COLUMNS)
+    if department:
+        query = query.where(GoldenAnswer.department == department)
+    if trust_label:
+        query = query.where(GoldenAnswer.trust_label == trust_label)
+    query = query.order_by(GoldenAnswer.usage_count.desc())
+    return query.limit(limit) if limit else query
 
 
 @router.get("/", response_model=list[GoldenAnswerResponse])
 async def list_golden_answers(
+    request: Request,
+    response: Response,
     department: Optional[Department] = None,
     trust_label: Optional[TrustLabel] = None,
     limit: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
 ):
-    """Lấy danh sách Golden Answers."""
-    query = select(GoldenAnswer)
-    
-    if department:
-        query = query.where(GoldenAnswer.department == department)
-    if trust_label:
-        query = query.where(GoldenAnswer.trust_label == trust_label)
-    
-    query = query.order_by(GoldenAnswer.usage_count.desc()).limit(limit)
+    """Lấy danh sách Golden Answers (hỗ trợ `If-None-Match`/304)."""
+    result = await db.execute(_list_query(department, trust_label, limit))
+    answers = result.all()
     
-    result = await db.execute(query)
-    answers = result.scalars().all()
-    
-    return [GoldenAnswerResponse.model_validate(a) for a in answers]
+    if not_modified := conditional_response(
+        request, response, weak_etag([_version(a) for a in answers])
+    ):
+        return not_modified
+
+    return json_response([a._asdict() for a in answers], response)
+
+
+@router.get("/export")
+async def export_golden_answers(
+    format: ExportFormat = ExportFormat.NDJSON,
+    department: Optional[Department] = None,
+    trust_label: Optional[TrustLabel] = None,
+    db: AsyncSession = Depends(get_export_db),
+):
+    """Xuất toàn bộ Golden Answers (NDJSON hoặc CSV) dạng stream."""
+    return export_response(
+        db,
+        _list_query(department, trust_label),
+        format,
+        "golden-answers",
+        settings.export_batch_size,
+    )
 
 
 @router.get("/{answer_id}", response_model=GoldenAnswerResponse)
 async def get_golden_answer(
     answer_id: str,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_primary_read_db, scope="function"),
 ):
-    """Lấy chi tiết Golden Answer."""
+    """Lấy chi tiết Golden Answer (hỗ trợ `If-None-Match`/304)."""
     result = await db.execute(
         select(GoldenAnswer).where(GoldenAnswer.id == answer_id)
     )
@@ -50,6 +101,9 @@ async def get_golden_answer(
     if not answer:
         raise HTTPException(status_code=404, detail="Không tìm thấy Golden Answer")
     
+    if not_modified := conditional_response(request, response, weak_etag(_version(answer))):
+        return not_modified
+
     return GoldenAnswerResponse.model_validate(answer)
 
 
@@ -63,6 +117,8 @@ async def create_golden_answer(
     db.add(answer)
     await db.flush()
     await db.refresh(answer)
+    # Only a committed answer may be served from the index
+    after_commit(db, lambda: golden_answer_index.upsert(answer))
     
     return GoldenAnswerResponse.model_validate(answer)
 
@@ -73,15 +129,9 @@ async def mark_helpful(
     db: AsyncSession = Depends(get_db),
 ):
     """Đánh dấu Golden Answer là hữu ích."""
-    result = await db.execute(
-        select(GoldenAnswer).where(GoldenAnswer.id == answer_id)
-    )
-    answer = result.scalar_one_or_none()
+    helpful_count = await golden_answer_counters.increment(db, answer_id, "helpful_count")
     
-    if not answer:
+    if helpful_count is None:
         raise HTTPException(status_code=404, detail="Không tìm thấy Golden Answer")
     
-    answer.helpful_count += 1
-    await db.flush()
-    
-    return {"message": "Đã đánh dấu hữu ích", "helpful_count": answer.helpful_count}
+    return {"message": "Đã đánh dấu hữu ích", "helpful_count": helpful_count}
@@ -0,0 +1,90 @@
+"""Background jobs API router."""
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db, get_primary_read_db
+from app.models.job import Job, JobStatus
+from app.schemas import JobResponse, JobStatsResponse
+from app.services.jobs import job_queue
+
+router = APIRouter()
+
+
+@router.get("/", response_model=list[JobResponse])
+async def list_jobs(
+    status: Optional[JobStatus] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_primary_read_db, scope="function"),
+):
+    """Lấy danh sách job nền, mới nhất trước."""
+    query = select(Job)
+
+    if status:
+        query = query.where(Job.status == status)
+    if kind:
+        query = query.where(Job.kind == kind)
+
+    query = query.order_by(Job.created_at.desc()).limit(limit)
+
+    result = await db.execute(query)
+    return [JobResponse.model_validate(job) for job in result.scalars().all()]
+
+
+@router.get("/stats", response_model=JobStatsResponse)
+async def get_job_stats(
+    db: AsyncSession = Depends(get_primary_read_db, scope="function"),
+):
+    """Số job theo trạng thái và thống kê worker của tiến trình này."""
+    result = await db.execute(select(Job.status, func.count()).group_by(Job.status))
+    stats = job_queue.snapshot()
+
+    return JobStatsResponse(
+        by_status={status.value: count for status, count in result},
+        running_here=stats.running,
+        claimed=stats.claimed,
+        succeeded=stats.succeeded,
+        retried=stats.retried,
+        dead=stats.dead,
+        requeued=stats.requeued,
+    )
+
+
+@router.post("/{job_id}/retry", response_model=JobResponse)
+async def retry_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+):
+    """Chạy lại một job đã hỏng (DEAD) từ đầu."""
+    job = await db.get(Job, job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Không tìm thấy job")
+    if job.status != JobStatus.DEAD:
+        raise HTTPException(status_code=409, detail="Chỉ có thể chạy lại job đã hỏng")
+    if job.dedupe_key is not None:
+        # Only one job per dedupe_key may be QUEUED (ix_jobs_dedupe_key)
+        queued_twin = await db.scalar(
+            select(Job.id).where(
+                Job.dedupe_key == job.dedupe_key,
+                Job.status == JobStatus.QUEUED,
+            )
+        )
+        if queued_twin:
+            raise HTTPException(
+                status_code=409,
+                detail="Đã có job cùng nội dung đang chờ chạy",
+            )
+
+    job.status = JobStatus.QUEUED
+    job.attempts = 0
+    job.run_at = datetime.now(timezone.utc)
+    await db.flush()
+    await db.refresh(job)
+    job_queue.notify()
+
+    return JobResponse.model_validate(job)
@@ -0,0 +1,51 @@
+"""Search API router."""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db
+from app.models.document import Classification, Department, DocumentStatus
+from app.schemas import PassageSearchResponse, SearchKind, SearchResponse
+from app.services import search as search_service
+from app.services.retrieval import passage_citations, retrieval_index
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[SearchKind] = None,
+    department: Optional[Department] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+):
+    """Tìm kiếm toàn văn (không phân biệt dấu) trên tài liệu và Golden Answers."""
+    entities = [kind] if kind else ["document", "golden_answer"]
+    hits = await search_service.search(db, q, entities, department=department, limit=limit)
+    return SearchResponse(query=q, items=hits)
+
+
+@router.get("/passages", response_model=PassageSearchResponse)
+async def search_passages(
+    q: str = Query(..., min_length=1, max_length=500),
+    department: Optional[list[Department]] = Query(None),
+    classification: Optional[list[Classification]] = Query(None),
+    limit: int = Query(5, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+):
+    """
+    Tìm các đoạn nội dung tài liệu liên quan nhất (BM25 + vector, chỉ mục cục bộ).
+
+    Lọc theo một hoặc nhiều `department` / `classification`. Tài liệu đã lưu
+    trữ không được trả về.
+    """
+    passages = retrieval_index.search(
+        q,
+        limit,
+        departments=department,
+        classifications=classification,
+        statuses=[s for s in DocumentStatus if s != DocumentStatus.ARCHIVED],
+    )
+    return PassageSearchResponse(query=q, items=await passage_citations(db, passages))
@@ -1,60 +1,60 @@
 """Statistics API router."""
-from fastapi import APIRouter, Depends
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models.document import Document, DocumentStatus
-from app.schemas import DashboardStats
+from app.database import get_read_db
+from app.schemas import DailyMetricsPoint, DashboardStats, StatsTimeseriesResponse
+from app.services.metrics import daily_metrics, format_change
+from app.services.stats import get_document_counts
 
 router = APIRouter()
 
 
 @router.get("/dashboard", response_model=DashboardStats)
-async def get_dashboard_stats(db: AsyncSession = Depends(get_db)):
-    """Lấy thống kê cho Dashboard."""
+async def get_dashboard_stats():
+    """
+    Lấy thống kê cho Dashboard.
     
-    # Total documents
-    total_result = await db.execute(select(func.count(Document.id)))
-    total_documents = total_result.scalar() or 0
-    
-    # Active documents (Published or Approved)
-    active_result = await db.execute(
-        select(func.count(Document.id)).where(
-            Document.status.in_([DocumentStatus.PUBLISHED, DocumentStatus.APPROVED])
-        )
-    )
-    active_documents = active_result.scalar() or 0
-    
-    # Metadata alerts (documents pending approval)
-    alerts_result = await db.execute(
-        select(func.count(Document.id)).where(
-            Document.status == DocumentStatus.PENDING_APPROVAL
-        )
-    )
-    metadata_alerts = alerts_result.scalar() or 0
+    Số liệu được tính bằng một truy vấn gộp và cache vài giây, nên nhiều
+    Dashboard cùng mở không làm tăng tải database. Các trường `*_change` so
+    với snapshot 7 ngày trước; số câu hỏi AI tính trong 7 ngày gần nhất.
+    """
+    counts = await get_document_counts()
+    trend = await daily_metrics.trend()
+    baseline = trend.baseline
     
     return DashboardStats(
-        total_documents=total_documents,
-        active_documents=active_documents,
-        metadata_alerts=metadata_alerts,
-        ai_queries_count=0,  # TODO: Track from chat logs
-        total_documents_change="+5%",
-        active_documents_change="+12%",
-        ai_queries_change="+18%",
+        total_documents=counts.total,
+        active_documents=counts.active,
+        metadata_alerts=counts.pending_approval,
+        ai_queries_count=trend.ai_queries,
+        total_documents_change=format_change(
+            counts.total, baseline.total_documents if baseline else None
+        ),
+        active_documents_change=format_change(
+            counts.active, baseline.active_documents if baseline else None
+        ),
+        ai_queries_change=format_change(trend.ai_queries, trend.previous_ai_queries),
     )
 
 
 @router.get("/departments")
-async def get_department_stats(db: AsyncSession = Depends(get_db)):
+async def get_department_stats():
     """Lấy thống kê theo phòng ban."""
-    result = await db.execute(
-        select(Document.department, func.count(Document.id))
-        .group_by(Document.department)
-    )
+    counts = await get_document_counts()
     
-    stats = {}
-    for row in result:
-        stats[row[0].value] = row[1]
-    
-    return {"departments": stats}
+    return {"departments": counts.by_department}
+
+
+@router.get("/timeseries", response_model=StatsTimeseriesResponse)
+async def get_stats_timeseries(
+    days: int = Query(30, ge=1, le=365),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+):
+    """Số liệu Dashboard theo từng ngày trong `days` ngày gần nhất."""
+    rows = await daily_metrics.timeseries(db, days)
+
+    return StatsTimeseriesResponse(
+        days=days,
+        items=[DailyMetricsPoint.model_validate(row) for row in rows],
+    )
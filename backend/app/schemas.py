@@ -1,12 +1,14 @@
 """Pydantic schemas for API request/response."""
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Any, Literal, Optional
+from uuid import UUID
 
 from pydantic import BaseModel, Field
 
+from app.models.chat import MessageRole
 from app.models.document import Classification, Department, DocumentStatus
 from app.models.golden_answer import TrustLabel
-
+from app.models.job import JobStatus
 
 # ============== Document Schemas ==============
 
@@ -58,6 +60,53 @@ class DocumentListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    total_is_exact: bool = True
+    next_cursor: Optional[str] = None
+
+
+class DocumentBatchResponse(BaseModel):
+    """Documents fetched by id, in the order requested."""
+    items: list[DocumentResponse]
+    missing: list[str]
+
+
+class DocumentBulkUpdate(BaseModel):
+    """The same changes applied to many documents at once."""
+    ids: list[UUID] = Field(..., min_length=1, max_length=500)
+    changes: DocumentUpdate
+
+
+class DocumentBulkUpdateResponse(BaseModel):
+    """Documents after a bulk update."""
+    updated: int
+    items: list[DocumentResponse]
+
+
+class DocumentVersionResponse(BaseModel):
+    """Schema for document version response."""
+    id: str
+    document_id: str
+    version_number: int
+    changelog: Optional[str]
+    content_hash: Optional[str]
+    extracted_at: Optional[datetime]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class BulkRowError(BaseModel):
+    """Why one row of a bulk upload was rejected."""
+    index: int
+    errors: list[dict[str, Any]]
+
+
+class BulkDocumentResponse(BaseModel):
+    """Result of a bulk document upload."""
+    created: int
+    failed: int
+    errors: list[BulkRowError]
 
 
 # ============== Golden Answer Schemas ==============
@@ -115,6 +164,54 @@ class ChatResponse(BaseModel):
     citations: list[Citation] = []
     conversation_id: str
     suggested_queries: list[str] = []
+    golden_answer_id: Optional[str] = None
+
+
+class ChatMessageResponse(BaseModel):
+    """A stored chat message."""
+    id: str
+    role: MessageRole
+    content: str
+    citations: Optional[list[Citation]] = None
+    golden_answer_id: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ChatHistoryResponse(BaseModel):
+    """One page of a conversation, oldest message first."""
+    conversation_id: str
+    messages: list[ChatMessageResponse]
+    next_cursor: Optional[str] = None
+
+
+# ============== Search Schemas ==============
+
+SearchKind = Literal["document", "golden_answer"]
+
+
+class SearchHit(BaseModel):
+    """A ranked full-text search result."""
+    kind: SearchKind
+    id: str
+    title: str
+    snippet: str
+    department: Department
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    """Search results across documents and golden answers."""
+    query: str
+    items: list[SearchHit]
+
+
+class PassageSearchResponse(BaseModel):
+    """Passages of document content, best match first."""
+    query: str
+    items: list[Citation]
 
 
 # ============== Stats Schemas ==============
@@ -128,3 +225,52 @@ class DashboardStats(BaseModel):
     total_documents_change: str = "+0%"
     active_documents_change: str = "+0%"
     ai_queries_change: str = "+0%"
+
+
+class DailyMetricsPoint(BaseModel):
+    """Dashboard numbers for one day."""
+    day: date
+    total_documents: int
+    active_documents: int
+    pending_approval: int
+    ai_queries: int
+
+    class Config:
+        from_attributes = True
+
+
+class StatsTimeseriesResponse(BaseModel):
+    """Daily dashboard numbers, oldest day first."""
+    days: int
+    items: list[DailyMetricsPoint]
+
+
+# ============== Job Schemas ==============
+
+class JobResponse(BaseModel):
+    """Schema for background job response."""
+    id: str
+    kind: str
+    payload: dict[str, Any]
+    status: JobStatus
+    priority: int
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str]
+    run_at: datetime
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class JobStatsResponse(BaseModel):
+    """Queue depth by status plus this process's worker counters."""
+    by_status: dict[str, int]
+    running_here: dict[str, int]
+    claimed: int
+    succeeded: int
+    retried: int
+    dead: int
+    requeued: int
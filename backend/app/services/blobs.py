@@ -0,0 +1,140 @@
+"""Content-addressed storage for document version files.
+
+A file is stored once under its SHA-256 (``ab/cd/abcd...``) and every version
+with that content references it through ``DocumentVersion.content_hash``, so
+uploading the same file twice, or a version that only changed metadata, costs
+no extra storage and no re-upload. Writes go to a temporary file that is
+hashed while it streams in, then renamed into place, so a blob is never seen
+half-written.
+
+Blobs no longer referenced by any version are deleted by a queued job once
+they are older than a grace period; a concurrent upload of the same content
+refreshes the blob's mtime, which keeps it alive until its version commits.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.document import DocumentVersion
+from app.services.jobs import PRIORITY_LOW, enqueue, job_queue
+
+logger = logging.getLogger(__name__)
+
+COLLECT_BLOBS = "blobs.collect"
+
+settings = get_settings()
+
+
+class BlobTooLargeError(ValueError):
+    """The uploaded content exceeds the configured size limit."""
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    content_hash: str
+    size_bytes: int
+    # False when identical content was already stored
+    created: bool
+
+
+class LocalBlobStore:
+    """Blob store on the local filesystem."""
+
+    def __init__(self, root: str, max_bytes: Optional[int] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def path(self, content_hash: str) -> Path:
+        return self.root / content_hash[:2] / content_hash[2:4] / content_hash
+
+    def exists(self, content_hash: str) -> bool:
+        return self.path(content_hash).is_file()
+
+    async def put(self, chunks: AsyncIterator[bytes]) -> StoredBlob:
+        """Store the streamed content, hashing it on the way in."""
+        tmp_dir = self.root / "tmp"
+        await asyncio.to_thread(tmp_dir.mkdir, parents=True, exist_ok=True)
+        tmp = tmp_dir / uuid4().hex
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp, "wb") as file:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if self.max_bytes is not None and size > self.max_bytes:
+                        raise BlobTooLargeError(f"Content is larger than {self.max_bytes} bytes")
+                    digest.update(chunk)
+                    await asyncio.to_thread(file.write, chunk)
+            content_hash = digest.hexdigest()
+            created = await asyncio.to_thread(self._commit, tmp, self.path(content_hash))
+        finally:
+            tmp.unlink(missing_ok=True)
+        return StoredBlob(content_hash=content_hash, size_bytes=size, created=created)
+
+    @staticmethod
+    def _commit(tmp: Path, target: Path) -> bool:
+        if target.exists():
+            # Deduplicated: mark as recently used so garbage collection waits
+            os.utime(target)
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp, target)
+        return True
+
+    async def delete(self, content_hash: str) -> None:
+        await asyncio.to_thread(self.path(content_hash).unlink, missing_ok=True)
+
+    def age_seconds(self, content_hash: str) -> Optional[float]:
+        try:
+            return time.time() - self.path(content_hash).stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+
+blob_store = LocalBlobStore(settings.blob_storage_path, max_bytes=settings.blob_max_bytes)
+
+
+async def enqueue_collection(db: AsyncSession, content_hashes: list[str]) -> None:
+    """Queue deletion of ``content_hashes`` if nothing references them after the grace period."""
+    if content_hashes:
+        await enqueue(
+            db,
+            COLLECT_BLOBS,
+            {"content_hashes": sorted(set(content_hashes))},
+            priority=PRIORITY_LOW,
+            delay=settings.blob_gc_grace_seconds,
+        )
+
+
+@job_queue.handler(COLLECT_BLOBS)
+async def collect_blobs(db: AsyncSession, payload: dict[str, Any]) -> None:
+    hashes = payload["content_hashes"]
+    result = await db.execute(
+        select(DocumentVersion.content_hash)
+        .where(DocumentVersion.content_hash.in_(hashes))
+        .distinct()
+    )
+    referenced = set(result.scalars())
+    recent = []
+    for content_hash in hashes:
+        age = blob_store.age_seconds(content_hash)
+        if content_hash in referenced or age is None:
+            continue
+        if age < settings.blob_gc_grace_seconds:
+            # Uploaded again meanwhile: check once that upload had time to commit
+            recent.append(content_hash)
+            continue
+        await blob_store.delete(content_hash)
+        logger.info("Deleted unreferenced blob %s", content_hash)
+    await enqueue_collection(db, recent)
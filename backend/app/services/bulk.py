@@ -0,0 +1,50 @@
+"""Bulk document inserts.
+
+On PostgreSQL rows are streamed with asyncpg's binary ``COPY``; elsewhere
+they go through one executemany ``INSERT``, which SQLAlchemy batches into
+multi-row ``VALUES`` statements. Ids are generated here, so no ``RETURNING``
+round trip is needed.
+"""
+import enum
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document, DocumentStatus
+from app.schemas import DocumentCreate
+
+COPY_COLUMNS = ("id", "status", *DocumentCreate.model_fields)
+
+
+def document_rows(documents: list[DocumentCreate]) -> list[dict[str, Any]]:
+    """Column values for new DRAFT documents, ids included."""
+    return [
+        {"id": str(uuid4()), "status": DocumentStatus.DRAFT, **document.model_dump()}
+        for document in documents
+    ]
+
+
+async def insert_documents(db: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    """Insert ``rows`` (from ``document_rows``) in the session's transaction."""
+    if db.get_bind().dialect.name == "postgresql":
+        await _copy_documents(db, rows)
+    else:
+        await db.execute(insert(Document), rows)
+
+
+async def _copy_documents(db: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    # Enum columns store member names (see Enum(Department) on the model)
+    records = [
+        tuple(
+            value.name if isinstance(value, enum.Enum) else value
+            for value in (row[column] for column in COPY_COLUMNS)
+        )
+        for row in rows
+    ]
+    await raw.driver_connection.copy_records_to_table(
+        Document.__tablename__, records=records, columns=list(COPY_COLUMNS)
+    )
@@ -0,0 +1,86 @@
+"""Cache of NotebookLM chat answers.
+
+Entries are keyed on the accent-folded query plus the requested source ids
+and indexed by every document they depend on (cited sources and requested
+sources), so publishing or archiving a document drops exactly the answers
+built on it.
+"""
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Any, Optional
+
+from app.cache import TTLCache
+from app.config import get_settings
+from app.services.notebooklm import Answer
+from app.services.text import tokenize
+
+ChatCacheKey = tuple[str, Optional[tuple[str, ...]]]
+
+
+class ChatAnswerCache(TTLCache):
+    """TTL/LRU answer cache with per-document invalidation."""
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 600.0):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.invalidations = 0
+        self._keys_by_document: defaultdict[str, set[Hashable]] = defaultdict(set)
+
+    @staticmethod
+    def make_key(query: str, source_ids: Optional[list[str]] = None) -> ChatCacheKey:
+        """Normalize so "Tóm tắt chiến lược B2B?" and "tom tat chien luoc b2b" share an entry."""
+        return " ".join(tokenize(query)), tuple(sorted(set(source_ids))) if source_ids else None
+
+    async def get_answer(
+        self,
+        query: str,
+        source_ids: Optional[list[str]],
+        loader: Callable[[], Awaitable[Answer]],
+    ) -> Answer:
+        return await self.get_or_load(self.make_key(query, source_ids), loader)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        super().set(key, value)
+        for document_id in self._documents(key, value):
+            self._keys_by_document[document_id].add(key)
+
+    def on_evict(self, key: Hashable, value: Any) -> None:
+        for document_id in self._documents(key, value):
+            keys = self._keys_by_document.get(document_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_document[document_id]
+
+    def invalidate_documents(self, document_ids: Iterable[str]) -> int:
+        """Drop every answer that cites or was restricted to one of ``document_ids``."""
+        dropped = 0
+        for document_id in document_ids:
+            for key in list(self._keys_by_document.pop(document_id, ())):
+                if self.pop(key, None) is not None:
+                    dropped += 1
+        # Also discard answers still being loaded, whose citations are not known yet
+        self._generation += 1
+        self.invalidations += dropped
+        return dropped
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+        }
+
+    @staticmethod
+    def _documents(key: Hashable, value: Answer) -> frozenset[str]:
+        _, source_ids = key
+        cited = (citation.source_id for citation in value.citations)
+        return frozenset((*cited, *(source_ids or ())))
+
+
+settings = get_settings()
+chat_cache = ChatAnswerCache(
+    maxsize=settings.chat_cache_max_entries,
+    ttl=settings.chat_cache_ttl_seconds,
+)
@@ -0,0 +1,189 @@
+"""Write-behind store for chat history.
+
+``append`` only queues a message in memory; a background task writes queued
+messages in batches (one conversation upsert plus one multi-row message
+insert per batch), so answering a chat query never waits on an INSERT.
+Messages not yet written are still returned by ``pending`` so a history
+read right after a query sees them.
+
+A batch that fails because the database is unreachable is kept and retried
+on the next flush. Any other failure is retried row by row, and a message
+that still cannot be written is logged and dropped, so one bad message never
+holds up the rest of the queue.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Optional
+from uuid import uuid4
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.database import async_session_maker, dialect_insert
+from app.models.chat import ChatMessage, Conversation, MessageRole
+
+logger = logging.getLogger(__name__)
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether ``error`` says the database is unavailable rather than the rows are bad."""
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, (OperationalError, InterfaceError, OSError, TimeoutError))
+
+
+class ChatHistoryWriter:
+    """Buffers chat messages and flushes them in batches."""
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        max_buffer: int = 10_000,
+    ):
+        self.session_maker = session_maker
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self.failed = 0
+        self._buffer: list[dict[str, Any]] = []
+        self._flushing: list[dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def append(
+        self,
+        conversation_id: str,
+        role: MessageRole,
+        content: str,
+        citations: Optional[list[dict[str, Any]]] = None,
+        golden_answer_id: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+    ) -> None:
+        """Queue a message for writing. Never blocks."""
+        if len(self._buffer) >= self.max_buffer:
+            # Shed the oldest message rather than stall the chat path
+            self._buffer.pop(0)
+            self.dropped += 1
+        self._buffer.append({
+            "id": str(uuid4()),
+            "conversation_id": conversation_id,
+            "role": role,
+            "content": content,
+            "citations": citations,
+            "golden_answer_id": golden_answer_id,
+            "created_at": created_at or datetime.now(timezone.utc),
+        })
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def pending(self, conversation_id: str) -> list[dict[str, Any]]:
+        """Messages of ``conversation_id`` that are queued or being written."""
+        return [
+            message for message in (*self._flushing, *self._buffer)
+            if message["conversation_id"] == conversation_id
+        ]
+
+    async def flush(self) -> None:
+        """Write everything queued so far."""
+        async with self._lock:
+            while self._buffer:
+                self._flushing = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+                try:
+                    await self._write(self._flushing)
+                except Exception as e:
+                    if _is_transient(e):
+                        logger.warning("Database unavailable, keeping %d chat messages: %s",
+                                       len(self._flushing), e)
+                        self._requeue(self._flushing)
+                        return
+                    logger.exception("Failed to write %d chat messages, retrying one by one",
+                                     len(self._flushing))
+                    if not await self._write_one_by_one(self._flushing):
+                        return
+                finally:
+                    self._flushing = []
+
+    async def _write_one_by_one(self, messages: list[dict[str, Any]]) -> bool:
+        """Write ``messages`` separately, dropping the ones that fail.
+
+        Returns ``False`` if the database became unavailable; the messages not
+        written yet are queued again.
+        """
+        for position, message in enumerate(messages):
+            try:
+                await self._write([message])
+            except Exception as e:
+                if _is_transient(e):
+                    self._requeue(messages[position:])
+                    return False
+                self.failed += 1
+                logger.error(
+                    "Dropping chat message %s of conversation %s: %s",
+                    message["id"], message["conversation_id"], e,
+                )
+        return True
+
+    def _requeue(self, messages: list[dict[str, Any]]) -> None:
+        """Put ``messages`` back in front for the next flush."""
+        self._buffer[:0] = messages
+        del self._buffer[:max(0, len(self._buffer) - self.max_buffer)]
+
+    async def _write(self, messages: list[dict[str, Any]]) -> None:
+        last_message_at: dict[str, datetime] = {}
+        for message in messages:
+            conversation_id = message["conversation_id"]
+            last_message_at[conversation_id] = max(
+                message["created_at"], last_message_at.get(conversation_id, message["created_at"])
+            )
+
+        async with self.session_maker() as session:
+            await session.execute(
+                dialect_insert(session, Conversation).on_conflict_do_nothing(),
+                [{"id": conversation_id} for conversation_id in last_message_at],
+            )
+            await session.execute(
+                update(Conversation),
+                [{"id": cid, "updated_at": at} for cid, at in last_message_at.items()],
+            )
+            await session.execute(insert(ChatMessage), messages)
+            await session.commit()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name="chat-history-writer")
+
+    async def stop(self) -> None:
+        """Let the background task finish its current batch, then write the rest."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+settings = get_settings()
+chat_history = ChatHistoryWriter(
+    async_session_maker,
+    batch_size=settings.chat_history_batch_size,
+    flush_interval=settings.chat_history_flush_interval_seconds,
+)
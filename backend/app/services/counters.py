@@ -0,0 +1,135 @@
+"""Write-behind counters.
+
+Hot counters (how often a golden answer is used, for example) are summed in
+memory by ``add`` and written periodically, one executemany
+``UPDATE ... SET x = x + :n WHERE id = :id`` per column. The increments are
+relative, so concurrent writers and several API processes never lose counts.
+``increment`` is the single-statement path for callers that need the stored
+value immediately.
+
+Counting is not editing: an ``updated_at`` column is written back unchanged,
+so its ``onupdate`` does not fire and it (and the ETags and index refreshes
+keyed on it) still follows content edits only.
+"""
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, Optional
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.database import async_session_maker
+from app.models.golden_answer import GoldenAnswer
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """Buffered integer counters on the rows of one table."""
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        model: Any,
+        columns: tuple[str, ...],
+        flush_interval: float = 5.0,
+    ):
+        self.session_maker = session_maker
+        self.table = model.__table__
+        self.columns = columns
+        self.flush_interval = flush_interval
+        self._deltas: Counter[tuple[str, str]] = Counter()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    def add(self, row_id: str, column: str, amount: int = 1) -> None:
+        """Count ``amount`` towards ``column`` of row ``row_id``; written on the next flush."""
+        if column not in self.columns:
+            raise ValueError(f"Unknown counter column: {column}")
+        self._deltas[(row_id, column)] += amount
+
+    def _values(self, counter: Any, amount: Any) -> dict[Any, Any]:
+        values = {counter: counter + amount}
+        if "updated_at" in self.table.c:
+            values[self.table.c.updated_at] = self.table.c.updated_at
+        return values
+
+    def pending(self, row_id: str, column: str) -> int:
+        return self._deltas[(row_id, column)]
+
+    async def increment(
+        self,
+        session: AsyncSession,
+        row_id: str,
+        column: str,
+        amount: int = 1,
+    ) -> Optional[int]:
+        """Increment now and return the new value, or ``None`` if the row does not exist."""
+        if column not in self.columns:
+            raise ValueError(f"Unknown counter column: {column}")
+        counter = self.table.c[column]
+        result = await session.execute(
+            update(self.table)
+            .where(self.table.c.id == row_id)
+            .values(self._values(counter, amount))
+            .returning(counter)
+        )
+        value = result.scalar_one_or_none()
+        return None if value is None else value + self.pending(row_id, column)
+
+    async def flush(self) -> None:
+        """Write all buffered increments."""
+        async with self._lock:
+            deltas = {key: amount for key, amount in self._deltas.items() if amount}
+            self._deltas = Counter()
+            if not deltas:
+                return
+
+            by_column: dict[str, list[dict[str, Any]]] = {}
+            for (row_id, column), amount in deltas.items():
+                by_column.setdefault(column, []).append({"row_id": row_id, "amount": amount})
+            try:
+                async with self.session_maker() as session:
+                    for column, params in by_column.items():
+                        counter = self.table.c[column]
+                        await session.execute(
+                            update(self.table)
+                            .where(self.table.c.id == bindparam("row_id"))
+                            .values(self._values(counter, bindparam("amount"))),
+                            params,
+                        )
+                    await session.commit()
+            except Exception:
+                logger.exception("Failed to write %d counter increments", len(deltas))
+                self._deltas.update(deltas)
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run(), name=f"{self.table.name}-counters")
+
+    async def stop(self) -> None:
+        """Let a flush in progress finish, then write the remaining increments."""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+golden_answer_counters = CounterBuffer(
+    async_session_maker,
+    GoldenAnswer,
+    columns=("usage_count", "helpful_count"),
+    flush_interval=get_settings().counter_flush_interval_seconds,
+)
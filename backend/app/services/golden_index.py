@@ -0,0 +1,180 @@
+"""In-memory similarity index over curated golden-answer questions.
+
+Questions are embedded as L2-normalised hashed feature vectors (accent-folded
+words plus character trigrams), so matching a chat query against every
+VERIFIED/POLICY answer is a single matrix-vector product.
+"""
+import json
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.golden_answer import GoldenAnswer, TrustLabel
+from app.services.text import fold_accents, tokenize
+
+INDEXED_TRUST_LABELS = frozenset({TrustLabel.VERIFIED, TrustLabel.POLICY})
+
+
+def embed(text: str, dim: int) -> np.ndarray:
+    """Embed ``text`` as an L2-normalised hashed bag of words and char trigrams."""
+    vector = np.zeros(dim, dtype=np.float32)
+    words = tokenize(text)
+    padded = f" {' '.join(words)} "
+    features = words + [padded[i:i + 3] for i in range(len(padded) - 2)]
+    for feature in features:
+        # crc32 is stable across processes, unlike the salted built-in hash()
+        vector[zlib.crc32(feature.encode()) % dim] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+@dataclass(frozen=True)
+class IndexedAnswer:
+    """Snapshot of the golden-answer fields needed to answer without the database."""
+    id: str
+    question: str
+    answer: str
+    citations: Optional[str]
+    source_document_ids: tuple[str, ...]
+
+    def parsed_citations(self) -> list[dict]:
+        """Return ``citations`` when it holds a JSON list of citation objects."""
+        if not self.citations:
+            return []
+        try:
+            parsed = json.loads(self.citations)
+        except ValueError:
+            return []
+        return [c for c in parsed if isinstance(c, dict)] if isinstance(parsed, list) else []
+
+
+@dataclass(frozen=True)
+class GoldenMatch:
+    answer: IndexedAnswer
+    score: float
+
+
+class GoldenAnswerIndex:
+    """Cosine-similarity index over golden-answer questions, updated row by row."""
+
+    def __init__(self, dim: int = 4096, refresh_interval: float = 60.0):
+        self.dim = dim
+        self.refresh_interval = refresh_interval
+        self._vectors = np.zeros((64, dim), dtype=np.float32)
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._answers: dict[str, IndexedAnswer] = {}
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def upsert(self, answer: GoldenAnswer) -> None:
+        """Index ``answer``, or drop it if its trust label is no longer eligible."""
+        if answer.trust_label not in INDEXED_TRUST_LABELS:
+            self.remove(answer.id)
+            return
+
+        row = self._rows.get(answer.id)
+        if row is None:
+            row = len(self._ids)
+            if row == len(self._vectors):
+                grown = np.zeros((row * 2, self.dim), dtype=np.float32)
+                grown[:row] = self._vectors
+                self._vectors = grown
+            self._ids.append(answer.id)
+            self._rows[answer.id] = row
+
+        self._vectors[row] = embed(answer.question, self.dim)
+        self._answers[answer.id] = IndexedAnswer(
+            id=answer.id,
+            question=answer.question,
+            answer=answer.answer,
+            citations=answer.citations,
+            source_document_ids=tuple(answer.source_document_ids or ()),
+        )
+
+    def remove(self, answer_id: str) -> None:
+        """Remove an answer by moving the last row into its slot."""
+        row = self._rows.pop(answer_id, None)
+        if row is None:
+            return
+        last = len(self._ids) - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._vectors[row] = self._vectors[last]
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+        self._ids.pop()
+        self._vectors[last] = 0.0
+        self._answers.pop(answer_id, None)
+
+    async def refresh(self, db: AsyncSession, force: bool = False) -> None:
+        """Apply golden answers changed or deleted since the last refresh.
+
+        Runs at most once per ``refresh_interval`` unless ``force`` is set, so
+        every worker process converges on edits made through other workers.
+        """
+        now = time.monotonic()
+        if not force and self._refreshed_at and now - self._refreshed_at < self.refresh_interval:
+            return
+        self._refreshed_at = now
+
+        query = select(GoldenAnswer).order_by(GoldenAnswer.updated_at)
+        if self._watermark is not None:
+            query = query.where(GoldenAnswer.updated_at >= self._watermark)
+        result = await db.execute(query)
+        for answer in result.scalars():
+            self.upsert(answer)
+            if self._watermark is None or answer.updated_at > self._watermark:
+                self._watermark = answer.updated_at
+
+        # Deleted rows never show up above the watermark, so indexed ids are
+        # checked against the eligible ones (an id-only scan of a small table)
+        eligible = set((await db.execute(
+            select(GoldenAnswer.id).where(GoldenAnswer.trust_label.in_(INDEXED_TRUST_LABELS))
+        )).scalars())
+        for answer_id in [i for i in self._ids if i not in eligible]:
+            self.remove(answer_id)
+
+    def match(
+        self,
+        query: str,
+        threshold: float,
+        source_ids: Optional[list[str]] = None,
+    ) -> Optional[GoldenMatch]:
+        """Return the closest answer scoring at least ``threshold``.
+
+        When ``source_ids`` is given, only answers citing one of those
+        documents are considered.
+        """
+        if not self._ids or not fold_accents(query).strip():
+            return None
+
+        scores = self._vectors[:len(self._ids)] @ embed(query, self.dim)
+        if scores.max() < threshold:
+            return None
+        allowed = set(source_ids) if source_ids else None
+        for row in np.argsort(scores)[::-1]:
+            score = float(scores[row])
+            if score < threshold:
+                break
+            answer = self._answers[self._ids[row]]
+            if allowed is None or allowed.intersection(answer.source_document_ids):
+                return GoldenMatch(answer=answer, score=score)
+        return None
+
+
+settings = get_settings()
+golden_answer_index = GoldenAnswerIndex(
+    dim=settings.golden_answer_index_dim,
+    refresh_interval=settings.golden_answer_index_refresh_seconds,
+)
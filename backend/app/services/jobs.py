@@ -0,0 +1,331 @@
+"""Durable background job queue on the ``jobs`` table.
+
+Jobs are enqueued in the caller's transaction, so a job exists exactly when
+the change that needs it was committed. Workers claim ready jobs with
+``UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED) RETURNING``, so
+several API processes can share the queue without claiming the same job.
+
+Each job kind has its own concurrency limit and token-bucket rate, and the
+queue only claims what those allow; a bulk publish grows the ``jobs`` table,
+not the load on NotebookLM. Failed jobs are retried with capped, jittered
+exponential backoff and marked ``DEAD`` after ``max_attempts``. Jobs left
+``RUNNING`` by a crashed worker are requeued after the visibility timeout.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from uuid import uuid4
+
+from sqlalchemy import delete, exists, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import aliased
+
+from app.config import get_settings
+from app.database import async_session_maker, dialect_insert
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 100
+PRIORITY_LOW = 200
+
+JobHandler = Callable[[AsyncSession, dict[str, Any]], Awaitable[None]]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: dict[str, Any],
+    priority: int = PRIORITY_NORMAL,
+    dedupe_key: Optional[str] = None,
+    delay: float = 0.0,
+) -> None:
+    """Queue a job in ``db``'s transaction.
+
+    With ``dedupe_key``, nothing is queued while a job with the same key is
+    still waiting to run; the unique index on queued dedupe keys makes that
+    hold under concurrent callers too.
+    """
+    values = {
+        "id": str(uuid4()),
+        "kind": kind,
+        "payload": payload,
+        "priority": priority,
+        "dedupe_key": dedupe_key,
+        "status": JobStatus.QUEUED,
+        "run_at": _now() + timedelta(seconds=delay),
+        "max_attempts": settings.job_max_attempts,
+    }
+    if dedupe_key is None:
+        await db.execute(insert(Job).values(values))
+        return
+    await db.execute(dialect_insert(db, Job).values(values).on_conflict_do_nothing())
+
+
+def _queued_with_key(dedupe_key: Any) -> Any:
+    """Whether a queued job has ``dedupe_key`` (a value or a correlated column)."""
+    waiting = aliased(Job)
+    return exists().where(waiting.dedupe_key == dedupe_key, waiting.status == JobStatus.QUEUED)
+
+
+class RateLimiter:
+    """Token bucket: ``rate`` tokens per second, up to ``burst`` saved up."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def available(self) -> int:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return int(self._tokens)
+
+    def take(self, count: int) -> None:
+        self._tokens -= count
+
+
+@dataclass
+class _Kind:
+    handler: JobHandler
+    concurrency: int
+    limiter: RateLimiter
+    running: int = 0
+
+
+@dataclass
+class QueueStats:
+    claimed: int = 0
+    succeeded: int = 0
+    retried: int = 0
+    dead: int = 0
+    requeued: int = 0
+    running: dict[str, int] = field(default_factory=dict)
+
+
+class JobQueue:
+    """Claims and runs queued jobs with per-kind concurrency and rate limits."""
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        poll_interval: float = 1.0,
+        backoff_base: float = 5.0,
+        backoff_max: float = 600.0,
+        visibility_timeout: float = 300.0,
+    ):
+        self.session_maker = session_maker
+        self.poll_interval = poll_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.visibility_timeout = visibility_timeout
+        self.stats = QueueStats()
+        self._kinds: dict[str, _Kind] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._runner: Optional[asyncio.Task] = None
+        self._last_reap = 0.0
+
+    def register(
+        self,
+        kind: str,
+        handler: JobHandler,
+        concurrency: int = 1,
+        rate_per_second: float = 1.0,
+    ) -> None:
+        self._kinds[kind] = _Kind(
+            handler=handler,
+            concurrency=concurrency,
+            limiter=RateLimiter(rate_per_second, burst=max(1, concurrency)),
+        )
+
+    def handler(
+        self, kind: str, concurrency: int = 1, rate_per_second: float = 1.0
+    ) -> Callable[[JobHandler], JobHandler]:
+        """Decorator form of ``register``."""
+        def decorator(handler: JobHandler) -> JobHandler:
+            self.register(kind, handler, concurrency, rate_per_second)
+            return handler
+
+        return decorator
+
+    def notify(self) -> None:
+        """Check for ready jobs now instead of at the next poll."""
+        self._wakeup.set()
+
+    def backoff(self, attempts: int) -> float:
+        """Full-jitter exponential backoff before retry number ``attempts``."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempts))
+
+    async def run_once(self) -> int:
+        """Claim and start as many ready jobs as the limits allow."""
+        if time.monotonic() - self._last_reap > self.visibility_timeout / 2:
+            await self._requeue_stale()
+
+        started = 0
+        for kind, state in self._kinds.items():
+            capacity = min(state.concurrency - state.running, state.limiter.available())
+            if capacity <= 0:
+                continue
+            jobs = await self._claim(kind, capacity)
+            state.limiter.take(len(jobs))
+            for job in jobs:
+                state.running += 1
+                task = asyncio.create_task(self._execute(job, state), name=f"job-{job.id}")
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            started += len(jobs)
+        return started
+
+    async def _claim(self, kind: str, limit: int) -> list[Job]:
+        ready = (
+            select(Job.id)
+            .where(Job.kind == kind, Job.status == JobStatus.QUEUED, Job.run_at <= _now())
+            .order_by(Job.priority, Job.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with self.session_maker() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id.in_(ready))
+                .values(status=JobStatus.RUNNING, attempts=Job.attempts + 1, locked_at=_now())
+                .returning(Job),
+                execution_options={"synchronize_session": False},
+            )
+            jobs = list(result.scalars())
+            await session.commit()
+        self.stats.claimed += len(jobs)
+        return jobs
+
+    async def _execute(self, job: Job, state: _Kind) -> None:
+        try:
+            async with self.session_maker() as session:
+                try:
+                    await state.handler(session, job.payload)
+                    await session.execute(
+                        update(Job)
+                        .where(Job.id == job.id)
+                        .values(status=JobStatus.SUCCEEDED, locked_at=None, last_error=None)
+                    )
+                    # The handler's writes and the status change commit together
+                    await session.commit()
+                    self.stats.succeeded += 1
+                    return
+                except Exception as exc:
+                    await session.rollback()
+                    error = f"{type(exc).__name__}: {exc}"
+                    logger.warning("Job %s (%s) failed: %s", job.id, job.kind, error)
+
+                if job.attempts >= job.max_attempts:
+                    values: dict[str, Any] = {"status": JobStatus.DEAD}
+                    self.stats.dead += 1
+                    logger.error(
+                        "Job %s (%s) dead after %d attempts", job.id, job.kind, job.attempts
+                    )
+                else:
+                    delay = self.backoff(job.attempts)
+                    values = {
+                        "status": JobStatus.QUEUED,
+                        "run_at": _now() + timedelta(seconds=delay),
+                    }
+                    self.stats.retried += 1
+                try:
+                    await session.execute(
+                        update(Job)
+                        .where(Job.id == job.id)
+                        .values(locked_at=None, last_error=error[:2000], **values)
+                    )
+                    await session.commit()
+                except IntegrityError:
+                    # Queued again while it ran (unique dedupe key); the
+                    # waiting job does the same work
+                    await session.rollback()
+                    await session.execute(delete(Job).where(Job.id == job.id))
+                    await session.commit()
+        except Exception:
+            # Left RUNNING; requeued once the visibility timeout passes
+            logger.exception("Could not record the result of job %s", job.id)
+        finally:
+            state.running -= 1
+            self._wakeup.set()
+
+    async def _requeue_stale(self) -> None:
+        self._last_reap = time.monotonic()
+        cutoff = _now() - timedelta(seconds=self.visibility_timeout)
+        stale = (Job.status == JobStatus.RUNNING, Job.locked_at < cutoff)
+        async with self.session_maker() as session:
+            # A job queued again meanwhile covers its stale twin, which would
+            # otherwise break the one-queued-job-per-dedupe-key index
+            await session.execute(
+                delete(Job).where(*stale, _queued_with_key(Job.dedupe_key)),
+                execution_options={"synchronize_session": False},
+            )
+            result = await session.execute(
+                update(Job)
+                .where(*stale)
+                .values(status=JobStatus.QUEUED, locked_at=None)
+            )
+            await session.commit()
+        if result.rowcount:
+            self.stats.requeued += result.rowcount
+            logger.warning("Requeued %d stale jobs", result.rowcount)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Job queue poll failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        if self._runner is None and self._kinds:
+            self._stopping = False
+            self._runner = asyncio.create_task(self._run(), name="job-queue")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop claiming and give running jobs ``timeout`` seconds to finish."""
+        if self._runner is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._runner
+        self._runner = None
+        if self._tasks:
+            _, unfinished = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in unfinished:
+                task.cancel()
+
+    def snapshot(self) -> QueueStats:
+        self.stats.running = {kind: state.running for kind, state in self._kinds.items()}
+        return self.stats
+
+
+settings = get_settings()
+job_queue = JobQueue(
+    async_session_maker,
+    poll_interval=settings.job_poll_interval_seconds,
+    backoff_base=settings.job_backoff_base_seconds,
+    backoff_max=settings.job_backoff_max_seconds,
+    visibility_timeout=settings.job_visibility_timeout_seconds,
+)
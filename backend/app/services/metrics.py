@@ -0,0 +1,216 @@
+"""Daily dashboard metrics.
+
+A background task upserts today's ``daily_metrics`` row every few seconds.
+Document totals are levels, so they are copied from the cached document
+aggregate (``get_document_counts``) at each flush: they always match the
+database, whoever wrote to it and whether or not the write committed. AI
+queries are activity: the chat path counts them in memory and the flush adds
+the count with ``SET ai_queries = ai_queries + n``, so chat history is only
+scanned once, when the first row is created.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.cache import TTLCache
+from app.config import get_settings
+from app.database import async_session_maker, dialect_insert
+from app.models.chat import ChatMessage, MessageRole
+from app.models.metrics import DailyMetrics
+from app.services.stats import get_document_counts
+
+logger = logging.getLogger(__name__)
+
+TREND_DAYS = 7
+
+_LEVELS = ("total_documents", "active_documents", "pending_approval")
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def format_change(current: int, previous: Optional[int]) -> str:
+    """Relative change as shown on the dashboard, e.g. ``"+12%"``."""
+    if not previous:
+        return "+0%"
+    return f"{round((current - previous) * 100 / previous):+d}%"
+
+
+@dataclass(frozen=True)
+class Trend:
+    """What the dashboard compares current numbers against."""
+    baseline: Optional[DailyMetrics]
+    ai_queries: int
+    previous_ai_queries: int
+
+
+class DailyMetricsRecorder:
+    """Keeps today's snapshot row current: document levels and AI query count."""
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        flush_interval: float = 10.0,
+        cache_ttl: float = 5.0,
+    ):
+        self.session_maker = session_maker
+        self.flush_interval = flush_interval
+        self._ai_queries = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self._trend_cache = TTLCache(maxsize=1, ttl=cache_ttl)
+
+    def record_ai_query(self) -> None:
+        self._ai_queries += 1
+
+    def pending_ai_queries(self) -> int:
+        """AI queries not yet written to the database."""
+        return self._ai_queries
+
+    async def bootstrap(self) -> None:
+        """Create the first row from a full aggregate when the table is empty."""
+        async with self.session_maker() as session:
+            if await session.scalar(select(DailyMetrics.day).limit(1)) is not None:
+                return
+            today = utc_today()
+            counts = await get_document_counts()
+            ai_queries = await session.scalar(
+                select(func.count()).select_from(ChatMessage).where(
+                    ChatMessage.role == MessageRole.USER,
+                    ChatMessage.created_at >= datetime.combine(today, time(), timezone.utc),
+                )
+            )
+            await session.execute(
+                dialect_insert(session, DailyMetrics).values(
+                    day=today,
+                    total_documents=counts.total,
+                    active_documents=counts.active,
+                    pending_approval=counts.pending_approval,
+                    ai_queries=ai_queries,
+                ).on_conflict_do_nothing()
+            )
+            await session.commit()
+
+    async def flush(self) -> None:
+        """Write the current document levels and the new AI queries to today's row."""
+        async with self._lock:
+            ai_queries, self._ai_queries = self._ai_queries, 0
+            try:
+                counts = await get_document_counts()
+                levels = {
+                    "total_documents": counts.total,
+                    "active_documents": counts.active,
+                    "pending_approval": counts.pending_approval,
+                }
+                async with self.session_maker() as session:
+                    upsert = dialect_insert(session, DailyMetrics).values(
+                        day=utc_today(), ai_queries=ai_queries, **levels
+                    )
+                    await session.execute(
+                        upsert.on_conflict_do_update(
+                            index_elements=[DailyMetrics.day],
+                            set_={
+                                **{name: upsert.excluded[name] for name in _LEVELS},
+                                "ai_queries": DailyMetrics.ai_queries + upsert.excluded.ai_queries,
+                                "updated_at": func.now(),
+                            },
+                        )
+                    )
+                    await session.commit()
+                self._trend_cache.clear()
+            except Exception:
+                logger.exception("Failed to write daily metrics")
+                self._ai_queries += ai_queries
+
+    async def trend(self) -> Trend:
+        """Snapshot from ``TREND_DAYS`` ago and AI queries this week vs. the week before."""
+        trend = await self._trend_cache.get_or_load(utc_today(), self._load_trend)
+        # Queries answered since the last flush are not in the rows yet
+        return replace(trend, ai_queries=trend.ai_queries + self.pending_ai_queries())
+
+    async def _load_trend(self) -> Trend:
+        week_ago = utc_today() - timedelta(days=TREND_DAYS)
+        async with self.session_maker() as session:
+            baseline = await session.scalar(
+                select(DailyMetrics)
+                .where(DailyMetrics.day <= week_ago)
+                .order_by(DailyMetrics.day.desc())
+                .limit(1)
+            )
+            ai_queries, previous_ai_queries = (await session.execute(
+                select(
+                    func.coalesce(func.sum(DailyMetrics.ai_queries).filter(DailyMetrics.day > week_ago), 0),
+                    func.coalesce(func.sum(DailyMetrics.ai_queries).filter(DailyMetrics.day <= week_ago), 0),
+                ).where(DailyMetrics.day > week_ago - timedelta(days=TREND_DAYS))
+            )).one()
+        return Trend(baseline, ai_queries, previous_ai_queries)
+
+    async def timeseries(self, session: AsyncSession, days: int) -> list[DailyMetrics]:
+        """One row per day for the last ``days`` days, oldest first.
+
+        Days without a stored row (the API was not running) repeat the
+        previous day's totals with no AI queries.
+        """
+        today = utc_today()
+        first_day = today - timedelta(days=days - 1)
+        result = await session.execute(
+            select(DailyMetrics)
+            .where(DailyMetrics.day >= first_day)
+            .order_by(DailyMetrics.day)
+        )
+        stored = {row.day: row for row in result.scalars()}
+
+        rows: list[DailyMetrics] = []
+        previous: Optional[DailyMetrics] = None
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            row = stored.get(day)
+            if row is None and previous is not None:
+                row = DailyMetrics(
+                    day=day,
+                    ai_queries=0,
+                    **{name: getattr(previous, name) for name in _LEVELS},
+                )
+            if row is not None:
+                rows.append(row)
+                previous = row
+        return rows
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    async def start(self) -> None:
+        try:
+            await self.bootstrap()
+        except Exception:
+            logger.exception("Failed to bootstrap daily metrics")
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run(), name="daily-metrics")
+
+    async def stop(self) -> None:
+        """Let a flush in progress finish, then write the remaining deltas."""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+settings = get_settings()
+daily_metrics = DailyMetricsRecorder(
+    async_session_maker,
+    flush_interval=settings.metrics_flush_interval_seconds,
+    cache_ttl=settings.stats_cache_ttl_seconds,
+)
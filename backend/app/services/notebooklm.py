@@ -0,0 +1,177 @@
+"""NotebookLM answer provider.
+
+Answers are produced as a stream of events (answer tokens, then citations,
+then suggested follow-up queries) so callers can forward them to the client
+as soon as they arrive. ``answer`` collects the stream for non-streaming use.
+The gateway returns a whole answer per query, which is split into token events.
+Without a gateway, ``NOTEBOOKLM_MOCK_ANSWERS`` serves a canned answer for local
+development; otherwise the call raises and chat answers from the local index.
+
+Sources are added and removed through the shared NotebookLM client
+(``src.integrations.notebooklm``), which retries transient gateway failures
+with backoff. Without ``NOTEBOOKLM_API_URL`` those calls raise instead of
+pretending, so no made-up source id is ever stored on a document.
+"""
+import asyncio
+import re
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any, Literal, Optional
+
+from src.integrations.notebooklm import (
+    AsyncNotebookLMClient,
+    NotebookLMError,
+    close_client,
+    get_client,
+)
+
+from app.config import get_settings
+from app.schemas import Citation
+from app.telemetry import observe_upstream
+
+_TOKEN_RE = re.compile(r"\S+\s*")
+
+
+@dataclass(frozen=True)
+class AnswerEvent:
+    """One piece of a streamed answer."""
+    kind: Literal["token", "citation", "suggestions"]
+    data: Any
+
+
+@dataclass
+class Answer:
+    """A complete answer assembled from its events."""
+    text: str = ""
+    citations: list[Citation] = field(default_factory=list)
+    suggested_queries: list[str] = field(default_factory=list)
+
+    def events(self) -> list[AnswerEvent]:
+        """Replay the answer as the events it was built from."""
+        return [
+            AnswerEvent("token", self.text),
+            *(AnswerEvent("citation", citation) for citation in self.citations),
+            AnswerEvent("suggestions", self.suggested_queries),
+        ]
+
+    def add(self, event: AnswerEvent) -> None:
+        if event.kind == "token":
+            self.text += event.data
+        elif event.kind == "citation":
+            self.citations.append(event.data)
+        else:
+            self.suggested_queries = list(event.data)
+
+
+async def stream_answer(
+    query: str,
+    source_ids: Optional[list[str]] = None,
+) -> AsyncIterator[AnswerEvent]:
+    """Stream the answer to ``query`` from NotebookLM."""
+    settings = get_settings()
+    if not _configured() and settings.notebooklm_mock_answers:
+        async for event in _mock_answer(query):
+            yield event
+        return
+
+    client = _client()
+    async with observe_upstream("notebooklm", "answer"):
+        result = await client.query(
+            query, notebook_id=settings.notebooklm_notebook_id, source_ids=source_ids
+        )
+    for token in _TOKEN_RE.findall(result.answer):
+        yield AnswerEvent("token", token)
+    for citation in result.citations:
+        yield AnswerEvent("citation", Citation.model_validate(citation))
+    yield AnswerEvent("suggestions", list(result.suggested_queries))
+
+
+async def _mock_answer(query: str) -> AsyncIterator[AnswerEvent]:
+    """A canned answer for development without a NotebookLM gateway."""
+    text = (
+        f"Đây là câu trả lời mẫu cho: '{query}'. "
+        "Trong phiên bản hoàn chỉnh, câu trả lời sẽ được tạo bởi NotebookLM AI."
+    )
+    for token in _TOKEN_RE.findall(text):
+        yield AnswerEvent("token", token)
+        await asyncio.sleep(0)
+
+    yield AnswerEvent(
+        "citation",
+        Citation(
+            source_id="mock-source-1",
+            source_title="Báo cáo Marketing Q3.pdf",
+            text="Đây là trích dẫn mẫu từ tài liệu nguồn.",
+            page=15,
+        ),
+    )
+    yield AnswerEvent(
+        "suggestions",
+        [
+            "Tóm tắt chiến lược B2B",
+            "Liệt kê đối thủ chính",
+            "Xu hướng thị trường Q4",
+        ],
+    )
+
+
+async def answer(query: str, source_ids: Optional[list[str]] = None) -> Answer:
+    """Return the complete answer to ``query``."""
+    result = Answer()
+    async for event in stream_answer(query, source_ids):
+        result.add(event)
+    return result
+
+
+class NotebookLMNotConfiguredError(RuntimeError):
+    """No NotebookLM gateway is configured."""
+
+
+def _configured() -> bool:
+    settings = get_settings()
+    return bool(settings.notebooklm_api_url and settings.notebooklm_notebook_id)
+
+
+def _client() -> AsyncNotebookLMClient:
+    """The shared NotebookLM client, once a gateway and notebook are configured."""
+    if not _configured():
+        raise NotebookLMNotConfiguredError(
+            "NOTEBOOKLM_API_URL and NOTEBOOKLM_NOTEBOOK_ID must be set to use NotebookLM"
+        )
+    return get_client()
+
+
+async def add_source(
+    title: str,
+    text: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
+) -> str:
+    """Add a document to the notebook as a source and return its source id.
+
+    The gateway answers a repeated ``idempotency_key`` with the source it
+    already created, so a job retried after a lost response adds nothing twice.
+    """
+    client = _client()
+    async with observe_upstream("notebooklm", "add_source"):
+        return await client.add_source(
+            title,
+            text,
+            notebook_id=get_settings().notebooklm_notebook_id,
+            idempotency_key=idempotency_key,
+        )
+
+
+async def delete_source(source_id: str) -> None:
+    """Remove a source from the notebook; one that is already gone counts as removed."""
+    client = _client()
+    async with observe_upstream("notebooklm", "delete_source"):
+        try:
+            await client.delete_source(source_id, notebook_id=get_settings().notebooklm_notebook_id)
+        except NotebookLMError as e:
+            if e.status_code != 404:
+                raise
+
+
+async def close() -> None:
+    """Close the shared client's connection pool."""
+    await close_client()
@@ -0,0 +1,548 @@
+"""Local hybrid retrieval over document chunks, the chat fallback for NotebookLM.
+
+Chunks (written by the extraction pipeline in ``src/services/extraction.py``)
+are indexed in immutable on-disk segments. A segment holds a BM25 inverted
+index (sorted term hashes with CSR postings) and a matrix of L2-normalised
+hashed embeddings (``embed``, as for golden answers), each a ``.npy`` file
+opened with ``mmap_mode="r"``: startup maps the existing segments instead of
+rebuilding them, and the OS only pages in what queries touch.
+
+A refresh appends one segment with the current chunks of every document
+re-extracted since the last refresh; that document's rows in older segments
+are dead from then on. Once there are too many segments, the index is rebuilt
+from the database. Filter metadata (department, classification, status) is
+kept per document in memory and refreshed from ``documents.updated_at``.
+"""
+import asyncio
+import json
+import logging
+import math
+import shutil
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.database import read_session_maker
+from app.models.document import (
+    Classification,
+    Department,
+    Document,
+    DocumentChunk,
+    DocumentStatus,
+    DocumentVersion,
+)
+from app.schemas import Citation
+from app.services.golden_index import embed
+from app.services.text import tokenize
+
+logger = logging.getLogger(__name__)
+
+DEPARTMENT_CODES = {department: code for code, department in enumerate(Department)}
+CLASSIFICATION_CODES = {classification: code for code, classification in enumerate(Classification)}
+STATUS_CODES = {status: code for code, status in enumerate(DocumentStatus)}
+UNKNOWN = -1
+
+# BM25 parameters (the usual defaults) and the weight of BM25 in the hybrid score
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_WEIGHT = 0.5
+# Re-read rows this far behind the watermarks: a transaction's now() can be
+# earlier than rows another transaction committed first
+WATERMARK_LAG_SECONDS = 60.0
+DOCUMENT_BATCH_SIZE = 500
+
+
+def _term_hashes(text: str) -> list[int]:
+    return [zlib.crc32(token.encode()) for token in tokenize(text)]
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite returns naive UTC datetimes
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@dataclass(frozen=True)
+class ChunkRow:
+    chunk_id: str
+    document_id: str
+    text: str
+    created_at: float
+
+
+@dataclass(frozen=True)
+class Passage:
+    chunk_id: str
+    document_id: str
+    score: float
+
+
+class Segment:
+    """One immutable, memory-mapped slice of the index."""
+
+    FILES = (
+        "terms", "indptr", "postings", "frequencies", "lengths",
+        "vectors", "chunk_ids", "document_ids", "created_at",
+    )
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.name = path.name
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in self.FILES}
+        self.terms: np.ndarray = arrays["terms"]
+        self.indptr: np.ndarray = arrays["indptr"]
+        self.postings: np.ndarray = arrays["postings"]
+        self.frequencies: np.ndarray = arrays["frequencies"]
+        self.lengths: np.ndarray = arrays["lengths"]
+        self.vectors: np.ndarray = arrays["vectors"]
+        self.chunk_ids: np.ndarray = arrays["chunk_ids"]
+        self.document_ids: np.ndarray = arrays["document_ids"]
+        self.created_at: np.ndarray = arrays["created_at"]
+        # Set by the index: global document ordinal of each row, and live rows
+        self.row_documents = np.zeros(0, dtype=np.int32)
+        self.alive = np.zeros(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    @classmethod
+    def build(cls, directory: Path, rows: list[ChunkRow], dim: int) -> "Segment":
+        """Write a segment for ``rows`` under ``directory`` and map it."""
+        counts_by_row = [Counter(_term_hashes(row.text)) for row in rows]
+        hashes = np.fromiter(
+            (term for counts in counts_by_row for term in counts), dtype=np.uint32
+        )
+        row_ids = np.fromiter(
+            (i for i, counts in enumerate(counts_by_row) for _ in counts), dtype=np.int32
+        )
+        frequencies = np.fromiter(
+            (count for counts in counts_by_row for count in counts.values()), dtype=np.uint16
+        )
+        order = np.lexsort((row_ids, hashes))
+        terms, starts = np.unique(hashes[order], return_index=True)
+        arrays = {
+            "terms": terms,
+            "indptr": np.append(starts, len(order)).astype(np.int64),
+            "postings": row_ids[order],
+            "frequencies": frequencies[order],
+            "lengths": np.array([counts.total() for counts in counts_by_row], dtype=np.uint32),
+            "vectors": np.stack([embed(row.text, dim) for row in rows]),
+            "chunk_ids": np.array([row.chunk_id for row in rows], dtype="S36"),
+            "document_ids": np.array([row.document_id for row in rows], dtype="S36"),
+            "created_at": np.array([row.created_at for row in rows], dtype=np.float64),
+        }
+        # Written to a temporary directory and renamed, so a crash never leaves
+        # a partial segment behind
+        name = f"{time.time_ns():020d}-{uuid4().hex[:8]}"
+        tmp = directory / f".{name}"
+        tmp.mkdir(parents=True)
+        for file, array in arrays.items():
+            np.save(tmp / f"{file}.npy", array)
+        tmp.rename(directory / name)
+        return cls(directory / name)
+
+    def bm25(self, terms: dict[int, float], average_length: float) -> np.ndarray:
+        """BM25 score of every row for the query ``terms`` (hash -> idf)."""
+        scores = np.zeros(len(self), dtype=np.float32)
+        keys = np.fromiter(terms, dtype=np.uint32)
+        positions = np.searchsorted(self.terms, keys)
+        for term, position in zip(keys, positions):
+            if position >= len(self.terms) or self.terms[position] != term:
+                continue
+            start, end = self.indptr[position], self.indptr[position + 1]
+            rows = self.postings[start:end]
+            frequency = self.frequencies[start:end].astype(np.float32)
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[rows] / average_length)
+            scores[rows] += terms[int(term)] * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return scores
+
+    def document_frequency(self, term: int) -> int:
+        position = np.searchsorted(self.terms, term)
+        if position >= len(self.terms) or self.terms[position] != term:
+            return 0
+        return int(self.indptr[position + 1] - self.indptr[position])
+
+
+class RetrievalIndex:
+    """BM25 + cosine index over the current chunks of every document."""
+
+    _STATE = (
+        "_segments", "_documents", "_departments", "_classifications",
+        "_statuses", "_indexed_at", "_chunk_watermark", "_document_watermark",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        dim: int = 512,
+        refresh_interval: float = 60.0,
+        max_segments: int = 16,
+        session_maker: Optional[async_sessionmaker[AsyncSession]] = None,
+    ):
+        self.path = Path(path)
+        self.dim = dim
+        self.refresh_interval = refresh_interval
+        self.max_segments = max_segments
+        self.session_maker = session_maker or read_session_maker
+        self._segments: list[Segment] = []
+        self._documents: dict[str, int] = {}
+        # Per document ordinal: filter codes, and when its indexed chunks were written
+        self._departments = np.zeros(0, dtype=np.int8)
+        self._classifications = np.zeros(0, dtype=np.int8)
+        self._statuses = np.zeros(0, dtype=np.int8)
+        self._indexed_at = np.zeros(0, dtype=np.float64)
+        self._chunk_watermark = 0.0
+        self._document_watermark = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    def __len__(self) -> int:
+        return sum(int(segment.alive.sum()) for segment in self._segments)
+
+    # ---- documents -------------------------------------------------------
+
+    def _ordinal(self, document_id: str) -> int:
+        ordinal = self._documents.get(document_id)
+        if ordinal is None:
+            ordinal = self._documents[document_id] = len(self._documents)
+            if ordinal == len(self._departments):
+                size = max(64, ordinal * 2)
+                for name, fill in (
+                    ("_departments", UNKNOWN),
+                    ("_classifications", UNKNOWN),
+                    ("_statuses", UNKNOWN),
+                    ("_indexed_at", 0.0),
+                ):
+                    current = getattr(self, name)
+                    grown = np.full(size, fill, dtype=current.dtype)
+                    grown[:len(current)] = current
+                    setattr(self, name, grown)
+        return ordinal
+
+    def set_document(
+        self,
+        document_id: str,
+        department: Department,
+        classification: Classification,
+        status: DocumentStatus,
+    ) -> None:
+        """Update the filter metadata of an indexed document."""
+        ordinal = self._documents.get(document_id)
+        if ordinal is not None:
+            self._departments[ordinal] = DEPARTMENT_CODES[department]
+            self._classifications[ordinal] = CLASSIFICATION_CODES[classification]
+            self._statuses[ordinal] = STATUS_CODES[status]
+
+    def remove_document(self, document_id: str) -> None:
+        """Hide a deleted document from this process's searches right away."""
+        ordinal = self._documents.get(document_id)
+        if ordinal is not None:
+            self._statuses[ordinal] = UNKNOWN
+
+    # ---- segments --------------------------------------------------------
+
+    def _attach(self, segment: Segment) -> None:
+        document_ids = np.asarray(segment.document_ids)
+        unique, inverse = np.unique(document_ids, return_inverse=True)
+        ordinals = np.array([self._ordinal(value.decode()) for value in unique], dtype=np.int32)
+        segment.row_documents = ordinals[inverse.reshape(-1)]
+        latest = np.zeros(len(unique), dtype=np.float64)
+        np.maximum.at(latest, inverse.reshape(-1), np.asarray(segment.created_at))
+        self._indexed_at[ordinals] = np.maximum(self._indexed_at[ordinals], latest)
+        self._segments.append(segment)
+
+    def _mark_live_rows(self) -> None:
+        """A document's rows are live only in the newest segment that holds it."""
+        owner = np.full(len(self._documents), -1, dtype=np.int32)
+        for position, segment in enumerate(self._segments):
+            owner[segment.row_documents] = position
+        for position, segment in enumerate(self._segments):
+            segment.alive = owner[segment.row_documents] == position
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "dim": self.dim,
+            "segments": [segment.name for segment in self._segments],
+            "chunk_watermark": self._chunk_watermark,
+        }
+        tmp = self.path / "manifest.json.tmp"
+        tmp.write_text(json.dumps(manifest))
+        tmp.replace(self.path / "manifest.json")
+
+    def _remove_unlisted(self) -> None:
+        listed = {segment.name for segment in self._segments}
+        for entry in self.path.iterdir():
+            if entry.is_dir() and entry.name not in listed:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def load(self) -> None:
+        """Map the segments listed in the manifest; a mismatched index is dropped."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.path / "manifest.json"
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text())
+            if manifest.get("dim") == self.dim:
+                for name in manifest["segments"]:
+                    self._attach(Segment(self.path / name))
+                self._chunk_watermark = manifest["chunk_watermark"]
+        self._mark_live_rows()
+        self._remove_unlisted()
+
+    # ---- refresh ---------------------------------------------------------
+
+    async def _changed_documents(self, session: AsyncSession) -> tuple[list[str], float]:
+        """Documents whose chunks were rewritten since they were indexed."""
+        since = datetime.fromtimestamp(
+            max(self._chunk_watermark - WATERMARK_LAG_SECONDS, 0), timezone.utc
+        )
+        result = await session.execute(
+            select(DocumentChunk.document_id, func.max(DocumentChunk.created_at))
+            .where(DocumentChunk.created_at > since)
+            .group_by(DocumentChunk.document_id)
+        )
+        changed = []
+        watermark = self._chunk_watermark
+        for document_id, created_at in result:
+            created_at = _timestamp(created_at)
+            watermark = max(watermark, created_at)
+            ordinal = self._documents.get(document_id)
+            if ordinal is None or created_at > self._indexed_at[ordinal]:
+                changed.append(document_id)
+        return changed, watermark
+
+    async def _current_chunks(
+        self, session: AsyncSession, document_ids: list[str]
+    ) -> list[ChunkRow]:
+        """Chunks of each document's newest extracted version, with its metadata."""
+        newest = (
+            select(func.max(DocumentVersion.version_number))
+            .join(DocumentChunk, DocumentChunk.version_id == DocumentVersion.id)
+            .where(DocumentVersion.document_id == DocumentChunk.document_id)
+            .correlate(DocumentChunk)
+            .scalar_subquery()
+        )
+        rows: list[ChunkRow] = []
+        for start in range(0, len(document_ids), DOCUMENT_BATCH_SIZE):
+            batch = document_ids[start:start + DOCUMENT_BATCH_SIZE]
+            result = await session.execute(
+                select(
+                    DocumentChunk.id,
+                    DocumentChunk.document_id,
+                    DocumentChunk.text,
+                    DocumentChunk.created_at,
+                )
+                .join(DocumentVersion, DocumentVersion.id == DocumentChunk.version_id)
+                .where(
+                    DocumentChunk.document_id.in_(batch),
+                    DocumentVersion.version_number == newest,
+                )
+                .order_by(DocumentChunk.document_id, DocumentChunk.chunk_index)
+            )
+            rows.extend(
+                ChunkRow(row.id, row.document_id, row.text, _timestamp(row.created_at))
+                for row in result
+            )
+        return rows
+
+    async def _refresh_documents(self, session: AsyncSession, document_ids: list[str]) -> None:
+        """Load the filter metadata of ``document_ids`` and of documents edited since."""
+        columns = select(
+            Document.id,
+            Document.department,
+            Document.classification,
+            Document.status,
+            Document.updated_at,
+        )
+        if self._document_watermark:
+            since = max(self._document_watermark - WATERMARK_LAG_SECONDS, 0)
+            queries = [
+                columns.where(Document.updated_at > datetime.fromtimestamp(since, timezone.utc)),
+                *(
+                    columns.where(Document.id.in_(document_ids[start:start + DOCUMENT_BATCH_SIZE]))
+                    for start in range(0, len(document_ids), DOCUMENT_BATCH_SIZE)
+                ),
+            ]
+        else:
+            queries = [columns.where(Document.id.in_(select(DocumentChunk.document_id)))]
+        for query in queries:
+            for row in await session.execute(query):
+                self.set_document(row.id, row.department, row.classification, row.status)
+                if row.updated_at is not None:
+                    self._document_watermark = max(
+                        self._document_watermark, _timestamp(row.updated_at)
+                    )
+
+    async def _refresh(self) -> int:
+        async with self.session_maker() as session:
+            document_ids, watermark = await self._changed_documents(session)
+            rows = await self._current_chunks(session, document_ids) if document_ids else []
+            if rows:
+                # Tokenizing and embedding is CPU work; keep it off the event loop
+                segment = await asyncio.to_thread(Segment.build, self.path, rows, self.dim)
+                self._attach(segment)
+                self._mark_live_rows()
+            self._chunk_watermark = watermark
+            await self._refresh_documents(session, document_ids)
+        return len(rows)
+
+    async def refresh(self, rebuild: bool = False) -> int:
+        """Index chunks written since the last refresh; returns the rows added.
+
+        A rebuild (forced, or once there are ``max_segments`` segments) indexes
+        every document into a fresh index, which replaces this one when ready,
+        so searches keep working meanwhile.
+        """
+        async with self._lock:
+            if not rebuild and len(self._segments) < self.max_segments:
+                added = await self._refresh()
+            else:
+                fresh = RetrievalIndex(
+                    str(self.path), self.dim, session_maker=self.session_maker
+                )
+                added = await fresh._refresh()
+                for name in self._STATE:
+                    setattr(self, name, getattr(fresh, name))
+            self._write_manifest()
+            self._remove_unlisted()
+            return added
+
+    # ---- search ----------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        departments: Optional[list[Department]] = None,
+        classifications: Optional[list[Classification]] = None,
+        statuses: Optional[list[DocumentStatus]] = None,
+        document_ids: Optional[list[str]] = None,
+    ) -> list[Passage]:
+        """Best ``limit`` passages for ``query`` among documents passing the filters.
+
+        Each row scores ``BM25_WEIGHT`` times its BM25 score relative to the
+        best match, plus the rest times its cosine similarity to the query.
+        """
+        terms = set(_term_hashes(query))
+        if not terms or not self._segments:
+            return []
+
+        documents = self._statuses[:len(self._documents)] != UNKNOWN
+        if departments:
+            codes = [DEPARTMENT_CODES[d] for d in departments]
+            documents &= np.isin(self._departments[:len(self._documents)], codes)
+        if classifications:
+            codes = [CLASSIFICATION_CODES[c] for c in classifications]
+            documents &= np.isin(self._classifications[:len(self._documents)], codes)
+        if statuses:
+            codes = [STATUS_CODES[s] for s in statuses]
+            documents &= np.isin(self._statuses[:len(self._documents)], codes)
+        if document_ids is not None:
+            allowed = np.zeros_like(documents)
+            allowed[[self._documents[d] for d in document_ids if d in self._documents]] = True
+            documents &= allowed
+
+        # Corpus statistics include dead rows; they are replaced one for one,
+        # so the skew is small until the next rebuild
+        total = sum(len(segment) for segment in self._segments)
+        average_length = max(
+            sum(float(segment.lengths.sum()) for segment in self._segments) / total, 1.0
+        )
+        idf = {}
+        for term in terms:
+            frequency = sum(segment.document_frequency(term) for segment in self._segments)
+            if frequency:
+                idf[term] = math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+        vector = embed(query, self.dim)
+
+        candidates: list[tuple[float, Segment, int]] = []
+        best_bm25 = 0.0
+        scored = []
+        for segment in self._segments:
+            rows = np.flatnonzero(segment.alive & documents[segment.row_documents])
+            if not len(rows):
+                continue
+            bm25 = segment.bm25(idf, average_length)[rows] if idf else np.zeros(len(rows))
+            best_bm25 = max(best_bm25, float(bm25.max()))
+            scored.append((segment, rows, bm25, segment.vectors[rows] @ vector))
+        for segment, rows, bm25, cosine in scored:
+            lexical = bm25 / best_bm25 if best_bm25 else bm25
+            scores = BM25_WEIGHT * lexical + (1 - BM25_WEIGHT) * cosine
+            top = np.argsort(scores)[::-1][:limit]
+            candidates.extend((float(scores[i]), segment, int(rows[i])) for i in top)
+
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        return [
+            Passage(
+                chunk_id=segment.chunk_ids[row].decode(),
+                document_id=segment.document_ids[row].decode(),
+                score=score,
+            )
+            for score, segment, row in candidates[:limit]
+            if score > 0
+        ]
+
+    # ---- background refresh ----------------------------------------------
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Retrieval index refresh failed")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is None:
+            self.load()
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run(), name="retrieval-index")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+
+async def passage_citations(
+    db: AsyncSession, passages: list[Passage], excerpt_length: Optional[int] = None
+) -> list[Citation]:
+    """Citations for ``passages``, in order; chunks deleted since indexing are dropped."""
+    if not passages:
+        return []
+    result = await db.execute(
+        select(DocumentChunk.id, DocumentChunk.text, Document.id, Document.title)
+        .join(Document, Document.id == DocumentChunk.document_id)
+        .where(DocumentChunk.id.in_([passage.chunk_id for passage in passages]))
+    )
+    rows = {row[0]: row for row in result}
+    return [
+        Citation(source_id=document_id, source_title=title, text=text[:excerpt_length])
+        for _, text, document_id, title in (
+            rows[p.chunk_id] for p in passages if p.chunk_id in rows
+        )
+    ]
+
+
+settings = get_settings()
+retrieval_index = RetrievalIndex(
+    path=settings.retrieval_index_path,
+    dim=settings.retrieval_index_dim,
+    refresh_interval=settings.retrieval_index_refresh_seconds,
+    max_segments=settings.retrieval_index_max_segments,
+)
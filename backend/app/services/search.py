@@ -0,0 +1,141 @@
+"""Full-text search over documents and golden answers.
+
+PostgreSQL uses the ``search_vector`` generated columns and trigram indexes
+from migration 0002; SQLite uses the ``search_fts`` FTS5 table from the same
+migration. Both sides index accent-folded text and queries are folded with
+``fold_accents``, so "chien luoc" matches "chiến lược".
+"""
+from typing import Optional
+
+from sqlalchemy import ColumnElement, column, false, func, literal_column, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Department, Document
+from app.models.golden_answer import GoldenAnswer
+from app.schemas import SearchHit
+from app.services.text import fold_accents, tokenize
+
+SNIPPET_LENGTH = 200
+
+_TS_CONFIG = literal_column("'simple'::regconfig")
+
+search_fts = table(
+    "search_fts",
+    column("entity"),
+    column("ref_id"),
+    column("title"),
+    column("body"),
+)
+
+# entity label -> (model, title column, body column)
+_ENTITIES = {
+    "document": (Document, Document.title, Document.description),
+    "golden_answer": (GoldenAnswer, GoldenAnswer.question, GoldenAnswer.answer),
+}
+
+
+def _tsquery(term: str) -> Optional[ColumnElement]:
+    """Build a prefix tsquery ("chien:* & luoc:*") from the folded search term."""
+    tokens = tokenize(term)
+    if not tokens:
+        return None
+    return func.to_tsquery(_TS_CONFIG, " & ".join(f"{token}:*" for token in tokens))
+
+
+def _fts_query(term: str) -> Optional[str]:
+    """Build an FTS5 prefix query ('"chien"* "luoc"*') from the folded search term."""
+    tokens = tokenize(term)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _search_vector(model: type) -> ColumnElement:
+    return literal_column(f"{model.__tablename__}.search_vector")
+
+
+def _postgresql_match(entity: str, term: str) -> ColumnElement[bool]:
+    model, title, _ = _ENTITIES[entity]
+    tsquery = _tsquery(term)
+    if tsquery is None:
+        return false()
+    fuzzy = func.f_unaccent(func.lower(title)).op("%")(fold_accents(term))
+    return _search_vector(model).op("@@")(tsquery) | fuzzy
+
+
+def _sqlite_match(entity: str, term: str) -> ColumnElement[bool]:
+    model, _, _ = _ENTITIES[entity]
+    fts_query = _fts_query(term)
+    if fts_query is None:
+        return false()
+    matching_ids = select(search_fts.c.ref_id).where(
+        search_fts.c.entity == entity,
+        literal_column("search_fts").op("MATCH")(fts_query),
+    )
+    return model.id.in_(matching_ids)
+
+
+def match_clause(entity: str, term: str, dialect_name: str) -> ColumnElement[bool]:
+    """WHERE clause selecting rows of ``entity`` that match ``term``."""
+    if dialect_name == "postgresql":
+        return _postgresql_match(entity, term)
+    return _sqlite_match(entity, term)
+
+
+async def search(
+    db: AsyncSession,
+    term: str,
+    entities: list[str],
+    department: Optional[Department] = None,
+    limit: int = 20,
+) -> list[SearchHit]:
+    """Return the best ``limit`` hits across ``entities``, highest rank first."""
+    dialect_name = db.get_bind().dialect.name
+    hits: list[SearchHit] = []
+
+    for entity in entities:
+        model, title, body = _ENTITIES[entity]
+        if dialect_name == "postgresql":
+            tsquery = _tsquery(term)
+            if tsquery is None:
+                continue
+            rank = func.ts_rank_cd(_search_vector(model), tsquery) + func.similarity(
+                func.f_unaccent(func.lower(title)), fold_accents(term)
+            )
+            query = select(model.id, title, body, model.department, rank.label("rank")).where(
+                _postgresql_match(entity, term)
+            )
+        else:
+            fts_query = _fts_query(term)
+            if fts_query is None:
+                continue
+            # bm25() is lower-is-better; negate so every dialect sorts descending
+            rank = -func.bm25(literal_column("search_fts"))
+            query = (
+                select(model.id, title, body, model.department, rank.label("rank"))
+                .join(search_fts, search_fts.c.ref_id == model.id)
+                .where(
+                    search_fts.c.entity == entity,
+                    literal_column("search_fts").op("MATCH")(fts_query),
+                )
+            )
+
+        if department:
+            query = query.where(model.department == department)
+        query = query.order_by(literal_column("rank").desc()).limit(limit)
+
+        result = await db.execute(query)
+        hits.extend(
+            SearchHit(
+                kind=entity,
+                id=row[0],
+                title=row[1],
+                snippet=(row[2] or "")[:SNIPPET_LENGTH],
+                department=row[3],
+                rank=float(row[4] or 0.0),
+            )
+            for row in result
+        )
+
+    hits.sort(key=lambda hit: hit.rank, reverse=True)
+    return hits[:limit]
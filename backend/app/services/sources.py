@@ -0,0 +1,103 @@
+"""NotebookLM source jobs.
+
+Publishing a document queues an upload of it as a NotebookLM source (or a
+replacement of its current source, when it is republished); archiving or
+deleting it queues the removal. The jobs run on ``job_queue`` under the
+NotebookLM concurrency and rate limits, outside the request that changed the
+document.
+
+Uploads carry an idempotency key made from the document id and its
+``updated_at``, so a retry after a lost response gets the source the first
+attempt created. No database connection is held while NotebookLM is called:
+the document is read, the source added, and the id written in a second
+short transaction that re-checks the document is still published (the
+sources it replaces or no longer needs are removed by removal jobs). Without
+a configured gateway the jobs fail and are retried until they are marked
+dead; nothing is written to the document.
+"""
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.document import Document, DocumentStatus
+from app.services import notebooklm
+from app.services.jobs import PRIORITY_NORMAL, enqueue, job_queue
+
+UPLOAD_SOURCE = "notebooklm.upload_source"
+REMOVE_SOURCE = "notebooklm.remove_source"
+
+settings = get_settings()
+
+
+async def enqueue_upload(
+    db: AsyncSession,
+    document_id: str,
+    priority: int = PRIORITY_NORMAL,
+) -> None:
+    await enqueue(
+        db,
+        UPLOAD_SOURCE,
+        {"document_id": document_id},
+        priority=priority,
+        dedupe_key=f"{UPLOAD_SOURCE}:{document_id}",
+    )
+    job_queue.notify()
+
+
+async def enqueue_removal(
+    db: AsyncSession,
+    document_id: str,
+    source_id: Optional[str],
+    priority: int = PRIORITY_NORMAL,
+) -> None:
+    if not source_id:
+        return
+    await enqueue(
+        db,
+        REMOVE_SOURCE,
+        {"document_id": document_id, "source_id": source_id},
+        priority=priority,
+    )
+    job_queue.notify()
+
+
+@job_queue.handler(
+    UPLOAD_SOURCE,
+    concurrency=settings.notebooklm_upload_concurrency,
+    rate_per_second=settings.notebooklm_upload_rate_per_second,
+)
+async def upload_source(db: AsyncSession, payload: dict[str, Any]) -> None:
+    document = await db.get(Document, payload["document_id"])
+    if document is None or document.status != DocumentStatus.PUBLISHED:
+        # Unpublished or deleted since the job was queued
+        return
+    title, description = document.title, document.description
+    idempotency_key = f"{document.id}:{document.updated_at.isoformat()}"
+    # Release the connection while NotebookLM adds the source
+    await db.commit()
+
+    source_id = await notebooklm.add_source(title, description, idempotency_key=idempotency_key)
+
+    document = await db.get(
+        Document, payload["document_id"], populate_existing=True, with_for_update=True
+    )
+    if document is None or document.status != DocumentStatus.PUBLISHED:
+        # Unpublished or deleted while the source was being added
+        await enqueue_removal(db, payload["document_id"], source_id)
+        return
+    if document.notebooklm_source_id and document.notebooklm_source_id != source_id:
+        await enqueue_removal(db, document.id, document.notebooklm_source_id)
+    document.notebooklm_source_id = source_id
+
+
+@job_queue.handler(
+    REMOVE_SOURCE,
+    concurrency=settings.notebooklm_upload_concurrency,
+    rate_per_second=settings.notebooklm_upload_rate_per_second,
+)
+async def remove_source(db: AsyncSession, payload: dict[str, Any]) -> None:
+    await notebooklm.delete_source(payload["source_id"])
+    document = await db.get(Document, payload["document_id"])
+    if document is not None and document.notebooklm_source_id == payload["source_id"]:
+        document.notebooklm_source_id = None
@@ -0,0 +1,63 @@
+"""Document statistics for the dashboard.
+
+All counts come from one aggregate over ``documents`` (``count(*) FILTER
+(WHERE ...)`` per status and department) and are cached for a few seconds,
+so dashboards polling from many tabs share a single query. Document writes
+call ``invalidate_document_stats`` so changes show up on the next poll.
+"""
+from dataclasses import dataclass
+
+from sqlalchemy import func, select
+
+from app.cache import TTLCache
+from app.config import get_settings
+from app.database import read_session_maker
+from app.models.document import Department, Document, DocumentStatus
+
+ACTIVE_STATUSES = (DocumentStatus.PUBLISHED, DocumentStatus.APPROVED)
+
+_DOCUMENT_COUNTS_KEY = "documents"
+
+
+@dataclass(frozen=True)
+class DocumentCounts:
+    """Document totals for one point in time."""
+    total: int
+    active: int
+    pending_approval: int
+    by_department: dict[str, int]
+
+
+async def _load_document_counts() -> DocumentCounts:
+    departments = list(Department)
+    query = select(
+        func.count(),
+        func.count().filter(Document.status.in_(ACTIVE_STATUSES)),
+        func.count().filter(Document.status == DocumentStatus.PENDING_APPROVAL),
+        *(func.count().filter(Document.department == department) for department in departments),
+    ).select_from(Document)
+
+    # Own session: the load is shared by every coalesced caller, so it must
+    # not depend on the request session of whichever caller started it
+    async with read_session_maker() as session:
+        total, active, pending, *per_department = (await session.execute(query)).one()
+
+    return DocumentCounts(
+        total=total,
+        active=active,
+        pending_approval=pending,
+        by_department={
+            department.value: count for department, count in zip(departments, per_department)
+        },
+    )
+
+
+async def get_document_counts() -> DocumentCounts:
+    return await _stats_cache.get_or_load(_DOCUMENT_COUNTS_KEY, _load_document_counts)
+
+
+def invalidate_document_stats() -> None:
+    _stats_cache.clear()
+
+
+_stats_cache = TTLCache(maxsize=1, ttl=get_settings().stats_cache_ttl_seconds)
@@ -0,0 +1,18 @@
+"""Text normalization helpers for Vietnamese search and matching."""
+import re
+import unicodedata
+
+# "đ" is a separate letter, not "d" plus a combining mark, so NFD leaves it alone.
+_VIETNAMESE_D = str.maketrans({"đ": "d", "Đ": "D"})
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def fold_accents(text: str) -> str:
+    """Lowercase ``text`` and strip diacritics: "Chiến lược" -> "chien luoc"."""
+    decomposed = unicodedata.normalize("NFD", text.translate(_VIETNAMESE_D))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str) -> list[str]:
+    """Split accent-folded ``text`` into word tokens."""
+    return _TOKEN_RE.findall(fold_accents(text))
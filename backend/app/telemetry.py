@@ -0,0 +1,380 @@
+"""Request, SQL and upstream instrumentation, exposed on ``/metrics``.
+
+``TelemetryMiddleware`` times every request per route template and counts
+the SQL statements (and time spent in them) that the request executed. SQL
+is attributed through a context variable set for the request, so statements
+run by background workers are only counted in the engine-wide histograms.
+Metrics are kept in process and rendered in the Prometheus text format; there
+is no client library dependency.
+
+With ``slow_request_threshold_ms`` set, requests slower than the threshold are
+logged together with the statements they executed.
+"""
+import asyncio
+import bisect
+import logging
+import time
+from collections.abc import AsyncIterator, Callable, Sequence
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """A gauge set directly, or read from ``collect`` at render time."""
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Callable[[], dict[Labels, float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[Labels, float] = {}
+        self._collect = collect
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def render(self) -> list[str]:
+        values = self._collect() if self._collect else self._values
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> (per-bucket counts, the last one for +Inf; sum)
+        self._series: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Time to serve a request, until the last body byte is sent.",
+    ("method", "route", "status"),
+))
+http_requests_in_progress = registry.register(Gauge(
+    "http_requests_in_progress", "Requests being served.", ("method",)
+))
+http_request_db_queries = registry.register(Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+))
+http_request_db_duration = registry.register(Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing SQL per request.",
+    ("method", "route"),
+))
+db_query_duration = registry.register(Histogram(
+    "db_query_duration_seconds",
+    "Duration of every SQL statement, including background work.",
+    ("engine",),
+))
+db_query_errors = registry.register(Counter(
+    "db_query_errors_total", "SQL statements that raised.", ("engine",)
+))
+db_pool_checkout_wait = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    ("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0),
+))
+upstream_request_duration = registry.register(Histogram(
+    "upstream_request_duration_seconds",
+    "Latency of calls to external services.",
+    ("service", "operation", "outcome"),
+))
+
+# Engine name -> engine; the pool is looked up on each render since
+# ``dispose()`` replaces it
+_engines: dict[str, Any] = {}
+
+
+def _collect_pools() -> dict[Labels, float]:
+    values: dict[Labels, float] = {}
+    for name, sync_engine in _engines.items():
+        pool = sync_engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        values[(name, "checked_out")] = pool.checkedout()
+        values[(name, "idle")] = pool.checkedin()
+        values[(name, "overflow")] = max(0, pool.overflow())
+    return values
+
+
+registry.register(Gauge(
+    "db_pool_connections",
+    "Pooled connections by state.",
+    ("engine", "state"),
+    collect=_collect_pools,
+))
+
+
+@dataclass
+class RequestStats:
+    """SQL executed on behalf of the current request."""
+    queries: int = 0
+    db_seconds: float = 0.0
+    # (seconds, statement); only collected when the slow-request log is on
+    statements: Optional[list[tuple[float, str]]] = None
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started, self.logging_name or "")
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Time every statement ``engine`` runs and attribute it to the current request."""
+    sync_engine = engine.sync_engine
+    _engines[name] = sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        db_query_duration.observe(elapsed, name)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            if stats.statements is not None:
+                stats.statements.append((elapsed, statement))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
+        db_query_errors.inc(name)
+
+
+@asynccontextmanager
+async def observe_upstream(service: str, operation: str) -> AsyncIterator[None]:
+    """Record the latency and outcome of a call to ``service``."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    except (GeneratorExit, asyncio.CancelledError):
+        # A streaming caller stopped reading early, or the request was cancelled
+        outcome = "cancelled"
+        raise
+    finally:
+        upstream_request_duration.observe(time.perf_counter() - started, service, operation, outcome)
+
+
+def _route_template(scope: dict) -> str:
+    """The matched route as a template (``/api/documents/{document_id}``).
+
+    Labelling by template rather than raw path keeps label cardinality
+    bounded. It is rebuilt from the path and its parameters because routes of
+    included routers only know their path relative to the router prefix.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    params = {str(value): name for name, value in (scope.get("path_params") or {}).items()}
+    if not params:
+        return scope["path"]
+    return "/".join(
+        f"{{{params[segment]}}}" if segment in params else segment
+        for segment in scope["path"].split("/")
+    )
+
+
+class TelemetryMiddleware:
+    """ASGI middleware recording per-route latency and SQL usage."""
+
+    def __init__(
+        self,
+        app: Any,
+        slow_request_threshold_ms: float = 0.0,
+        slow_request_max_statements: int = 20,
+    ):
+        self.app = app
+        self.slow_request_threshold = slow_request_threshold_ms / 1000
+        self.slow_request_max_statements = slow_request_max_statements
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+        stats = RequestStats(statements=[] if self.slow_request_threshold else None)
+        token = _request_stats.set(stats)
+
+        async def send_wrapper(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_requests_in_progress.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            http_requests_in_progress.dec(method)
+            route = _route_template(scope)
+            http_request_duration.observe(elapsed, method, route, status)
+            http_request_db_queries.observe(stats.queries, method, route)
+            http_request_db_duration.observe(stats.db_seconds, method, route)
+            if self.slow_request_threshold and elapsed >= self.slow_request_threshold:
+                self._log_slow_request(scope, status, elapsed, stats)
+
+    def _log_slow_request(
+        self, scope: dict, status: str, elapsed: float, stats: RequestStats
+    ) -> None:
+        statements = stats.statements or []
+        lines = [
+            f"  {seconds * 1000:8.1f} ms  {' '.join(statement.split())[:500]}"
+            for seconds, statement in statements[: self.slow_request_max_statements]
+        ]
+        if len(statements) > self.slow_request_max_statements:
+            lines.append(f"  ... {len(statements) - self.slow_request_max_statements} more")
+        logger.warning(
+            "Slow request %s %s -> %s: %.0f ms, %d SQL statements (%.0f ms)\n%s",
+            scope["method"],
+            scope["path"],
+            status,
+            elapsed * 1000,
+            stats.queries,
+            stats.db_seconds * 1000,
+            "\n".join(lines),
+        )
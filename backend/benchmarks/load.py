@@ -0,0 +1,482 @@
+"""Load and latency benchmark for every API endpoint.
+
+Each scenario drives one endpoint with ``--concurrency`` concurrent clients
+for ``--duration`` seconds and records per-request latency. Results are
+written as JSON (p50/p95/p99 latency, throughput, errors and SQL statements
+per request) and can be compared against a stored baseline:
+
+    cd backend
+    alembic upgrade head
+    python -m benchmarks.load --seed-documents 10000 --output baseline.json
+    # ... change something ...
+    python -m benchmarks.load --baseline baseline.json --output current.json
+
+The progress table goes to stderr, so without ``--output`` stdout carries
+only the JSON report.
+
+By default the app runs in-process (ASGI transport, lifespan included), which
+also lets the harness count the SQL statements each request executes. With
+``--url`` it drives a running server instead; statement counts are then
+unavailable. Background work (write-behind flushes, the job queue) runs in
+its own tasks and is not attributed to requests.
+
+Exits with status 1 when ``--baseline`` is given and a scenario regressed.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager, redirect_stdout
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from itertools import count
+from typing import Any, Optional
+
+import httpx
+
+# SQL statements executed by the current request (in-process runs only)
+_statements: contextvars.ContextVar[Optional[list[int]]] = contextvars.ContextVar(
+    "benchmark_statements", default=None
+)
+
+RequestSpec = tuple[str, str, dict[str, Any]]
+
+
+@dataclass
+class Fixtures:
+    """Ids sampled from the seeded data, used to build request paths."""
+    document_ids: list[str]
+    golden_answer_ids: list[str]
+    job_ids: list[str]
+    conversation_ids: list[str] = field(default_factory=list)
+    created_ids: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[Fixtures, random.Random, int], RequestSpec]
+    # Statuses that count as success besides 2xx/304 (e.g. 409 from job retry)
+    expected: frozenset[int] = frozenset()
+
+
+def _document_payload(i: int) -> dict[str, Any]:
+    return {
+        "title": f"Benchmark document {i}",
+        "description": "Tài liệu tạo bởi benchmark",
+        "department": "MARCOM",
+        "owner_email": "benchmark@adg.vn",
+    }
+
+
+def _sample(fixtures: Fixtures, rng: random.Random, size: int = 20) -> list[str]:
+    ids = fixtures.document_ids
+    return rng.sample(ids, min(size, len(ids)))
+
+
+SCENARIOS = [
+    Scenario("health", lambda f, r, i: ("GET", "/health", {})),
+    Scenario("documents.list", lambda f, r, i: ("GET", "/api/documents/", {})),
+    Scenario(
+        "documents.list_filtered",
+        lambda f, r, i: (
+            "GET",
+            "/api/documents/",
+            {"params": {"department": r.choice(["B2B", "D2COM", "S2B2C", "MARCOM"]),
+                        "status": "published", "page": r.randint(1, 5)}},
+        ),
+    ),
+    Scenario(
+        "documents.search",
+        lambda f, r, i: ("GET", "/api/documents/", {"params": {"search": "chien luoc"}}),
+    ),
+    Scenario(
+        "documents.get",
+        lambda f, r, i: ("GET", f"/api/documents/{r.choice(f.document_ids)}", {}),
+    ),
+    Scenario(
+        "documents.batch_get",
+        lambda f, r, i: ("GET", "/api/documents/batch", {"params": {"ids": _sample(f, r)}}),
+        expected=frozenset({400}),
+    ),
+    Scenario(
+        "documents.batch_update",
+        lambda f, r, i: (
+            "PATCH",
+            "/api/documents/batch",
+            {"json": {"ids": _sample(f, r), "changes": {"description": f"Cập nhật {i}"}}},
+        ),
+        expected=frozenset({404, 422}),
+    ),
+    Scenario(
+        "documents.export",
+        # One department, so a request does not outlast a short scenario on a big seed
+        lambda f, r, i: (
+            "GET",
+            "/api/documents/export",
+            {"params": {"format": r.choice(["ndjson", "csv"]), "department": "B2B"}},
+        ),
+    ),
+    Scenario(
+        "documents.versions",
+        lambda f, r, i: ("GET", f"/api/documents/{r.choice(f.document_ids)}/versions", {}),
+    ),
+    Scenario(
+        "documents.upload_version",
+        lambda f, r, i: (
+            "POST",
+            f"/api/documents/{r.choice(f.created_ids or f.document_ids)}/versions",
+            {"params": {"filename": "benchmark.txt"},
+             "content": f"Nội dung phiên bản benchmark {i}\n".encode() * 64},
+        ),
+        expected=frozenset({404}),
+    ),
+    Scenario(
+        "documents.create",
+        lambda f, r, i: ("POST", "/api/documents/", {"json": _document_payload(i)}),
+    ),
+    Scenario(
+        "documents.bulk",
+        lambda f, r, i: (
+            "POST",
+            "/api/documents/bulk",
+            {"json": [_document_payload(i * 100 + n) for n in range(100)]},
+        ),
+    ),
+    Scenario(
+        "documents.update",
+        lambda f, r, i: (
+            "PATCH",
+            f"/api/documents/{r.choice(f.created_ids or f.document_ids)}",
+            {"json": {"description": f"Cập nhật {i}"}},
+        ),
+    ),
+    Scenario(
+        "documents.delete",
+        # Deletes documents made by documents.create; 404 once they run out
+        lambda f, r, i: (
+            "DELETE",
+            f"/api/documents/{f.created_ids.pop() if f.created_ids else 'missing'}",
+            {},
+        ),
+        expected=frozenset({404}),
+    ),
+    Scenario("golden_answers.list", lambda f, r, i: ("GET", "/api/golden-answers/", {})),
+    Scenario(
+        "golden_answers.export",
+        lambda f, r, i: ("GET", "/api/golden-answers/export", {"params": {"format": "csv"}}),
+    ),
+    Scenario(
+        "golden_answers.get",
+        lambda f, r, i: ("GET", f"/api/golden-answers/{r.choice(f.golden_answer_ids)}", {}),
+    ),
+    Scenario(
+        "golden_answers.create",
+        lambda f, r, i: (
+            "POST",
+            "/api/golden-answers/",
+            {"json": {"question": f"Câu hỏi benchmark {i}?",
+                      "answer": "Câu trả lời mẫu cho benchmark.", "department": "B2B"}},
+        ),
+    ),
+    Scenario(
+        "golden_answers.helpful",
+        lambda f, r, i: (
+            "POST", f"/api/golden-answers/{r.choice(f.golden_answer_ids)}/helpful", {}
+        ),
+    ),
+    Scenario(
+        "chat.query",
+        lambda f, r, i: (
+            "POST",
+            "/api/chat/query",
+            {"json": {
+                "query": f"Kế hoạch chiến dịch quý {r.randint(1, 4)}",
+                "conversation_id": r.choice(f.conversation_ids) if f.conversation_ids else None,
+            }},
+        ),
+    ),
+    Scenario(
+        "chat.query_stream",
+        lambda f, r, i: (
+            "POST", "/api/chat/query/stream", {"json": {"query": "Chiến lược B2B"}}
+        ),
+    ),
+    Scenario(
+        "chat.history",
+        lambda f, r, i: (
+            "GET", f"/api/chat/history/{r.choice(f.conversation_ids or ['missing'])}", {}
+        ),
+        expected=frozenset({400, 404}),
+    ),
+    Scenario("chat.cache_stats", lambda f, r, i: ("GET", "/api/chat/cache/stats", {})),
+    Scenario("search", lambda f, r, i: ("GET", "/api/search/", {"params": {"q": "ke hoach"}})),
+    Scenario(
+        "search.passages",
+        lambda f, r, i: ("GET", "/api/search/passages", {"params": {"q": "chiến lược B2B"}}),
+    ),
+    Scenario("stats.dashboard", lambda f, r, i: ("GET", "/api/stats/dashboard", {})),
+    Scenario("stats.departments", lambda f, r, i: ("GET", "/api/stats/departments", {})),
+    Scenario("stats.timeseries", lambda f, r, i: ("GET", "/api/stats/timeseries", {})),
+    Scenario("jobs.list", lambda f, r, i: ("GET", "/api/jobs/", {})),
+    Scenario("jobs.stats", lambda f, r, i: ("GET", "/api/jobs/stats", {})),
+    Scenario(
+        "jobs.retry",
+        lambda f, r, i: (
+            "POST", f"/api/jobs/{r.choice(f.job_ids or ['missing'])}/retry", {}
+        ),
+        expected=frozenset({404, 409, 422}),
+    ),
+    Scenario("metrics", lambda f, r, i: ("GET", "/metrics", {})),
+]
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    errors: int
+    throughput_rps: float
+    latency_ms: dict[str, float]
+    statements_per_request: Optional[float]
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _count_statement(*_: Any) -> None:
+    counter = _statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    fixtures: Fixtures,
+    concurrency: int,
+    duration: float,
+    count_statements: bool,
+    random_seed: int,
+) -> ScenarioResult:
+    latencies: list[float] = []
+    errors = 0
+    statements = 0
+    sequence = count()
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int) -> None:
+        nonlocal errors, statements
+        rng = random.Random(random_seed * 1000 + worker_id)
+        while time.perf_counter() < deadline:
+            method, path, kwargs = scenario.build(fixtures, rng, next(sequence))
+            counter = [0]
+            token = _statements.set(counter if count_statements else None)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                await response.aread()
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            finally:
+                _statements.reset(token)
+            latencies.append(time.perf_counter() - started)
+            statements += counter[0]
+            ok = response.is_success or response.status_code == 304
+            if not ok and response.status_code not in scenario.expected:
+                errors += 1
+            if scenario.name == "documents.create" and response.status_code == 201:
+                fixtures.created_ids.append(response.json()["id"])
+            if scenario.name == "chat.query" and response.is_success:
+                conversation_id = response.json()["conversation_id"]
+                if conversation_id not in fixtures.conversation_ids:
+                    fixtures.conversation_ids.append(conversation_id)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return ScenarioResult(
+        requests=len(latencies),
+        errors=errors,
+        throughput_rps=round(len(latencies) / elapsed, 1),
+        latency_ms={
+            name: round(percentile(latencies, fraction) * 1e3, 3)
+            for name, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+        },
+        statements_per_request=(
+            round(statements / len(latencies), 2) if count_statements and latencies else None
+        ),
+    )
+
+
+async def _fixtures(client: httpx.AsyncClient) -> Fixtures:
+    documents = (await client.get("/api/documents/", params={"page_size": 100})).json()
+    answers = (await client.get("/api/golden-answers/", params={"limit": 100})).json()
+    jobs = (await client.get("/api/jobs/", params={"limit": 100})).json()
+    return Fixtures(
+        document_ids=[d["id"] for d in documents["items"]] or ["missing"],
+        golden_answer_ids=[a["id"] for a in answers] or ["missing"],
+        job_ids=[j["id"] for j in jobs] if isinstance(jobs, list) else [],
+    )
+
+
+@asynccontextmanager
+async def _client(url: Optional[str], concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if url:
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+            yield client
+        return
+
+    from sqlalchemy import event
+
+    from app.database import engine, read_engine
+    from app.main import app
+
+    engines = {engine.sync_engine, read_engine.sync_engine}
+    for sync_engine in engines:
+        event.listen(sync_engine, "before_cursor_execute", _count_statement)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        # The app prints startup and shutdown banners; keep stdout for the report
+        with redirect_stdout(sys.stderr):
+            async with app.router.lifespan_context(app):
+                async with httpx.AsyncClient(
+                    transport=transport, base_url="http://benchmark", timeout=30
+                ) as client:
+                    yield client
+    finally:
+        for sync_engine in engines:
+            event.remove(sync_engine, "before_cursor_execute", _count_statement)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], max_regression: float
+) -> list[str]:
+    """Scenarios that got slower, lost throughput or ran more SQL than the baseline."""
+    regressions = []
+    for name, now in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        p95_before, p95_now = before["latency_ms"]["p95"], now["latency_ms"]["p95"]
+        if p95_before and p95_now > p95_before * (1 + max_regression):
+            regressions.append(f"{name}: p95 {p95_before:.2f} -> {p95_now:.2f} ms")
+        rps_before, rps_now = before["throughput_rps"], now["throughput_rps"]
+        if rps_before and rps_now < rps_before * (1 - max_regression):
+            regressions.append(f"{name}: throughput {rps_before:.1f} -> {rps_now:.1f} req/s")
+        sql_before, sql_now = before["statements_per_request"], now["statements_per_request"]
+        if sql_before is not None and sql_now is not None and sql_now > sql_before + 0.5:
+            regressions.append(f"{name}: SQL statements/request {sql_before} -> {sql_now}")
+    return regressions
+
+
+async def _main(args: argparse.Namespace) -> int:
+    if args.seed_documents:
+        from app.database import async_session_maker
+        from benchmarks.seed import seed
+
+        await seed(
+            async_session_maker,
+            documents=args.seed_documents,
+            golden_answers=args.seed_golden_answers,
+            random_seed=args.random_seed,
+        )
+
+    selected = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    results: dict[str, Any] = {}
+    async with _client(args.url, args.concurrency) as client:
+        fixtures = await _fixtures(client)
+        print(
+            f"{'scenario':<26}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'sql/req':>9}{'errors':>8}",
+            file=sys.stderr,
+        )
+        for scenario in selected:
+            result = await run_scenario(
+                client,
+                scenario,
+                fixtures,
+                args.concurrency,
+                args.duration,
+                count_statements=args.url is None,
+                random_seed=args.random_seed,
+            )
+            results[scenario.name] = asdict(result)
+            latency = result.latency_ms
+            sql = "-" if result.statements_per_request is None else result.statements_per_request
+            print(
+                f"{scenario.name:<26}{result.throughput_rps:>9}{latency['p50']:>9}"
+                f"{latency['p95']:>9}{latency['p99']:>9}{sql:>9}{result.errors:>8}",
+                file=sys.stderr,
+            )
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "target": args.url or "in-process",
+            "database": os.environ.get("DATABASE_URL", "").split("://")[0] or None,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "python": platform.python_version(),
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), report, args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    parser.add_argument("--scenario", action="append", help="only run these (repeatable)")
+    parser.add_argument("--seed-documents", type=int, default=0,
+                        help="seed this many synthetic documents first")
+    parser.add_argument("--seed-golden-answers", type=int, default=1000)
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="tolerated relative slowdown before failing (default 0.2)")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Seed the database with synthetic documents, versions and golden answers.
+
+Rows are written in batches through the same bulk path as
+``POST /api/documents/bulk`` (binary ``COPY`` on PostgreSQL), so seeding a
+million documents takes minutes, not hours. The data is deterministic for a
+given ``--random-seed``, which keeps benchmark runs comparable.
+
+    cd backend && python -m benchmarks.seed --documents 100000
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import async_session_maker
+from app.models.document import (
+    Classification,
+    Department,
+    DocumentStatus,
+    DocumentVersion,
+)
+from app.models.golden_answer import GoldenAnswer, TrustLabel
+from app.services.bulk import insert_documents
+
+WORDS = (
+    "chiến lược kế hoạch báo cáo thị trường khách hàng đại lý sản phẩm chiến dịch "
+    "ngân sách truyền thông thương hiệu doanh số phân phối khuyến mãi quy trình "
+    "hướng dẫn đánh giá đối thủ kênh bán hàng tăng trưởng quý năm"
+).split()
+# Most documents are published or archived, as in a mature knowledge base
+STATUS_WEIGHTS = {
+    DocumentStatus.PUBLISHED: 50,
+    DocumentStatus.ARCHIVED: 30,
+    DocumentStatus.DRAFT: 10,
+    DocumentStatus.PENDING_APPROVAL: 5,
+    DocumentStatus.APPROVED: 5,
+}
+
+
+def _phrase(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(UUID(int=rng.getrandbits(128), version=4))
+
+
+def _document_rows(rng: random.Random, count: int, now: datetime) -> list[dict[str, Any]]:
+    statuses = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=count)
+    return [
+        {
+            "id": _uuid(rng),
+            "status": status,
+            "title": _phrase(rng, 6).capitalize(),
+            "description": _phrase(rng, 30),
+            "department": rng.choice(list(Department)),
+            "classification": rng.choice(list(Classification)),
+            "owner_email": f"user{rng.randrange(200)}@adg.vn",
+            "file_type": rng.choice(("pdf", "docx", "pptx", "xlsx")),
+            "file_size_bytes": rng.randrange(10_000, 20_000_000),
+            "review_date": now + timedelta(days=rng.randrange(-90, 365)),
+        }
+        for status in statuses
+    ]
+
+
+async def seed(
+    session_maker: async_sessionmaker[AsyncSession],
+    documents: int,
+    versions_per_document: int = 2,
+    golden_answers: int = 1000,
+    batch_size: int = 5000,
+    random_seed: int = 42,
+) -> dict[str, int]:
+    """Insert synthetic rows; returns the number of rows written per table."""
+    rng = random.Random(random_seed)
+    now = datetime.now(timezone.utc)
+    document_ids: list[str] = []
+
+    for start in range(0, documents, batch_size):
+        rows = _document_rows(rng, min(batch_size, documents - start), now)
+        async with session_maker() as session:
+            await insert_documents(session, rows)
+            if versions_per_document:
+                await session.execute(
+                    insert(DocumentVersion),
+                    [
+                        {
+                            "id": _uuid(rng),
+                            "document_id": row["id"],
+                            "version_number": number,
+                            "changelog": _phrase(rng, 8),
+                        }
+                        for row in rows
+                        for number in range(1, versions_per_document + 1)
+                    ],
+                )
+            await session.commit()
+        # Golden answers cite a sample of the documents
+        document_ids.extend(row["id"] for row in rows[:100])
+
+    for start in range(0, golden_answers, batch_size):
+        count = min(batch_size, golden_answers - start)
+        async with session_maker() as session:
+            await session.execute(
+                insert(GoldenAnswer),
+                [
+                    {
+                        "id": _uuid(rng),
+                        "question": f"{_phrase(rng, 8).capitalize()}?",
+                        "answer": _phrase(rng, 60),
+                        "department": rng.choice(list(Department)),
+                        "trust_label": rng.choice(list(TrustLabel)),
+                        "source_document_ids": rng.sample(document_ids, min(3, len(document_ids))),
+                        "usage_count": int(rng.paretovariate(1.2)) - 1,
+                        "helpful_count": rng.randrange(20),
+                    }
+                    for _ in range(count)
+                ],
+            )
+            await session.commit()
+
+    return {
+        "documents": documents,
+        "document_versions": documents * versions_per_document,
+        "golden_answers": golden_answers,
+    }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    written = await seed(
+        async_session_maker,
+        documents=args.documents,
+        versions_per_document=args.versions_per_document,
+        golden_answers=args.golden_answers,
+        batch_size=args.batch_size,
+        random_seed=args.random_seed,
+    )
+    print(f"Seeded {written} in {time.perf_counter() - started:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--versions-per-document", type=int, default=2)
+    parser.add_argument("--golden-answers", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--random-seed", type=int, default=42)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
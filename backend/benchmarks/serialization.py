@@ -0,0 +1,143 @@
+"""Per-row cost of serving a document list page, before and after projection.
+
+Compares the two ways ``GET /api/documents/`` has built a page:
+
+* ``orm``: load ``Document`` entities, ``DocumentResponse.model_validate`` each
+  one, then validate and dump the ``DocumentListResponse`` as FastAPI does for
+  a ``response_model``.
+* ``projection``: select only the response columns as rows and dump them with
+  orjson (``app.responses``).
+
+Rows live in an in-memory SQLite database, so the numbers isolate Python-side
+work (row materialization and serialization), not network or query time.
+
+    cd backend && python -m benchmarks.serialization --rows 100 --iterations 500
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+import orjson  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker  # noqa: E402
+
+from app.database import Base, create_engine  # noqa: E402
+from app.models.document import Department, Document, DocumentStatus  # noqa: E402
+from app.responses import ORJSON_OPTIONS, projection  # noqa: E402
+from app.schemas import DocumentListResponse, DocumentResponse  # noqa: E402
+
+COLUMNS = projection(Document, DocumentResponse)
+LIST_ADAPTER = TypeAdapter(DocumentListResponse)
+
+
+async def _seed(session_maker: async_sessionmaker[AsyncSession], rows: int) -> None:
+    now = datetime.now(timezone.utc)
+    departments = list(Department)
+    async with session_maker() as session:
+        await session.execute(
+            insert(Document),
+            [
+                {
+                    "title": f"Tài liệu chiến lược {i}",
+                    "description": "Mô tả ngắn gọn về nội dung tài liệu " * 3,
+                    "department": departments[i % len(departments)],
+                    "status": DocumentStatus.PUBLISHED,
+                    "owner_email": "owner@adg.vn",
+                    "file_type": "pdf",
+                    "file_size_bytes": 1024 * i,
+                    "review_date": now,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(rows)
+            ],
+        )
+        await session.commit()
+
+
+async def orm_page(session: AsyncSession, rows: int) -> bytes:
+    result = await session.execute(select(Document).limit(rows))
+    documents = result.scalars().all()
+    page = DocumentListResponse(
+        items=[DocumentResponse.model_validate(doc) for doc in documents],
+        total=len(documents),
+        page=1,
+        page_size=rows,
+    )
+    # FastAPI re-validates the returned model against response_model, then dumps it
+    return LIST_ADAPTER.dump_json(LIST_ADAPTER.validate_python(page))
+
+
+async def projection_page(session: AsyncSession, rows: int) -> bytes:
+    result = await session.execute(select(*COLUMNS).limit(rows))
+    documents = result.all()
+    return orjson.dumps(
+        {
+            "items": [doc._asdict() for doc in documents],
+            "total": len(documents),
+            "page": 1,
+            "page_size": rows,
+            "total_is_exact": True,
+            "next_cursor": None,
+        },
+        option=ORJSON_OPTIONS,
+    )
+
+
+async def _measure(
+    session_maker: async_sessionmaker[AsyncSession],
+    build: Callable[[AsyncSession, int], Awaitable[bytes]],
+    rows: int,
+    iterations: int,
+) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        # A fresh session per page, as per request, so the identity map starts empty
+        async with session_maker() as session:
+            started = time.perf_counter()
+            await build(session, rows)
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def main(rows: int, iterations: int) -> None:
+    engine = create_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[Document.__table__])
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    await _seed(session_maker, rows)
+
+    async with session_maker() as session:
+        orm_body = orjson.loads(await orm_page(session, rows))
+        projected_body = orjson.loads(await projection_page(session, rows))
+    assert orm_body["items"] == projected_body["items"], "payloads differ"
+
+    print(f"{rows}-row page, {iterations} iterations")
+    print(f"{'path':<12}{'median ms':>12}{'p95 ms':>10}{'µs/row':>10}")
+    baseline = None
+    for name, build in (("orm", orm_page), ("projection", projection_page)):
+        await _measure(session_maker, build, rows, max(1, iterations // 10))  # warm up
+        timings = sorted(await _measure(session_maker, build, rows, iterations))
+        median = statistics.median(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        baseline = baseline or median
+        print(
+            f"{name:<12}{median * 1e3:>12.3f}{p95 * 1e3:>10.3f}{median / rows * 1e6:>10.1f}"
+            f"  ({baseline / median:.1f}x)"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.iterations))
@@ -0,0 +1,64 @@
+"""Shared fixtures: a migrated SQLite database and an HTTP client for the app.
+
+Settings are read once at import, so the environment is set before ``app`` is
+imported. Migrations run once per session; every test starts from empty tables and
+caches.
+"""
+import os
+import tempfile
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+
+_tmp = Path(tempfile.mkdtemp(prefix="adg-kms-tests-"))
+os.environ.update(
+    DATABASE_URL=f"sqlite+aiosqlite:///{_tmp / 'test.db'}",
+    DATABASE_REPLICA_URL="",
+    RETRIEVAL_INDEX_PATH=str(_tmp / "retrieval_index"),
+    BLOB_STORAGE_PATH=str(_tmp / "blobs"),
+    DEBUG="false",
+)
+
+import httpx  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import delete  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from alembic import command  # noqa: E402
+from app.database import Base, async_session_maker, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.chat_cache import chat_cache  # noqa: E402
+from app.services.stats import invalidate_document_stats  # noqa: E402
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_database() -> None:
+    command.upgrade(Config(str(BACKEND_DIR / "alembic.ini")), "head")
+
+
+@pytest.fixture(autouse=True)
+async def clean_tables() -> AsyncIterator[None]:
+    yield
+    async with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(delete(table))
+    invalidate_document_stats()
+    chat_cache.clear()
+    # Pooled connections belong to this test's event loop
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db() -> AsyncIterator[AsyncSession]:
+    async with async_session_maker() as session:
+        yield session
+
+
+@pytest.fixture
+async def client() -> AsyncIterator[httpx.AsyncClient]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
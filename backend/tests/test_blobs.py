@@ -0,0 +1,116 @@
+"""Content-addressed version file tests."""
+import os
+import time
+
+import httpx
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.document import DocumentChunk, DocumentVersion
+from app.models.job import Job
+from app.services.blobs import COLLECT_BLOBS, blob_store, collect_blobs
+from tests.test_documents import create_document
+
+
+def stored_blobs() -> set[str]:
+    return {
+        path.name for path in blob_store.root.rglob("*")
+        if path.is_file() and path.parent.name != "tmp"
+    }
+
+
+async def upload(client: httpx.AsyncClient, document_id: str, content: bytes) -> httpx.Response:
+    return await client.post(
+        f"/api/documents/{document_id}/versions",
+        params={"filename": "bao-cao.pdf"},
+        content=content,
+    )
+
+
+async def blob(content: bytes) -> str:
+    async def chunks():
+        yield content
+
+    return (await blob_store.put(chunks())).content_hash
+
+
+async def test_same_content_is_stored_once_and_extracted_once(
+    client: httpx.AsyncClient, db: AsyncSession
+):
+    first = await create_document(client, "Báo cáo quý 3")
+    second = await create_document(client, "Báo cáo quý 3 (bản sao)")
+    content = b"%PDF-1.7 bao cao quy 3 " + os.urandom(16)
+
+    response = await upload(client, first["id"], content)
+    assert response.status_code == 201
+    original = response.json()
+    # What the extraction pipeline writes for the first upload
+    db.add(DocumentChunk(
+        version_id=original["id"],
+        document_id=first["id"],
+        chunk_index=0,
+        text="Doanh thu quý 3",
+        char_start=0,
+        char_end=15,
+    ))
+    await db.execute(
+        update(DocumentVersion)
+        .where(DocumentVersion.id == original["id"])
+        .values(extracted_at=func.now())
+    )
+    await db.commit()
+    blobs = stored_blobs()
+
+    response = await upload(client, second["id"], content)
+    assert response.status_code == 201
+    copy = response.json()
+
+    assert copy["content_hash"] == original["content_hash"]
+    assert stored_blobs() == blobs
+    chunks = (await db.execute(
+        select(DocumentChunk.text).where(DocumentChunk.version_id == copy["id"])
+    )).scalars().all()
+    assert chunks == ["Doanh thu quý 3"]
+    # The same file again is not a new version
+    response = await upload(client, second["id"], content)
+    assert response.status_code == 200
+    assert response.json()["id"] == copy["id"]
+
+
+async def test_upload_over_the_size_limit_is_rejected_and_not_stored(
+    client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    document = await create_document(client, "Báo cáo lớn")
+    monkeypatch.setattr(blob_store, "max_bytes", 1024)
+    blobs = stored_blobs()
+
+    response = await upload(client, document["id"], os.urandom(4096))
+
+    assert response.status_code == 413
+    assert stored_blobs() == blobs
+    assert not list((blob_store.root / "tmp").iterdir())
+
+
+async def test_collection_keeps_referenced_and_recent_blobs(
+    client: httpx.AsyncClient, db: AsyncSession
+):
+    document = await create_document(client, "Báo cáo quý 4")
+    referenced = (await upload(client, document["id"], os.urandom(64))).json()["content_hash"]
+    recent = await blob(os.urandom(64))
+    unreferenced = await blob(os.urandom(64))
+    long_ago = time.time() - get_settings().blob_gc_grace_seconds - 60
+    for content_hash in (referenced, unreferenced):
+        os.utime(blob_store.path(content_hash), (long_ago, long_ago))
+
+    await collect_blobs(db, {"content_hashes": [referenced, recent, unreferenced]})
+    await db.commit()
+
+    assert blob_store.exists(referenced)
+    assert blob_store.exists(recent)
+    assert not blob_store.exists(unreferenced)
+    # The recent blob is checked again after another grace period
+    [job] = (await db.execute(select(Job))).scalars()
+    assert job.kind == COLLECT_BLOBS
+    assert job.payload == {"content_hashes": [recent]}
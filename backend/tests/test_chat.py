@@ -0,0 +1,133 @@
+"""Chat answer tests."""
+import asyncio
+import json
+
+import httpx
+import pytest
+from src.integrations import notebooklm as shared_client
+from src.integrations.notebooklm import AsyncNotebookLMClient, NotebookLMSettings
+
+from app.config import get_settings
+from app.schemas import Citation
+from app.services import notebooklm
+from app.services.chat_cache import chat_cache
+
+
+def sse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def gateway(monkeypatch: pytest.MonkeyPatch) -> list[httpx.Request]:
+    """Answer NotebookLM queries from a fake gateway; returns the requests it got."""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={
+            "answer": "Chiến lược B2B tập trung vào đại lý.",
+            "citations": [
+                {"source_id": "src-1", "source_title": "B2B.pdf", "text": "Đại lý", "page": 3},
+            ],
+            "suggested_queries": ["Liệt kê đại lý"],
+        })
+
+    monkeypatch.setattr(get_settings(), "notebooklm_api_url", "http://gateway")
+    monkeypatch.setattr(get_settings(), "notebooklm_notebook_id", "nb-1")
+    monkeypatch.setattr(
+        shared_client,
+        "_client",
+        AsyncNotebookLMClient(
+            NotebookLMSettings(api_url="http://gateway"),
+            transport=httpx.MockTransport(handler),
+        ),
+    )
+    return requests
+
+
+async def test_answer_comes_from_the_gateway(gateway: list[httpx.Request]):
+    answer = await notebooklm.answer("Chiến lược B2B?", ["src-1"])
+
+    assert answer.text == "Chiến lược B2B tập trung vào đại lý."
+    assert [citation.source_id for citation in answer.citations] == ["src-1"]
+    assert answer.suggested_queries == ["Liệt kê đại lý"]
+    [request] = gateway
+    assert request.url.path == "/notebooks/nb-1/query"
+    assert json.loads(request.content) == {"question": "Chiến lược B2B?", "source_ids": ["src-1"]}
+
+
+async def test_stream_splits_the_gateway_answer_into_tokens(
+    client: httpx.AsyncClient, gateway: list[httpx.Request]
+):
+    response = await client.post("/api/chat/query/stream", json={"query": "Chiến lược B2B?"})
+
+    events = sse_events(response.text)
+    tokens = [data["text"] for kind, data in events if kind == "token"]
+    assert len(tokens) > 1
+    assert "".join(tokens) == "Chiến lược B2B tập trung vào đại lý."
+    assert [kind for kind, _ in events][-3:] == ["citation", "suggestions", "done"]
+
+
+async def test_without_a_gateway_answers_are_mocked_only_when_enabled(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    with pytest.raises(notebooklm.NotebookLMNotConfiguredError):
+        await notebooklm.answer("Chiến lược B2B?")
+
+    monkeypatch.setattr(get_settings(), "notebooklm_mock_answers", True)
+    answer = await notebooklm.answer("Chiến lược B2B?")
+    assert "Chiến lược B2B?" in answer.text
+
+
+async def test_concurrent_streams_share_one_upstream_answer(
+    client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    calls = 0
+    release = asyncio.Event()
+
+    async def stream_answer(query, source_ids=None):
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        yield notebooklm.AnswerEvent("token", "Câu trả lời")
+        yield notebooklm.AnswerEvent("suggestions", [])
+
+    monkeypatch.setattr(notebooklm, "stream_answer", stream_answer)
+
+    async def ask() -> httpx.Response:
+        return await client.post("/api/chat/query/stream", json={"query": "Chiến lược B2B?"})
+
+    coalesced = chat_cache.coalesced
+    streams = [asyncio.create_task(ask()) for _ in range(2)]
+    async with asyncio.timeout(5):
+        while chat_cache.coalesced == coalesced:
+            await asyncio.sleep(0.01)
+    release.set()
+    responses = await asyncio.gather(*streams)
+
+    assert calls == 1
+    for response in responses:
+        events = sse_events(response.text)
+        assert [data["text"] for kind, data in events if kind == "token"] == ["Câu trả lời"]
+        assert events[-1][0] == "done"
+
+
+def test_replacing_an_answer_drops_the_documents_it_no_longer_cites():
+    key = chat_cache.make_key("Chiến lược B2B?")
+
+    def citing(source_id: str) -> notebooklm.Answer:
+        return notebooklm.Answer(
+            text="Câu trả lời",
+            citations=[Citation(source_id=source_id, source_title="B2B.pdf", text="Đại lý")],
+        )
+
+    chat_cache.set(key, citing("doc-old"))
+    chat_cache.set(key, citing("doc-new"))
+
+    assert chat_cache.invalidate_documents(["doc-old"]) == 0
+    assert key in chat_cache
+    assert chat_cache.invalidate_documents(["doc-new"]) == 1
@@ -0,0 +1,101 @@
+"""Write-behind chat history tests."""
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import func, select, text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker
+from app.models.chat import ChatMessage, MessageRole
+from app.services.chat_history import ChatHistoryWriter, chat_history
+
+
+async def count_messages(db: AsyncSession) -> int:
+    return await db.scalar(select(func.count()).select_from(ChatMessage))
+
+
+async def test_a_message_that_cannot_be_written_does_not_block_the_queue(db: AsyncSession):
+    writer = ChatHistoryWriter(async_session_maker, batch_size=10)
+    conversation_id = str(uuid4())
+    writer.append(conversation_id, MessageRole.USER, "Câu hỏi 1")
+    # content is NOT NULL: this row fails every time
+    writer.append(conversation_id, MessageRole.ASSISTANT, None)
+    writer.append(conversation_id, MessageRole.USER, "Câu hỏi 2")
+
+    await writer.flush()
+
+    assert writer.pending(conversation_id) == []
+    assert writer.failed == 1
+    assert await count_messages(db) == 2
+
+
+async def test_messages_are_kept_while_the_database_is_unavailable(db: AsyncSession):
+    class UnavailableSession:
+        async def __aenter__(self):
+            raise OperationalError("INSERT", {}, ConnectionRefusedError())
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+    writer = ChatHistoryWriter(UnavailableSession, batch_size=10)
+    conversation_id = str(uuid4())
+    writer.append(conversation_id, MessageRole.USER, "Câu hỏi")
+    writer.append(conversation_id, MessageRole.ASSISTANT, "Trả lời")
+
+    await writer.flush()
+    assert len(writer.pending(conversation_id)) == 2
+    assert writer.failed == 0
+
+    writer.session_maker = async_session_maker
+    await writer.flush()
+    assert writer.pending(conversation_id) == []
+    assert await count_messages(db) == 2
+
+
+async def history_pages(client: httpx.AsyncClient, conversation_id: str, limit: int) -> list:
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(f"/api/chat/history/{conversation_id}", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        pages.append([message["content"] for message in page["messages"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+async def test_history_pages_do_not_repeat_messages_of_the_same_second(
+    client: httpx.AsyncClient, db: AsyncSession
+):
+    conversation_id = str(uuid4())
+    for i in range(5):
+        chat_history.append(conversation_id, MessageRole.USER, f"Câu hỏi {i}")
+    await chat_history.flush()
+    # Stored the way a now() server default stores it on SQLite: whole seconds
+    await db.execute(update(ChatMessage).values(created_at=text("'2026-01-05 09:30:00'")))
+    await db.commit()
+
+    pages = await history_pages(client, conversation_id, limit=2)
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sorted(sum(pages, [])) == [f"Câu hỏi {i}" for i in range(5)]
+
+
+async def test_history_pages_with_buffered_messages_stay_within_the_limit(
+    client: httpx.AsyncClient,
+):
+    conversation_id = str(uuid4())
+    for i in range(3):
+        chat_history.append(conversation_id, MessageRole.USER, f"Câu hỏi {i}")
+    await chat_history.flush()
+    for i in range(3, 6):
+        chat_history.append(conversation_id, MessageRole.USER, f"Câu hỏi {i}")
+
+    try:
+        pages = await history_pages(client, conversation_id, limit=4)
+    finally:
+        await chat_history.flush()
+
+    assert pages == [[f"Câu hỏi {i}" for i in range(4)], ["Câu hỏi 4", "Câu hỏi 5"]]
@@ -0,0 +1,146 @@
+"""Documents API tests."""
+import json
+
+import httpx
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.document import Document
+from app.schemas import Citation
+from app.services.chat_cache import chat_cache
+from app.services.notebooklm import Answer
+
+
+async def create_document(client: httpx.AsyncClient, title: str, **fields) -> dict:
+    response = await client.post(
+        "/api/documents/",
+        json={"title": title, "department": "B2B", "owner_email": "owner@adg.vn", **fields},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def test_cursor_pages_do_not_repeat_rows_updated_in_the_same_second(
+    client: httpx.AsyncClient, db: AsyncSession
+):
+    created = [await create_document(client, f"Tài liệu {i}") for i in range(5)]
+    # Stored the way the now() server default stores it on SQLite: whole seconds
+    await db.execute(update(Document).values(updated_at=text("'2026-01-05 09:30:00'")))
+    await db.commit()
+
+    first = (await client.get("/api/documents/", params={"page_size": 2})).json()
+    second = (
+        await client.get(
+            "/api/documents/", params={"page_size": 2, "cursor": first["next_cursor"]}
+        )
+    ).json()
+    third = (
+        await client.get(
+            "/api/documents/", params={"page_size": 2, "cursor": second["next_cursor"]}
+        )
+    ).json()
+
+    pages = [[item["id"] for item in page["items"]] for page in (first, second, third)]
+    assert [len(ids) for ids in pages] == [2, 2, 1]
+    seen = [document_id for ids in pages for document_id in ids]
+    assert sorted(seen) == sorted(document["id"] for document in created)
+    assert third["next_cursor"] is None
+
+
+async def test_invalid_cursor_is_rejected(client: httpx.AsyncClient):
+    response = await client.get("/api/documents/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+async def test_unpublishing_drops_cached_chat_answers_citing_the_document(
+    client: httpx.AsyncClient,
+):
+    document = await create_document(client, "Chiến lược B2B")
+    response = await client.patch(f"/api/documents/{document['id']}", json={"status": "published"})
+    assert response.status_code == 200, response.text
+
+    key = chat_cache.make_key("Tóm tắt chiến lược B2B")
+    citation = Citation(source_id=document["id"], source_title="Chiến lược B2B", text="...")
+    chat_cache.set(key, Answer(text="Tóm tắt", citations=[citation]))
+
+    response = await client.patch(f"/api/documents/{document['id']}", json={"status": "approved"})
+    assert response.status_code == 200, response.text
+    assert key not in chat_cache
+
+
+async def test_bulk_update_applies_to_every_id_or_none(client: httpx.AsyncClient):
+    documents = [await create_document(client, f"Tài liệu {i}") for i in range(3)]
+    ids = [document["id"] for document in reversed(documents)]
+
+    response = await client.patch(
+        "/api/documents/batch", json={"ids": ids, "changes": {"status": "pending_approval"}}
+    )
+    assert response.status_code == 200, response.text
+
+    response = await client.patch(
+        "/api/documents/batch",
+        json={"ids": [*ids, "00000000-0000-0000-0000-000000000000"], "changes": {"description": "x"}},
+    )
+    assert response.status_code == 404
+    batch = (await client.get("/api/documents/batch", params={"ids": ids})).json()
+    assert {item["status"] for item in batch["items"]} == {"pending_approval"}
+
+
+async def test_document_etag_answers_304_until_the_document_changes(
+    client: httpx.AsyncClient, db: AsyncSession
+):
+    document = await create_document(client, "Chiến lược B2B")
+    # An older stamp, so the edit below lands in a different (whole) second
+    await db.execute(update(Document).values(updated_at=text("'2026-01-05 09:30:00'")))
+    await db.commit()
+    url = f"/api/documents/{document['id']}"
+
+    etag = (await client.get(url)).headers["ETag"]
+    cached = await client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    response = await client.patch(url, json={"description": "Bản mới"})
+    assert response.status_code == 200, response.text
+    edited = await client.get(url, headers={"If-None-Match": etag})
+    assert edited.status_code == 200
+    assert edited.headers["ETag"] != etag
+
+
+async def test_bulk_ndjson_inserts_valid_rows_and_reports_invalid_ones(
+    client: httpx.AsyncClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(get_settings(), "bulk_insert_chunk_size", 2)
+    lines = [
+        {"title": "Chiến lược B2B", "department": "B2B", "owner_email": "owner@adg.vn"},
+        {"department": "B2B", "owner_email": "owner@adg.vn"},
+        "{not json",
+        {"title": "Kế hoạch MARCOM", "department": "MARCOM", "owner_email": "owner@adg.vn"},
+        {"title": "Báo cáo", "department": "SALES", "owner_email": "owner@adg.vn"},
+        {"title": "Ngân sách D2COM", "department": "D2COM", "owner_email": "owner@adg.vn"},
+    ]
+    body = "\n".join(
+        line if isinstance(line, str) else json.dumps(line, ensure_ascii=False) for line in lines
+    ).encode()
+
+    async def stream():
+        # Pieces that end mid-line, as a streamed upload arrives
+        for start in range(0, len(body), 50):
+            yield body[start:start + 50]
+
+    response = await client.post(
+        "/api/documents/bulk",
+        content=stream(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["created"], result["failed"]) == (3, 3)
+    assert [error["index"] for error in result["errors"]] == [1, 2, 4]
+    assert result["errors"][0]["errors"][0]["loc"] == ["title"]
+    assert result["errors"][2]["errors"][0]["loc"] == ["department"]
+    titles = (await db.execute(select(Document.title))).scalars().all()
+    assert sorted(titles) == ["Chiến lược B2B", "Kế hoạch MARCOM", "Ngân sách D2COM"]
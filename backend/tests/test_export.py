@@ -0,0 +1,23 @@
+"""Export tests."""
+import csv
+import io
+
+import httpx
+
+from app.export import CSV_BOM
+from tests.test_documents import create_document
+
+
+async def test_csv_export_neutralizes_formulas(client: httpx.AsyncClient):
+    await create_document(client, '=HYPERLINK("http://evil.example","x")', description="-2+3")
+    await create_document(client, "Kế hoạch Q4", description="Bình thường")
+
+    response = await client.get("/api/documents/export", params={"format": "csv"})
+    assert response.status_code == 200, response.text
+
+    rows = list(csv.DictReader(io.StringIO(response.text.removeprefix(CSV_BOM))))
+    cells = {row["title"]: row["description"] for row in rows}
+    assert cells == {
+        '\'=HYPERLINK("http://evil.example","x")': "'-2+3",
+        "Kế hoạch Q4": "Bình thường",
+    }
@@ -0,0 +1,83 @@
+"""Golden answers API tests."""
+import httpx
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.golden_answer import GoldenAnswer, TrustLabel
+from app.services.counters import golden_answer_counters
+from app.services.golden_index import GoldenAnswerIndex
+
+
+async def create_golden_answer(client: httpx.AsyncClient, question: str) -> dict:
+    response = await client.post(
+        "/api/golden-answers/",
+        json={"question": question, "answer": "Trả lời mẫu.", "department": "B2B"},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def test_counting_usage_leaves_updated_at_alone(
+    client: httpx.AsyncClient, db: AsyncSession
+):
+    answer = await create_golden_answer(client, "Chiến lược B2B là gì?")
+    await db.execute(update(GoldenAnswer).values(updated_at=text("'2026-01-05 09:30:00'")))
+    await db.commit()
+    before = await db.scalar(select(GoldenAnswer.updated_at))
+
+    response = await client.post(f"/api/golden-answers/{answer['id']}/helpful")
+    assert response.json()["helpful_count"] == 1
+    golden_answer_counters.add(answer["id"], "usage_count", 3)
+    await golden_answer_counters.flush()
+
+    db.expire_all()
+    row = (await db.execute(select(GoldenAnswer))).scalar_one()
+    assert (row.helpful_count, row.usage_count) == (1, 3)
+    assert row.updated_at == before
+
+
+async def test_golden_answer_etag_answers_304_until_the_answer_changes(
+    client: httpx.AsyncClient,
+):
+    answer = await create_golden_answer(client, "Chiến lược B2B là gì?")
+    url = f"/api/golden-answers/{answer['id']}"
+
+    etag = (await client.get(url)).headers["ETag"]
+    cached = await client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    await client.post(f"{url}/helpful")
+    marked = await client.get(url, headers={"If-None-Match": etag})
+    assert marked.status_code == 200
+    assert marked.headers["ETag"] != etag
+    assert marked.json()["helpful_count"] == 1
+
+
+async def test_index_refresh_drops_deleted_and_demoted_answers(db: AsyncSession):
+    answers = [
+        GoldenAnswer(
+            question=question,
+            answer="Trả lời mẫu.",
+            department="B2B",
+            trust_label=TrustLabel.VERIFIED,
+        )
+        for question in ("Chiến lược B2B là gì?", "Ngân sách quý 4 bao nhiêu?")
+    ]
+    db.add_all(answers)
+    await db.commit()
+    index = GoldenAnswerIndex(dim=256)
+    await index.refresh(db, force=True)
+    assert index.match("chiến lược B2B", threshold=0.5) is not None
+
+    await db.delete(answers[0])
+    # Demoted without touching updated_at, as a direct database fix would
+    await db.execute(
+        update(GoldenAnswer)
+        .where(GoldenAnswer.id == answers[1].id)
+        .values(trust_label=TrustLabel.DEPRECATED, updated_at=GoldenAnswer.updated_at)
+    )
+    await db.commit()
+    await index.refresh(db, force=True)
+
+    assert len(index) == 0
+    assert index.match("chiến lược B2B", threshold=0.5) is None
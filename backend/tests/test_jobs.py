@@ -0,0 +1,198 @@
+"""Job queue and NotebookLM source job tests."""
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.integrations import notebooklm as shared_client
+from src.integrations.notebooklm import AsyncNotebookLMClient, NotebookLMSettings
+
+from app.config import get_settings
+from app.database import async_session_maker
+from app.models.document import Document, DocumentStatus
+from app.models.job import Job, JobStatus
+from app.services import notebooklm
+from app.services.jobs import JobQueue, enqueue
+from app.services.sources import REMOVE_SOURCE, UPLOAD_SOURCE, upload_source
+
+
+async def published_document(db: AsyncSession) -> Document:
+    document = Document(
+        title="Chiến lược B2B",
+        description="Tóm tắt",
+        department="B2B",
+        owner_email="owner@adg.vn",
+        status=DocumentStatus.PUBLISHED,
+    )
+    db.add(document)
+    await db.commit()
+    await db.refresh(document)
+    return document
+
+
+async def test_enqueue_keeps_one_queued_job_per_dedupe_key(db: AsyncSession):
+    for _ in range(2):
+        await enqueue(db, UPLOAD_SOURCE, {"document_id": "d1"}, dedupe_key="upload:d1")
+        await db.commit()
+    await enqueue(db, UPLOAD_SOURCE, {"document_id": "d2"}, dedupe_key="upload:d2")
+    await db.commit()
+
+    assert (await db.execute(select(func.count()).select_from(Job))).scalar() == 2
+
+
+async def test_upload_fails_without_a_gateway_and_stores_no_source_id(db: AsyncSession):
+    document = await published_document(db)
+
+    with pytest.raises(notebooklm.NotebookLMNotConfiguredError):
+        await upload_source(db, {"document_id": document.id})
+    assert document.notebooklm_source_id is None
+
+
+async def test_upload_stores_the_gateway_source_id(
+    db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    requests: list[httpx.Request] = []
+    in_transaction: list[bool] = []
+
+    def gateway(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        in_transaction.append(db.in_transaction())
+        return httpx.Response(200, json={"source_id": "src-1"})
+
+    monkeypatch.setattr(get_settings(), "notebooklm_api_url", "http://gateway")
+    monkeypatch.setattr(get_settings(), "notebooklm_notebook_id", "nb-1")
+    monkeypatch.setattr(
+        shared_client,
+        "_client",
+        AsyncNotebookLMClient(
+            NotebookLMSettings(api_url="http://gateway"),
+            transport=httpx.MockTransport(gateway),
+        ),
+    )
+    document = await published_document(db)
+
+    await upload_source(db, {"document_id": document.id})
+
+    assert document.notebooklm_source_id == "src-1"
+    [request] = requests
+    assert request.url.path == "/notebooks/nb-1/sources"
+    assert request.headers["Idempotency-Key"].startswith(f"{document.id}:")
+    assert json.loads(request.content)["title"] == "Chiến lược B2B"
+    # The document was read and the session released before the call
+    assert in_transaction == [False]
+
+
+async def test_upload_for_a_document_unpublished_meanwhile_queues_its_removal(
+    db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    document = await published_document(db)
+
+    async def add_source(title, text=None, idempotency_key=None) -> str:
+        async with async_session_maker() as other:
+            await other.execute(
+                update(Document)
+                .where(Document.id == document.id)
+                .values(status=DocumentStatus.ARCHIVED)
+            )
+            await other.commit()
+        return "src-1"
+
+    monkeypatch.setattr(notebooklm, "add_source", add_source)
+
+    await upload_source(db, {"document_id": document.id})
+    await db.commit()
+
+    await db.refresh(document)
+    assert document.notebooklm_source_id is None
+    [job] = (await db.execute(select(Job))).scalars()
+    assert job.kind == REMOVE_SOURCE
+    assert job.payload == {"document_id": document.id, "source_id": "src-1"}
+
+
+async def test_stale_job_queued_again_meanwhile_is_dropped_not_requeued(db: AsyncSession):
+    await enqueue(db, UPLOAD_SOURCE, {"document_id": "d1"}, dedupe_key="upload:d1")
+    await db.commit()
+    [stale] = (await db.execute(select(Job))).scalars()
+    stale.status = JobStatus.RUNNING
+    stale.locked_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    await db.commit()
+    stale_id = stale.id
+    await enqueue(db, UPLOAD_SOURCE, {"document_id": "d1"}, dedupe_key="upload:d1")
+    await db.commit()
+
+    queue = JobQueue(async_session_maker, visibility_timeout=60)
+    await queue._requeue_stale()
+
+    db.expire_all()
+    jobs = (await db.execute(select(Job))).scalars().all()
+    assert [job.status for job in jobs] == [JobStatus.QUEUED]
+    assert jobs[0].id != stale_id
+
+
+async def test_failed_job_queued_again_meanwhile_is_dropped_not_retried(db: AsyncSession):
+    queue = JobQueue(async_session_maker)
+
+    async def fail(db: AsyncSession, payload: dict) -> None:
+        raise RuntimeError("upstream down")
+
+    queue.register("flaky", fail)
+    await enqueue(db, "flaky", {}, dedupe_key="flaky:1")
+    await db.commit()
+    [running] = await queue._claim("flaky", 1)
+    await enqueue(db, "flaky", {}, dedupe_key="flaky:1")
+    await db.commit()
+
+    queue._kinds["flaky"].running += 1
+    await queue._execute(running, queue._kinds["flaky"])
+
+    jobs = (await db.execute(select(Job))).scalars().all()
+    assert [job.status for job in jobs] == [JobStatus.QUEUED]
+    assert jobs[0].id != running.id
+
+
+async def test_retrying_a_dead_job_with_a_queued_twin_is_a_conflict(
+    client: httpx.AsyncClient, db: AsyncSession
+):
+    await enqueue(db, "flaky", {}, dedupe_key="flaky:1")
+    await db.commit()
+    [dead] = (await db.execute(select(Job))).scalars()
+    dead.status = JobStatus.DEAD
+    await db.commit()
+    await enqueue(db, "flaky", {}, dedupe_key="flaky:1")
+    await db.commit()
+
+    response = await client.post(f"/api/jobs/{dead.id}/retry")
+
+    assert response.status_code == 409
+    db.expire_all()
+    statuses = (await db.execute(select(Job.status))).scalars().all()
+    assert sorted(statuses) == [JobStatus.DEAD, JobStatus.QUEUED]
+
+
+async def test_removing_a_source_the_gateway_already_lost_succeeds(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    calls = 0
+
+    def gateway(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        # A transient failure first, then the source turns out to be gone
+        return httpx.Response(503 if calls == 1 else 404)
+
+    monkeypatch.setattr(get_settings(), "notebooklm_api_url", "http://gateway")
+    monkeypatch.setattr(get_settings(), "notebooklm_notebook_id", "nb-1")
+    monkeypatch.setattr(
+        shared_client,
+        "_client",
+        AsyncNotebookLMClient(
+            NotebookLMSettings(api_url="http://gateway", backoff_base=0),
+            transport=httpx.MockTransport(gateway),
+        ),
+    )
+
+    await notebooklm.delete_source("src-1")
+
+    assert calls == 2
@@ -0,0 +1,43 @@
+"""Daily dashboard metrics tests."""
+import httpx
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker
+from app.models.document import Document, DocumentStatus
+from app.models.metrics import DailyMetrics
+from app.services.metrics import DailyMetricsRecorder, utc_today
+from app.services.stats import invalidate_document_stats
+
+
+async def today_row(db: AsyncSession) -> DailyMetrics:
+    db.expire_all()
+    return await db.scalar(select(DailyMetrics).where(DailyMetrics.day == utc_today()))
+
+
+async def test_flush_takes_document_levels_from_the_database(
+    client: httpx.AsyncClient, db: AsyncSession
+):
+    recorder = DailyMetricsRecorder(async_session_maker)
+    for title in ("A", "B", "C"):
+        response = await client.post(
+            "/api/documents/",
+            json={"title": title, "department": "B2B", "owner_email": "owner@adg.vn"},
+        )
+        assert response.status_code == 201, response.text
+    recorder.record_ai_query()
+    await recorder.flush()
+
+    row = await today_row(db)
+    assert (row.total_documents, row.pending_approval, row.ai_queries) == (3, 0, 1)
+
+    # Written outside the API (e.g. by the Drive sync): nothing records a delta
+    await db.execute(update(Document).values(status=DocumentStatus.PENDING_APPROVAL))
+    await db.commit()
+    invalidate_document_stats()
+    recorder.record_ai_query()
+    await recorder.flush()
+
+    row = await today_row(db)
+    assert (row.total_documents, row.pending_approval, row.ai_queries) == (3, 3, 2)
+
@@ -0,0 +1,142 @@
+"""Check with EXPLAIN that the router query shapes are served by an index.
+
+Builds the queries the list endpoints and the job queue run (through the
+routers' own query helpers where they have one) against the migrated test
+database, and fails if a query reads its table without the expected index.
+Against PostgreSQL (``DATABASE_URL``) the check runs with ``enable_seqscan =
+off``: small tables get sequential scans whatever indexes exist, so it
+verifies an index *can* serve the query, not what the planner picks today.
+"""
+from datetime import datetime, timezone
+from typing import Any
+
+import pytest
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.database import engine
+from app.models.document import Department, Document, DocumentStatus, DocumentVersion
+from app.models.golden_answer import TrustLabel
+from app.models.job import Job, JobStatus
+from app.routers.documents import DOCUMENT_LIST_COLUMNS, _filter_documents
+from app.routers.golden_answers import _list_query as golden_answer_list_query
+
+PAGE = 21  # page_size + 1, as the list endpoint fetches
+CURSOR = (datetime(2026, 1, 1, tzinfo=timezone.utc), "00000000-0000-0000-0000-000000000000")
+
+
+def _document_page(
+    department: Department | None = None,
+    status: DocumentStatus | None = None,
+    after: tuple[datetime, str] | None = None,
+) -> Select:
+    query = _filter_documents(
+        select(*DOCUMENT_LIST_COLUMNS), department, status, None, engine.dialect.name
+    )
+    if after:
+        query = query.where(tuple_(Document.updated_at, Document.id) < after)
+    return query.order_by(Document.updated_at.desc(), Document.id.desc()).limit(PAGE)
+
+
+# name -> (query, any of these indexes serves it)
+CHECKS: dict[str, tuple[Select, tuple[str, ...]]] = {
+    "documents: latest": (_document_page(), ("ix_documents_updated_at_id",)),
+    "documents: next cursor page": (
+        _document_page(after=CURSOR),
+        ("ix_documents_updated_at_id",),
+    ),
+    "documents: by department": (
+        _document_page(department=Department.B2B),
+        ("ix_documents_department_updated_at",),
+    ),
+    "documents: by status": (
+        _document_page(status=DocumentStatus.PUBLISHED),
+        ("ix_documents_status_updated_at",),
+    ),
+    "documents: approval queue": (
+        _document_page(Department.B2B, DocumentStatus.PENDING_APPROVAL),
+        ("ix_documents_pending_approval",),
+    ),
+    "documents: due for review": (
+        select(Document.id)
+        .where(
+            Document.review_date.is_not(None),
+            Document.status != DocumentStatus.ARCHIVED,
+            Document.review_date < CURSOR[0],
+        )
+        .order_by(Document.review_date),
+        ("ix_documents_review_date",),
+    ),
+    "documents: by Drive file": (
+        select(Document.id).where(Document.drive_file_id.in_(["a", "b"])),
+        ("ix_documents_drive_file_id",),
+    ),
+    "document versions: of a document": (
+        select(DocumentVersion)
+        .where(DocumentVersion.document_id == CURSOR[1])
+        .order_by(DocumentVersion.version_number.desc()),
+        ("ix_document_versions_document_version",),
+    ),
+    "golden answers: most used": (
+        golden_answer_list_query(None, None, 20),
+        ("ix_golden_answers_usage_count",),
+    ),
+    "golden answers: by department": (
+        golden_answer_list_query(Department.B2B, None, 20),
+        ("ix_golden_answers_department_usage",),
+    ),
+    "golden answers: by trust label": (
+        golden_answer_list_query(None, TrustLabel.VERIFIED, 20),
+        ("ix_golden_answers_trust_label_usage",),
+    ),
+    "jobs: ready to claim": (
+        select(Job.id)
+        .where(Job.kind == "k", Job.status == JobStatus.QUEUED, Job.run_at <= CURSOR[0])
+        .order_by(Job.priority, Job.run_at)
+        .limit(10),
+        ("ix_jobs_claim",),
+    ),
+    "jobs: waiting with a dedupe key": (
+        select(Job.id).where(Job.dedupe_key == "k", Job.status == JobStatus.QUEUED),
+        ("ix_jobs_dedupe_key",),
+    ),
+}
+
+
+def _postgresql_indexes(plan: Any) -> set[str]:
+    found = set()
+    if isinstance(plan, dict):
+        if "Index Name" in plan:
+            found.add(plan["Index Name"])
+        for value in plan.values():
+            found |= _postgresql_indexes(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            found |= _postgresql_indexes(item)
+    return found
+
+
+async def _used_indexes(conn: AsyncConnection, query: Select) -> tuple[set[str], str]:
+    """Indexes in the plan of ``query``, and the plan as text."""
+    sql = str(query.compile(conn.engine, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "postgresql":
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        text = (await conn.exec_driver_sql(f"EXPLAIN {sql}")).scalars().all()
+        return _postgresql_indexes(plan), "\n".join(text)
+    rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")).all()
+    details = [row[-1] for row in rows]
+    found = {
+        detail.split(" INDEX ", 1)[1].split()[0]
+        for detail in details
+        if " INDEX " in detail
+    }
+    return found, "\n".join(details)
+
+
+@pytest.mark.parametrize("name", CHECKS)
+async def test_query_is_served_by_an_index(name: str):
+    query, indexes = CHECKS[name]
+    async with engine.connect() as conn:
+        used, plan = await _used_indexes(conn, query)
+    assert used & set(indexes), f"expected one of {indexes}; plan:\n{plan}"
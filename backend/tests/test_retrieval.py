@@ -0,0 +1,138 @@
+"""Local retrieval index tests."""
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker
+from app.models.document import Department, Document, DocumentChunk, DocumentStatus, DocumentVersion
+from app.services.retrieval import RetrievalIndex
+
+
+@pytest.fixture
+def index(tmp_path: Path) -> RetrievalIndex:
+    index = RetrievalIndex(str(tmp_path / "index"), dim=64, session_maker=async_session_maker)
+    index.load()
+    return index
+
+
+async def create_document(
+    db: AsyncSession,
+    title: str,
+    department: Department = Department.B2B,
+    status: DocumentStatus = DocumentStatus.PUBLISHED,
+) -> Document:
+    document = Document(
+        title=title,
+        department=department,
+        owner_email="owner@adg.vn",
+        status=status,
+        updated_at=datetime.now(timezone.utc),
+    )
+    db.add(document)
+    await db.commit()
+    return document
+
+
+async def extract(
+    db: AsyncSession, document: Document, texts: list[str], version_number: int = 1
+) -> list[str]:
+    """Store ``texts`` as the chunks of a new version; returns the chunk ids."""
+    version = DocumentVersion(document_id=document.id, version_number=version_number)
+    db.add(version)
+    await db.flush()
+    created_at = datetime.now(timezone.utc) + timedelta(seconds=version_number)
+    chunks = [
+        DocumentChunk(
+            version_id=version.id,
+            document_id=document.id,
+            chunk_index=i,
+            text=text,
+            char_start=0,
+            char_end=len(text),
+            created_at=created_at,
+        )
+        for i, text in enumerate(texts)
+    ]
+    db.add_all(chunks)
+    await db.commit()
+    return [chunk.id for chunk in chunks]
+
+
+def found(index: RetrievalIndex, query: str, **filters) -> set[str]:
+    return {passage.document_id for passage in index.search(query, **filters)}
+
+
+def best(index: RetrievalIndex, query: str) -> str:
+    return index.search(query, limit=1)[0].chunk_id
+
+
+async def test_refresh_indexes_new_and_re_extracted_chunks(
+    db: AsyncSession, index: RetrievalIndex
+):
+    b2b = await create_document(db, "Chiến lược B2B")
+    agents, _ = await extract(db, b2b, ["Chiến lược đại lý B2B", "Chiết khấu bán buôn"])
+    assert await index.refresh() == 2
+    assert best(index, "chiến lược đại lý") == agents
+
+    marcom = await create_document(db, "Kế hoạch truyền thông", Department.MARCOM)
+    [media] = await extract(db, marcom, ["Ngân sách truyền thông quý bốn"])
+    # Only the new document's chunks are added
+    assert await index.refresh() == 1
+    assert best(index, "ngân sách truyền thông") == media
+
+    [retail] = await extract(db, b2b, ["Kênh bán lẻ hiện đại"], version_number=2)
+    assert await index.refresh() == 1
+    assert best(index, "kênh bán lẻ") == retail
+    # The first version's chunks are no longer searched
+    assert agents not in {passage.chunk_id for passage in index.search("chiến lược đại lý")}
+    assert len(index) == 2
+
+
+async def test_search_filters_by_department_and_status(db: AsyncSession, index: RetrievalIndex):
+    published = await create_document(db, "Ngân sách B2B")
+    draft = await create_document(
+        db, "Ngân sách MARCOM", Department.MARCOM, DocumentStatus.DRAFT
+    )
+    await extract(db, published, ["Ngân sách marketing năm nay"])
+    await extract(db, draft, ["Ngân sách marketing năm sau"])
+    await index.refresh()
+
+    assert found(index, "ngân sách") == {published.id, draft.id}
+    assert found(index, "ngân sách", departments=[Department.B2B]) == {published.id}
+    assert found(index, "ngân sách", statuses=[DocumentStatus.DRAFT]) == {draft.id}
+
+    # Edited metadata is picked up by the next refresh
+    draft.status = DocumentStatus.PUBLISHED
+    draft.updated_at = datetime.now(timezone.utc) + timedelta(seconds=5)
+    await db.commit()
+    await index.refresh()
+    assert found(index, "ngân sách", statuses=[DocumentStatus.PUBLISHED]) == {
+        published.id,
+        draft.id,
+    }
+
+
+async def test_rebuild_keeps_search_results(db: AsyncSession, index: RetrievalIndex):
+    for i, department in enumerate(Department):
+        document = await create_document(db, f"Báo cáo {department.value}", department)
+        await extract(db, document, [f"Báo cáo thị trường {department.value} quý {i}"])
+        await index.refresh()
+    before = index.search("báo cáo thị trường", limit=10)
+
+    await index.refresh(rebuild=True)
+    rebuilt = index.search("báo cáo thị trường", limit=10)
+    reloaded = RetrievalIndex(str(index.path), dim=64, session_maker=async_session_maker)
+    reloaded.load()
+    # Startup maps the segments; the refresh only loads filter metadata
+    assert await reloaded.refresh() == 0
+
+    assert len(before) == len(Department)
+    for results in (rebuilt, reloaded.search("báo cáo thị trường", limit=10)):
+        assert [passage.chunk_id for passage in results] == [
+            passage.chunk_id for passage in before
+        ]
+        assert [passage.score for passage in results] == pytest.approx(
+            [passage.score for passage in before]
+        )
@@ -0,0 +1,67 @@
+"""Full-text search tests (the SQLite FTS5 side of migration 0002)."""
+import httpx
+
+
+async def create(client: httpx.AsyncClient, path: str, **fields) -> dict:
+    response = await client.post(path, json=fields)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def search_ids(client: httpx.AsyncClient, **params) -> list[str]:
+    response = await client.get("/api/search/", params=params)
+    assert response.status_code == 200, response.text
+    return [hit["id"] for hit in response.json()["items"]]
+
+
+async def test_search_ignores_accents_and_matches_prefixes(client: httpx.AsyncClient):
+    strategy = await create(
+        client,
+        "/api/documents/",
+        title="Chiến lược thương hiệu 2026",
+        description="Định vị sản phẩm cho khách hàng doanh nghiệp",
+        department="B2B",
+        owner_email="owner@adg.vn",
+    )
+    await create(
+        client,
+        "/api/documents/",
+        title="Báo cáo tài chính quý 3",
+        department="MARCOM",
+        owner_email="owner@adg.vn",
+    )
+
+    assert await search_ids(client, q="chien luoc") == [strategy["id"]]
+    assert await search_ids(client, q="CHIẾN lư") == [strategy["id"]]
+    assert await search_ids(client, q="doanh nghiep") == [strategy["id"]]
+    assert await search_ids(client, q="chien luoc", department="MARCOM") == []
+
+
+async def test_search_covers_golden_answers_and_follows_updates(client: httpx.AsyncClient):
+    answer = await create(
+        client,
+        "/api/golden-answers/",
+        question="Quy trình phê duyệt tài liệu là gì?",
+        answer="Tài liệu được trưởng phòng duyệt trước khi xuất bản.",
+        department="D2COM",
+    )
+    document = await create(
+        client,
+        "/api/documents/",
+        title="Hướng dẫn nội bộ",
+        department="D2COM",
+        owner_email="owner@adg.vn",
+    )
+
+    assert await search_ids(client, q="phe duyet", kind="golden_answer") == [answer["id"]]
+    assert await search_ids(client, q="phe duyet", kind="document") == []
+
+    response = await client.patch(
+        f"/api/documents/{document['id']}", json={"title": "Quy trình phê duyệt"}
+    )
+    assert response.status_code == 200, response.text
+    assert await search_ids(client, q="phe duyet", kind="document") == [document["id"]]
+    assert await search_ids(client, q="huong dan") == []
+
+    listed = await client.get("/api/documents/", params={"search": "phê duyệt"})
+    assert [item["id"] for item in listed.json()["items"]] == [document["id"]]
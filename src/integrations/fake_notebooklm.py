@@ -0,0 +1,271 @@
+"""Local fake NotebookLM gateway for offline development and load testing.
+
+Serves the HTTP API expected by ``AsyncNotebookLMClient`` with configurable
+latency, a simulated concurrency quota (excess requests get 429) and random
+5xx failures, using only asyncio streams.
+
+Run a server::
+
+    python -m src.integrations.fake_notebooklm serve --port 8765 --latency 1.5
+
+Load-test the client against an in-process server::
+
+    python -m src.integrations.fake_notebooklm load --requests 500 --concurrency 100
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
+
+from .notebooklm import AsyncNotebookLMClient, NotebookLMError, NotebookLMSettings
+
+_QUERY_PATH = re.compile(r"^/notebooks/([^/]+)/query$")
+_SOURCES_PATH = re.compile(r"^/notebooks/([^/]+)/sources(?:/([^/]+))?$")
+
+_REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+            429: "Too Many Requests", 503: "Service Unavailable"}
+
+
+@dataclass
+class FakeNotebook:
+    id: str
+    title: str
+    sources: dict[str, str] = field(default_factory=dict)
+    # Idempotency-Key -> source created for it
+    source_keys: dict[str, str] = field(default_factory=dict)
+
+
+class FakeNotebookLMServer:
+    """In-process HTTP server imitating the NotebookLM gateway."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.2,
+        jitter: float = 0.1,
+        quota: int = 4,
+        error_rate: float = 0.0,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.quota = quota
+        self.error_rate = error_rate
+        self.active = 0
+        self.peak_active = 0
+        self.requests = 0
+        self.rejected = 0
+        self.notebooks = {"demo": FakeNotebook(id="demo", title="ADG Marketing (fake)")}
+        self._server: asyncio.base_events.Server | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Fake NotebookLM listening on {}", self.url)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> FakeNotebookLMServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 keep-alive requests on one connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers: dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = json.loads(await reader.readexactly(length)) if length else {}
+
+                status, payload = await self._dispatch(
+                    method, path, body, headers.get("idempotency-key")
+                )
+                data = b"" if payload is None else json.dumps(payload).encode()
+                extra = "Retry-After: 1\r\n" if status == 429 else ""
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"{extra}\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(
+        self, method: str, path: str, body: dict[str, Any], idempotency_key: str | None = None
+    ) -> tuple[int, Any]:
+        self.requests += 1
+        if self.active >= self.quota:
+            self.rejected += 1
+            return 429, {"error": "quota exceeded"}
+
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            await asyncio.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+            if random.random() < self.error_rate:
+                return 503, {"error": "simulated upstream failure"}
+            return self._route(method, path, body, idempotency_key)
+        finally:
+            self.active -= 1
+
+    def _route(
+        self, method: str, path: str, body: dict[str, Any], idempotency_key: str | None = None
+    ) -> tuple[int, Any]:
+        if method == "GET" and path == "/notebooks":
+            return 200, {"notebooks": [
+                {"id": nb.id, "title": nb.title, "source_count": len(nb.sources)}
+                for nb in self.notebooks.values()
+            ]}
+
+        if method == "POST" and (match := _QUERY_PATH.match(path)):
+            notebook = self.notebooks.get(match.group(1))
+            if notebook is None:
+                return 404, {"error": "notebook not found"}
+            question = body.get("question", "")
+            source_id, title = next(iter(notebook.sources.items()), ("fake-source", "Fake.pdf"))
+            return 200, {
+                "answer": f"[fake] Trả lời cho: {question}",
+                "citations": [{"source_id": source_id, "source_title": title,
+                               "text": "Trích dẫn giả lập.", "page": 1}],
+                "suggested_queries": ["Tóm tắt chiến lược B2B"],
+            }
+
+        if match := _SOURCES_PATH.match(path):
+            notebook = self.notebooks.get(match.group(1))
+            if notebook is None:
+                return 404, {"error": "notebook not found"}
+            if method == "POST" and match.group(2) is None:
+                if idempotency_key in notebook.source_keys:
+                    return 200, {"source_id": notebook.source_keys[idempotency_key]}
+                source_id = str(uuid.uuid4())
+                notebook.sources[source_id] = body.get("title", "")
+                if idempotency_key:
+                    notebook.source_keys[idempotency_key] = source_id
+                return 200, {"source_id": source_id}
+            if method == "DELETE" and match.group(2):
+                notebook.sources.pop(match.group(2), None)
+                return 204, None
+
+        return 404, {"error": "not found"}
+
+
+async def run_load_test(
+    requests: int,
+    concurrency: int,
+    server: FakeNotebookLMServer,
+    settings: NotebookLMSettings | None = None,
+) -> dict[str, Any]:
+    """Fire ``requests`` queries, ``concurrency`` at a time, and summarise latency."""
+    settings = settings or NotebookLMSettings(api_url=server.url, default_notebook_id="demo")
+    latencies: list[float] = []
+    errors = 0
+    gate = asyncio.Semaphore(concurrency)
+
+    async with AsyncNotebookLMClient(settings) as client:
+
+        async def one(i: int) -> None:
+            nonlocal errors
+            async with gate:
+                started = time.perf_counter()
+                try:
+                    await client.query(f"Câu hỏi số {i}")
+                    latencies.append(time.perf_counter() - started)
+                except NotebookLMError:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+        return {
+            "requests": requests,
+            "succeeded": len(latencies),
+            "errors": errors,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(quantiles[49] * 1000, 1),
+            "p95_ms": round(quantiles[94] * 1000, 1),
+            "p99_ms": round(quantiles[98] * 1000, 1),
+            "client_retries": client.stats.retries,
+            "server_rejected_429": server.rejected,
+            "server_peak_concurrency": server.peak_active,
+        }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    server = FakeNotebookLMServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        quota=args.quota,
+        error_rate=args.error_rate,
+    )
+    async with server:
+        if args.command == "serve":
+            await asyncio.Event().wait()
+        else:
+            settings = NotebookLMSettings(
+                api_url=server.url,
+                default_notebook_id="demo",
+                max_concurrency=args.client_concurrency,
+            )
+            report = await run_load_test(args.requests, args.concurrency, server, settings)
+            print(json.dumps(report, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["serve", "load"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--quota", type=int, default=4)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--client-concurrency", type=int, default=4)
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+    if args.command == "load" and args.port == 8765:
+        args.port = 0
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
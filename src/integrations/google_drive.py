@@ -0,0 +1,342 @@
+"""Google Drive access for the document sync.
+
+``DriveBackend`` is the small async surface the sync engine needs: change
+feed page tokens, file metadata, folder listings and downloads.
+
+* ``GoogleDriveBackend`` wraps the blocking ``google-api-python-client``
+  calls in worker threads (one ``Resource`` per thread, since its httplib2
+  transport is not thread-safe).
+* ``FakeDriveBackend`` keeps files and a change log in memory, for offline
+  development and tests.
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import threading
+import uuid
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime
+from typing import Any, Protocol
+
+from pydantic_settings import BaseSettings
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+# Google-native formats have no binary content; download their Office export instead
+EXPORT_MIME_TYPES = {
+    "application/vnd.google-apps.document":
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.google-apps.presentation":
+        "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "application/vnd.google-apps.spreadsheet":
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# File type (extension) of downloaded content by MIME type; Google-native files
+# are typed by their export
+FILE_TYPES = {
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": "pptx",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+    "application/msword": "doc",
+    "application/vnd.ms-powerpoint": "ppt",
+    "application/vnd.ms-excel": "xls",
+    "application/pdf": "pdf",
+    "text/plain": "txt",
+    "text/markdown": "md",
+    "text/csv": "csv",
+    "image/png": "png",
+    "image/jpeg": "jpg",
+}
+
+_FILE_FIELDS = (
+    "id, name, mimeType, parents, modifiedTime, size, md5Checksum, trashed, owners(emailAddress)"
+)
+
+
+class DriveFileNotFoundError(Exception):
+    """The file was deleted or is no longer shared with us."""
+
+
+class GoogleDriveSettings(BaseSettings):
+    """Google Drive settings, read from ``DRIVE_*`` environment variables."""
+
+    archive_folder_id: str = ""
+    pending_folder_id: str = ""
+    published_folder_id: str = ""
+    credentials_path: str = "credentials.json"
+    page_size: int = 1000
+
+    model_config = {
+        "env_prefix": "DRIVE_",
+        "env_file": ".env",
+        "env_file_encoding": "utf-8",
+        "extra": "ignore",
+    }
+
+
+@dataclass(frozen=True)
+class DriveFile:
+    id: str
+    name: str
+    mime_type: str
+    parents: tuple[str, ...] = ()
+    modified_time: datetime | None = None
+    size: int | None = None
+    md5_checksum: str | None = None
+    owner_email: str | None = None
+    trashed: bool = False
+
+    @property
+    def is_folder(self) -> bool:
+        return self.mime_type == FOLDER_MIME_TYPE
+
+    @property
+    def file_type(self) -> str | None:
+        """Type of the content ``download`` returns, e.g. ``docx`` for a Google Doc.
+
+        Taken from the MIME type: file names need not have an extension, and
+        one like "Report v2.1" has a misleading one.
+        """
+        return FILE_TYPES.get(EXPORT_MIME_TYPES.get(self.mime_type, self.mime_type))
+
+
+@dataclass(frozen=True)
+class DriveChange:
+    """One entry of the Drive change feed; ``file`` is ``None`` when ``removed``."""
+
+    file_id: str
+    removed: bool = False
+    file: DriveFile | None = None
+
+
+@dataclass(frozen=True)
+class ChangePage:
+    changes: list[DriveChange]
+    next_page_token: str | None = None
+    new_start_page_token: str | None = None
+
+
+class DriveBackend(Protocol):
+    async def get_start_page_token(self) -> str: ...
+
+    async def list_changes(self, page_token: str, page_size: int) -> ChangePage: ...
+
+    async def list_folder(self, folder_id: str) -> list[DriveFile]: ...
+
+    async def get_file(self, file_id: str) -> DriveFile: ...
+
+    async def download(self, file: DriveFile) -> bytes: ...
+
+
+def _parse_file(data: dict[str, Any]) -> DriveFile:
+    modified = data.get("modifiedTime")
+    owners = data.get("owners") or []
+    return DriveFile(
+        id=data["id"],
+        name=data.get("name", ""),
+        mime_type=data.get("mimeType", ""),
+        parents=tuple(data.get("parents", ())),
+        modified_time=datetime.fromisoformat(modified.replace("Z", "+00:00")) if modified else None,
+        size=int(data["size"]) if data.get("size") is not None else None,
+        md5_checksum=data.get("md5Checksum"),
+        owner_email=owners[0].get("emailAddress") if owners else None,
+        trashed=bool(data.get("trashed", False)),
+    )
+
+
+class GoogleDriveBackend:
+    """Drive v3 API through ``google-api-python-client``, run off the event loop."""
+
+    def __init__(self, settings: GoogleDriveSettings | None = None):
+        self.settings = settings or GoogleDriveSettings()
+        self._local = threading.local()
+
+    def _service(self) -> Any:
+        service = getattr(self._local, "service", None)
+        if service is None:
+            from google.oauth2 import service_account
+            from googleapiclient.discovery import build
+
+            credentials = service_account.Credentials.from_service_account_file(
+                self.settings.credentials_path,
+                scopes=["https://www.googleapis.com/auth/drive.readonly"],
+            )
+            service = build("drive", "v3", credentials=credentials, cache_discovery=False)
+            self._local.service = service
+        return service
+
+    async def _call(self, make_request: Any) -> Any:
+        return await asyncio.to_thread(lambda: make_request(self._service()).execute())
+
+    async def get_start_page_token(self) -> str:
+        data = await self._call(
+            lambda s: s.changes().getStartPageToken(supportsAllDrives=True)
+        )
+        return str(data["startPageToken"])
+
+    async def list_changes(self, page_token: str, page_size: int) -> ChangePage:
+        data = await self._call(
+            lambda s: s.changes().list(
+                pageToken=page_token,
+                pageSize=page_size,
+                includeRemoved=True,
+                includeItemsFromAllDrives=True,
+                supportsAllDrives=True,
+                fields=f"nextPageToken, newStartPageToken, "
+                f"changes(fileId, removed, file({_FILE_FIELDS}))",
+            )
+        )
+        return ChangePage(
+            changes=[
+                DriveChange(
+                    file_id=change["fileId"],
+                    removed=change.get("removed", False),
+                    file=_parse_file(change["file"]) if change.get("file") else None,
+                )
+                for change in data.get("changes", [])
+            ],
+            next_page_token=data.get("nextPageToken"),
+            new_start_page_token=data.get("newStartPageToken"),
+        )
+
+    async def list_folder(self, folder_id: str) -> list[DriveFile]:
+        files: list[DriveFile] = []
+        page_token = None
+        while True:
+            data = await self._call(
+                lambda s, token=page_token: s.files().list(
+                    q=f"'{folder_id}' in parents and trashed = false",
+                    pageSize=self.settings.page_size,
+                    pageToken=token,
+                    includeItemsFromAllDrives=True,
+                    supportsAllDrives=True,
+                    fields=f"nextPageToken, files({_FILE_FIELDS})",
+                )
+            )
+            files.extend(_parse_file(item) for item in data.get("files", []))
+            page_token = data.get("nextPageToken")
+            if not page_token:
+                return files
+
+    async def get_file(self, file_id: str) -> DriveFile:
+        from googleapiclient.errors import HttpError
+
+        try:
+            data = await self._call(
+                lambda s: s.files().get(fileId=file_id, fields=_FILE_FIELDS, supportsAllDrives=True)
+            )
+        except HttpError as e:
+            if e.resp.status == 404:
+                raise DriveFileNotFoundError(file_id) from e
+            raise
+        return _parse_file(data)
+
+    async def download(self, file: DriveFile) -> bytes:
+        def fetch() -> bytes:
+            from googleapiclient.http import MediaIoBaseDownload
+
+            files = self._service().files()
+            export_type = EXPORT_MIME_TYPES.get(file.mime_type)
+            if export_type:
+                request = files.export_media(fileId=file.id, mimeType=export_type)
+            else:
+                request = files.get_media(fileId=file.id, supportsAllDrives=True)
+            buffer = io.BytesIO()
+            downloader = MediaIoBaseDownload(buffer, request)
+            done = False
+            while not done:
+                _, done = downloader.next_chunk()
+            return buffer.getvalue()
+
+        return await asyncio.to_thread(fetch)
+
+
+@dataclass
+class FakeDriveBackend:
+    """In-memory Drive with a change feed, for offline runs of the sync."""
+
+    latency: float = 0.0
+    files: dict[str, DriveFile] = field(default_factory=dict)
+    contents: dict[str, bytes] = field(default_factory=dict)
+    changes: list[DriveChange] = field(default_factory=list)
+    calls: int = 0
+
+    def add_folder(self, name: str, parent: str | None = None, folder_id: str | None = None) -> str:
+        return self.add_file(name, parent, mime_type=FOLDER_MIME_TYPE, file_id=folder_id)
+
+    def add_file(
+        self,
+        name: str,
+        parent: str | None = None,
+        content: bytes = b"",
+        mime_type: str = "application/pdf",
+        owner_email: str | None = "owner@adg.vn",
+        file_id: str | None = None,
+    ) -> str:
+        file = DriveFile(
+            id=file_id or uuid.uuid4().hex,
+            name=name,
+            mime_type=mime_type,
+            parents=(parent,) if parent else (),
+            modified_time=datetime.now(UTC),
+            size=None if mime_type == FOLDER_MIME_TYPE else len(content),
+            owner_email=owner_email,
+        )
+        self.contents[file.id] = content
+        self._store(file)
+        return file.id
+
+    def update_file(self, file_id: str, **changes: Any) -> None:
+        """Change metadata (``name``, ``parents`` ...) or ``content``."""
+        content = changes.pop("content", None)
+        if content is not None:
+            self.contents[file_id] = content
+            changes["size"] = len(content)
+        self._store(replace(self.files[file_id], modified_time=datetime.now(UTC), **changes))
+
+    def trash_file(self, file_id: str) -> None:
+        self.update_file(file_id, trashed=True)
+
+    def delete_file(self, file_id: str) -> None:
+        del self.files[file_id]
+        self.contents.pop(file_id, None)
+        self.changes.append(DriveChange(file_id=file_id, removed=True))
+
+    def _store(self, file: DriveFile) -> None:
+        self.files[file.id] = file
+        self.changes.append(DriveChange(file_id=file.id, file=file))
+
+    async def _roundtrip(self) -> None:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def get_start_page_token(self) -> str:
+        await self._roundtrip()
+        return str(len(self.changes))
+
+    async def list_changes(self, page_token: str, page_size: int) -> ChangePage:
+        await self._roundtrip()
+        start = int(page_token)
+        end = min(start + page_size, len(self.changes))
+        page = self.changes[start:end]
+        if end < len(self.changes):
+            return ChangePage(changes=page, next_page_token=str(end))
+        return ChangePage(changes=page, new_start_page_token=str(end))
+
+    async def list_folder(self, folder_id: str) -> list[DriveFile]:
+        await self._roundtrip()
+        return [f for f in self.files.values() if folder_id in f.parents and not f.trashed]
+
+    async def get_file(self, file_id: str) -> DriveFile:
+        await self._roundtrip()
+        try:
+            return self.files[file_id]
+        except KeyError:
+            raise DriveFileNotFoundError(file_id) from None
+
+    async def download(self, file: DriveFile) -> bytes:
+        await self._roundtrip()
+        return self.contents.get(file.id, b"")
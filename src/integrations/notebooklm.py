@@ -0,0 +1,294 @@
+"""Async NotebookLM client with a shared connection pool and bounded concurrency.
+
+All calls from one process go through a single ``httpx.AsyncClient`` (one
+keep-alive connection pool) and a single semaphore sized to the NotebookLM
+quota, so bursts of chat traffic queue locally instead of tripping upstream
+rate limits. Transient failures (connection errors, timeouts, 429 and 5xx)
+are retried with capped, fully-jittered exponential backoff. Requests that
+are not idempotent (adding a source) are only retried when the gateway cannot
+have acted on them (429, or no connection was made), unless they carry an
+``Idempotency-Key``.
+
+The client talks JSON over HTTP to a NotebookLM gateway::
+
+    GET  /notebooks                      -> {"notebooks": [{id, title, source_count}]}
+    POST /notebooks/{id}/query           -> {"answer", "citations", "suggested_queries"}
+    POST /notebooks/{id}/sources         -> {"source_id"}
+    DELETE /notebooks/{id}/sources/{sid} -> 204
+
+``src.integrations.fake_notebooklm`` serves the same API for offline testing.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from loguru import logger
+from pydantic_settings import BaseSettings
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Failures after which the request certainly never reached the gateway
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class NotebookLMSettings(BaseSettings):
+    """NotebookLM client settings, read from ``NOTEBOOKLM_*`` environment variables."""
+
+    api_url: str = "http://localhost:8765"
+    default_notebook_id: str = ""
+
+    # Concurrency: NotebookLM allows only a handful of simultaneous queries per account
+    max_concurrency: int = 4
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+
+    # Timeouts (seconds)
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+    acquire_timeout: float = 30.0
+
+    # Retries
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 10.0
+
+    model_config = {
+        "env_prefix": "NOTEBOOKLM_",
+        "env_file": ".env",
+        "env_file_encoding": "utf-8",
+        "extra": "ignore",
+    }
+
+
+class NotebookLMError(Exception):
+    """A NotebookLM call failed."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class NotebookLMBusyError(NotebookLMError):
+    """No concurrency slot became free within ``acquire_timeout``."""
+
+
+@dataclass(frozen=True)
+class Notebook:
+    id: str
+    title: str
+    source_count: int = 0
+
+
+@dataclass(frozen=True)
+class QueryResult:
+    answer: str
+    citations: list[dict[str, Any]] = field(default_factory=list)
+    suggested_queries: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ClientStats:
+    """Counters for observing the client under load."""
+
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    in_flight: int = 0
+    waiting: int = 0
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class AsyncNotebookLMClient:
+    """Pooled, concurrency-bounded async client for the NotebookLM gateway."""
+
+    def __init__(
+        self,
+        settings: NotebookLMSettings | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.settings = settings or NotebookLMSettings()
+        self.stats = ClientStats()
+        self._semaphore = asyncio.Semaphore(self.settings.max_concurrency)
+        self._http = httpx.AsyncClient(
+            base_url=self.settings.api_url,
+            transport=transport,
+            timeout=httpx.Timeout(
+                self.settings.read_timeout,
+                connect=self.settings.connect_timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=self.settings.max_connections,
+                max_keepalive_connections=self.settings.max_keepalive_connections,
+            ),
+        )
+
+    async def __aenter__(self) -> AsyncNotebookLMClient:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def list_notebooks(self) -> list[Notebook]:
+        data = await self._request("GET", "/notebooks")
+        return [
+            Notebook(id=nb["id"], title=nb.get("title", ""), source_count=nb.get("source_count", 0))
+            for nb in data.get("notebooks", [])
+        ]
+
+    async def query(
+        self,
+        question: str,
+        notebook_id: str | None = None,
+        source_ids: list[str] | None = None,
+    ) -> QueryResult:
+        # A query changes nothing upstream, so it is safe to retry
+        data = await self._request(
+            "POST",
+            f"/notebooks/{self._notebook(notebook_id)}/query",
+            idempotent=True,
+            json={"question": question, "source_ids": source_ids},
+        )
+        return QueryResult(
+            answer=data.get("answer", ""),
+            citations=data.get("citations", []),
+            suggested_queries=data.get("suggested_queries", []),
+        )
+
+    async def add_source(
+        self,
+        title: str,
+        text: str | None = None,
+        url: str | None = None,
+        notebook_id: str | None = None,
+        idempotency_key: str | None = None,
+    ) -> str:
+        """Add a source and return its id.
+
+        With an ``idempotency_key`` the gateway returns the source created by
+        an earlier request with the same key, so the call is retried freely.
+        """
+        data = await self._request(
+            "POST",
+            f"/notebooks/{self._notebook(notebook_id)}/sources",
+            idempotent=idempotency_key is not None,
+            headers={"Idempotency-Key": idempotency_key} if idempotency_key else None,
+            json={"title": title, "text": text, "url": url},
+        )
+        return str(data["source_id"])
+
+    async def delete_source(self, source_id: str, notebook_id: str | None = None) -> None:
+        await self._request(
+            "DELETE", f"/notebooks/{self._notebook(notebook_id)}/sources/{source_id}"
+        )
+
+    def _notebook(self, notebook_id: str | None) -> str:
+        notebook_id = notebook_id or self.settings.default_notebook_id
+        if not notebook_id:
+            raise NotebookLMError(
+                "No notebook id given and NOTEBOOKLM_DEFAULT_NOTEBOOK_ID is unset"
+            )
+        return notebook_id
+
+    async def _request(
+        self, method: str, path: str, idempotent: bool | None = None, **kwargs: Any
+    ) -> dict[str, Any]:
+        """Send one logical request, retrying transient failures.
+
+        ``idempotent`` defaults to what ``method`` implies. A request that is
+        not is only retried after failures that prove it was not processed.
+        """
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        self.stats.requests += 1
+        attempt = 0
+        while True:
+            try:
+                response = await self._send(method, path, **kwargs)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                error: NotebookLMError = NotebookLMError(f"{method} {path} failed: {e!r}")
+                retry_after = None
+                retryable = idempotent or isinstance(e, NOT_SENT_ERRORS)
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    if response.is_error:
+                        self.stats.failures += 1
+                        raise NotebookLMError(
+                            f"{method} {path} returned {response.status_code}",
+                            status_code=response.status_code,
+                        )
+                    return response.json() if response.content else {}
+                error = NotebookLMError(
+                    f"{method} {path} returned {response.status_code}",
+                    status_code=response.status_code,
+                )
+                retry_after = _retry_after(response)
+                # A 429 is refused before any work is done
+                retryable = idempotent or response.status_code == 429
+
+            if not retryable or attempt >= self.settings.max_retries:
+                self.stats.failures += 1
+                raise error
+
+            delay = backoff_delay(attempt, self.settings.backoff_base, self.settings.backoff_max)
+            if retry_after is not None:
+                # Honour Retry-After, but never wait longer than the backoff cap
+                delay = max(delay, min(retry_after, self.settings.backoff_max))
+            attempt += 1
+            self.stats.retries += 1
+            logger.debug("Retrying {} {} in {:.2f}s ({})", method, path, delay, error)
+            await asyncio.sleep(delay)
+
+    async def _send(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """Send one HTTP attempt while holding a concurrency slot."""
+        self.stats.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.settings.acquire_timeout)
+        except TimeoutError as e:
+            self.stats.failures += 1
+            raise NotebookLMBusyError("Timed out waiting for a NotebookLM slot") from e
+        finally:
+            self.stats.waiting -= 1
+
+        self.stats.in_flight += 1
+        try:
+            return await self._http.request(method, path, **kwargs)
+        finally:
+            self.stats.in_flight -= 1
+            self._semaphore.release()
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+_client: AsyncNotebookLMClient | None = None
+
+
+def get_client() -> AsyncNotebookLMClient:
+    """Return the process-wide client, so every caller shares one pool and semaphore."""
+    global _client
+    if _client is None:
+        _client = AsyncNotebookLMClient()
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
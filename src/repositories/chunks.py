@@ -0,0 +1,138 @@
+"""Extracted text chunks of document versions.
+
+Like ``documents``, the ``document_versions`` and ``document_chunks`` tables
+belong to the backend; only the columns the extraction pipeline touches are
+declared here.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from uuid import uuid4
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .documents import documents
+
+document_versions = sa.table(
+    "document_versions",
+    sa.column("id", UUID(as_uuid=False)),
+    sa.column("document_id", UUID(as_uuid=False)),
+    sa.column("version_number", sa.Integer()),
+    sa.column("content_hash", sa.String()),
+    sa.column("extracted_at", sa.DateTime(timezone=True)),
+)
+
+document_chunks = sa.table(
+    "document_chunks",
+    sa.column("id", UUID(as_uuid=False)),
+    sa.column("version_id", UUID(as_uuid=False)),
+    sa.column("document_id", UUID(as_uuid=False)),
+    sa.column("chunk_index", sa.Integer()),
+    sa.column("text", sa.Text()),
+    sa.column("char_start", sa.Integer()),
+    sa.column("char_end", sa.Integer()),
+)
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """One overlapping window of a document's normalized text."""
+
+    index: int
+    text: str
+    start: int
+    end: int
+
+
+def _latest_version(document_id: str) -> sa.Select:
+    return (
+        sa.select(
+            document_versions.c.id,
+            document_versions.c.version_number,
+            document_versions.c.content_hash,
+            document_versions.c.extracted_at,
+        )
+        .where(document_versions.c.document_id == document_id)
+        .order_by(document_versions.c.version_number.desc())
+        .limit(1)
+    )
+
+
+class ChunkRepository:
+    """Reads content hashes and replaces the chunks of document versions."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    async def document_id_for_drive_file(self, drive_file_id: str) -> str | None:
+        async with self.engine.connect() as conn:
+            return (await conn.execute(
+                sa.select(documents.c.id).where(documents.c.drive_file_id == drive_file_id)
+            )).scalar()
+
+    async def latest_content_hash(self, document_id: str) -> str | None:
+        """Hash of the file the latest version's chunks came from, if it was extracted."""
+        async with self.engine.connect() as conn:
+            latest = (await conn.execute(_latest_version(document_id))).first()
+        return latest.content_hash if latest and latest.extracted_at else None
+
+    async def save_chunks(
+        self, document_id: str, content_hash: str, chunks: list[Chunk]
+    ) -> str | None:
+        """Store ``chunks`` as the content of the document's latest version.
+
+        A latest version that was not extracted yet takes the chunks, unless
+        it holds a different file (uploaded in the app); otherwise content with
+        a new hash becomes a new version. Returns the version id, or ``None``
+        if the latest version was already extracted from this content.
+        """
+        async with self.engine.begin() as conn:
+            latest = (await conn.execute(_latest_version(document_id).with_for_update())).first()
+            if latest is not None and latest.content_hash == content_hash and latest.extracted_at:
+                return None
+
+            if (
+                latest is not None
+                and latest.extracted_at is None
+                and latest.content_hash in (None, content_hash)
+            ):
+                version_id = latest.id
+                await conn.execute(
+                    sa.update(document_versions)
+                    .where(document_versions.c.id == version_id)
+                    .values(content_hash=content_hash, extracted_at=sa.func.now())
+                )
+                await conn.execute(
+                    sa.delete(document_chunks).where(document_chunks.c.version_id == version_id)
+                )
+            else:
+                version_id = str(uuid4())
+                await conn.execute(
+                    sa.insert(document_versions).values(
+                        id=version_id,
+                        document_id=document_id,
+                        version_number=latest.version_number + 1 if latest else 1,
+                        content_hash=content_hash,
+                        extracted_at=sa.func.now(),
+                    )
+                )
+
+            if chunks:
+                await conn.execute(
+                    sa.insert(document_chunks),
+                    [
+                        {
+                            "id": str(uuid4()),
+                            "version_id": version_id,
+                            "document_id": document_id,
+                            "chunk_index": chunk.index,
+                            "text": chunk.text,
+                            "char_start": chunk.start,
+                            "char_end": chunk.end,
+                        }
+                        for chunk in chunks
+                    ],
+                )
+        return version_id
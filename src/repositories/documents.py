@@ -0,0 +1,151 @@
+"""Document rows written by the Drive sync.
+
+The ``documents`` table belongs to the backend (``backend/app/models``); this
+module only declares the columns it touches with lightweight ``table()``
+constructs, so ``src`` does not import the backend application. Enum
+columns store member names, as the backend's ``Enum(...)`` columns do.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any
+from uuid import uuid4
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+DEPARTMENTS = ("D2COM", "B2B", "S2B2C", "MARCOM")
+DOCUMENT_STATUSES = ("DRAFT", "PENDING_APPROVAL", "APPROVED", "PUBLISHED", "ARCHIVED")
+CLASSIFICATIONS = ("PUBLIC", "INTERNAL", "CONFIDENTIAL")
+
+documents = sa.table(
+    "documents",
+    sa.column("id", UUID(as_uuid=False)),
+    sa.column("title", sa.String()),
+    sa.column("department", sa.Enum(*DEPARTMENTS, name="department")),
+    sa.column("status", sa.Enum(*DOCUMENT_STATUSES, name="documentstatus")),
+    sa.column("classification", sa.Enum(*CLASSIFICATIONS, name="classification")),
+    sa.column("owner_email", sa.String()),
+    sa.column("drive_file_id", sa.String()),
+    sa.column("drive_folder_path", sa.String()),
+    sa.column("drive_root_folder_id", sa.String()),
+    sa.column("file_type", sa.String()),
+    sa.column("file_size_bytes", sa.Integer()),
+    sa.column("updated_at", sa.DateTime(timezone=True)),
+)
+
+# Columns the sync owns; everything else (description, classification ...) is
+# edited in the app and left alone on update. ``status`` is set on insert and
+# when the file moves to another synced root folder, otherwise the approval
+# workflow in the app owns it.
+_SYNCED_COLUMNS = (
+    "title",
+    "department",
+    "owner_email",
+    "drive_folder_path",
+    "drive_root_folder_id",
+    "file_type",
+    "file_size_bytes",
+)
+
+
+@dataclass(frozen=True)
+class DriveDocument:
+    """Metadata of one Drive file, mapped to ``documents`` columns."""
+
+    drive_file_id: str
+    title: str
+    department: str
+    status: str
+    owner_email: str
+    drive_folder_path: str | None = None
+    # The synced root (archive, pending, published) the file is under
+    drive_root_folder_id: str | None = None
+    file_type: str | None = None
+    file_size_bytes: int | None = None
+
+
+@dataclass
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+
+
+class DocumentRepository:
+    """Batch reads and writes of ``documents`` for the sync engine."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    async def upsert_drive_documents(self, rows: list[DriveDocument]) -> UpsertResult:
+        """Insert or update ``rows`` by ``drive_file_id`` in one transaction.
+
+        ``drive_file_id`` has no unique constraint, so existing rows are looked
+        up in one query, then new rows go in one executemany INSERT and changed
+        rows in one executemany UPDATE.
+        """
+        # Later changes of the same file in a batch win
+        by_file_id = {row.drive_file_id: row for row in rows}
+        if not by_file_id:
+            return UpsertResult()
+
+        async with self.engine.begin() as conn:
+            existing = dict(
+                (await conn.execute(
+                    sa.select(documents.c.drive_file_id, documents.c.id).where(
+                        documents.c.drive_file_id.in_(by_file_id)
+                    )
+                )).all()
+            )
+            inserts: list[dict[str, Any]] = []
+            updates: list[dict[str, Any]] = []
+            for file_id, row in by_file_id.items():
+                values = asdict(row)
+                document_id = existing.get(file_id)
+                if document_id is None:
+                    inserts.append({"id": str(uuid4()), "classification": "INTERNAL", **values})
+                else:
+                    updates.append({
+                        "b_id": document_id,
+                        "b_status": row.status,
+                        "b_root": row.drive_root_folder_id,
+                        **{c: values[c] for c in _SYNCED_COLUMNS},
+                    })
+
+            if inserts:
+                await conn.execute(sa.insert(documents), inserts)
+            if updates:
+                await conn.execute(
+                    sa.update(documents)
+                    .where(documents.c.id == sa.bindparam("b_id"))
+                    .values(
+                        # SET expressions see the row before the update
+                        status=sa.case(
+                            (
+                                documents.c.drive_root_folder_id
+                                == sa.bindparam("b_root", type_=sa.String()),
+                                documents.c.status,
+                            ),
+                            else_=sa.bindparam("b_status", type_=documents.c.status.type),
+                        ),
+                        updated_at=sa.func.now(),
+                    ),
+                    updates,
+                )
+        return UpsertResult(inserted=len(inserts), updated=len(updates))
+
+    async def archive_drive_documents(self, drive_file_ids: list[str]) -> int:
+        """Archive the documents of files deleted from (or moved out of) the synced folders."""
+        if not drive_file_ids:
+            return 0
+        async with self.engine.begin() as conn:
+            result = await conn.execute(
+                sa.update(documents)
+                .where(
+                    documents.c.drive_file_id.in_(drive_file_ids),
+                    documents.c.status != "ARCHIVED",
+                )
+                .values(status="ARCHIVED", updated_at=sa.func.now())
+            )
+        return result.rowcount
@@ -0,0 +1,39 @@
+"""Shared fixtures for the ``src`` services.
+
+The tables ``src`` writes to belong to the backend, so tests use a SQLite
+database built by the backend's migrations: migrated once per session, then
+copied for every test.
+"""
+import os
+import shutil
+import subprocess
+import sys
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / "backend"
+
+
+@pytest.fixture(scope="session")
+def migrated_database(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    path = tmp_path_factory.mktemp("database") / "template.db"
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{path}"},
+        check=True,
+        capture_output=True,
+    )
+    return path
+
+
+@pytest.fixture
+async def engine(migrated_database: Path, tmp_path: Path) -> AsyncIterator[AsyncEngine]:
+    path = tmp_path / "test.db"
+    shutil.copyfile(migrated_database, path)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    yield engine
+    await engine.dispose()
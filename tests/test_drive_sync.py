@@ -0,0 +1,77 @@
+"""Incremental Drive sync tests against the in-memory Drive."""
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.integrations.google_drive import FakeDriveBackend, GoogleDriveSettings
+from src.repositories.documents import DocumentRepository, documents
+from src.services.drive_sync import DriveSync, MemoryPageTokenStore
+
+
+async def synced_document(engine: AsyncEngine, drive_file_id: str) -> sa.Row:
+    async with engine.connect() as conn:
+        return (await conn.execute(
+            sa.select(
+                documents.c.status, documents.c.department, documents.c.drive_folder_path
+            ).where(documents.c.drive_file_id == drive_file_id)
+        )).one()
+
+
+async def set_status(engine: AsyncEngine, drive_file_id: str, status: str) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(
+            sa.update(documents)
+            .where(documents.c.drive_file_id == drive_file_id)
+            .values(status=status)
+        )
+
+
+def make_sync(engine: AsyncEngine) -> tuple[DriveSync, FakeDriveBackend, dict[str, str]]:
+    backend = FakeDriveBackend()
+    roots = {name: backend.add_folder(name) for name in ("archive", "pending", "published")}
+    settings = GoogleDriveSettings(
+        archive_folder_id=roots["archive"],
+        pending_folder_id=roots["pending"],
+        published_folder_id=roots["published"],
+    )
+    sync = DriveSync(backend, DocumentRepository(engine), MemoryPageTokenStore(), settings)
+    return sync, backend, roots
+
+
+async def test_moving_a_folder_resyncs_the_files_below_it(engine: AsyncEngine):
+    sync, backend, roots = make_sync(engine)
+    b2b = backend.add_folder("B2B", roots["pending"])
+    campaign = backend.add_folder("Chiến dịch", b2b)
+    nested = backend.add_folder("2026", campaign)
+    brief = backend.add_file("Brief.pdf", campaign)
+    plan = backend.add_file("Kế hoạch.pdf", nested)
+    await sync.run()
+    assert tuple(await synced_document(engine, plan)) == (
+        "PENDING_APPROVAL", "B2B", "B2B/Chiến dịch/2026"
+    )
+
+    marcom = backend.add_folder("MARCOM", roots["published"])
+    backend.update_file(campaign, parents=(marcom,), name="Chiến dịch Tết")
+    report = await sync.run()
+
+    assert report.updated == 2
+    assert tuple(await synced_document(engine, brief)) == (
+        "PUBLISHED", "MARCOM", "MARCOM/Chiến dịch Tết"
+    )
+    assert tuple(await synced_document(engine, plan)) == (
+        "PUBLISHED", "MARCOM", "MARCOM/Chiến dịch Tết/2026"
+    )
+
+
+async def test_metadata_changes_keep_the_status_set_in_the_app(engine: AsyncEngine):
+    sync, backend, roots = make_sync(engine)
+    file_id = backend.add_file("Brief.pdf", roots["pending"])
+    await sync.run()
+    await set_status(engine, file_id, "APPROVED")
+
+    backend.update_file(file_id, name="Brief v2.pdf")
+    await sync.run()
+    assert (await synced_document(engine, file_id)).status == "APPROVED"
+
+    backend.update_file(file_id, parents=(roots["published"],))
+    await sync.run()
+    assert (await synced_document(engine, file_id)).status == "PUBLISHED"
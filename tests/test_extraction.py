@@ -0,0 +1,61 @@
+"""Extraction pipeline tests."""
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from src.integrations.google_drive import DriveFile
+from src.repositories.chunks import Chunk
+from src.services.extraction import ExtractionPipeline
+
+DOCX_BODY = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    "<w:body><w:p><w:r><w:t>Kế hoạch truyền thông quý 4</w:t></w:r></w:p></w:body>"
+    "</w:document>"
+)
+
+
+def docx(body: str = DOCX_BODY) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", body)
+    return buffer.getvalue()
+
+
+class MemoryChunks:
+    """Chunk repository holding saved chunks in memory; every Drive file has a document."""
+
+    def __init__(self) -> None:
+        self.saved: dict[str, list[Chunk]] = {}
+
+    async def document_id_for_drive_file(self, drive_file_id: str) -> str:
+        return f"doc-{drive_file_id}"
+
+    async def latest_content_hash(self, document_id: str) -> None:
+        return None
+
+    async def save_chunks(self, document_id: str, content_hash: str, chunks: list[Chunk]) -> str:
+        self.saved[document_id] = chunks
+        return f"version-{document_id}"
+
+
+async def test_drive_files_are_typed_by_mime_type_not_name():
+    repository = MemoryChunks()
+    files = [
+        # Downloaded as its docx export; the name has no extension
+        DriveFile("gdoc", "Kế hoạch Q4", "application/vnd.google-apps.document"),
+        # ".1" is not a file type
+        DriveFile(
+            "word",
+            "Report v2.1",
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        ),
+        DriveFile("sheet", "Ngân sách.docx", "application/vnd.google-apps.spreadsheet"),
+    ]
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pipeline = ExtractionPipeline(repository, executor=executor)
+        for file in files:
+            await pipeline.handle_drive_file(file, docx())
+
+    assert sorted(repository.saved) == ["doc-gdoc", "doc-word"]
+    assert repository.saved["doc-gdoc"][0].text == "Kế hoạch truyền thông quý 4"
+    assert (pipeline.report.extracted, pipeline.report.unsupported) == (2, 1)
@@ -0,0 +1,102 @@
+"""Retry behaviour of the async NotebookLM client."""
+import httpx
+import pytest
+
+from src.integrations import notebooklm
+from src.integrations.fake_notebooklm import FakeNotebookLMServer
+from src.integrations.notebooklm import (
+    AsyncNotebookLMClient,
+    NotebookLMError,
+    NotebookLMSettings,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    delays: list[float] = []
+
+    async def sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr(notebooklm.asyncio, "sleep", sleep)
+    return delays
+
+
+def make_client(handler) -> AsyncNotebookLMClient:
+    settings = NotebookLMSettings(
+        api_url="http://gateway", default_notebook_id="demo", max_retries=3, backoff_max=10.0
+    )
+    return AsyncNotebookLMClient(settings, transport=httpx.MockTransport(handler))
+
+
+def failing(status_code: int, calls: list[httpx.Request], **headers: str):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(status_code, headers=headers, json={"error": "upstream"})
+
+    return handler
+
+
+async def test_add_source_is_not_retried_after_a_server_error():
+    calls: list[httpx.Request] = []
+    async with make_client(failing(503, calls)) as client:
+        with pytest.raises(NotebookLMError):
+            await client.add_source("Tài liệu", text="nội dung")
+    assert len(calls) == 1
+
+
+async def test_add_source_is_not_retried_after_a_read_timeout():
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        raise httpx.ReadTimeout("slow", request=request)
+
+    async with make_client(handler) as client:
+        with pytest.raises(NotebookLMError):
+            await client.add_source("Tài liệu", text="nội dung")
+    assert len(calls) == 1
+
+
+async def test_add_source_with_idempotency_key_is_retried_with_the_same_key():
+    calls: list[httpx.Request] = []
+    async with make_client(failing(503, calls)) as client:
+        with pytest.raises(NotebookLMError):
+            await client.add_source("Tài liệu", text="nội dung", idempotency_key="doc-1")
+    assert len(calls) == 4
+    assert {request.headers["Idempotency-Key"] for request in calls} == {"doc-1"}
+
+
+async def test_rate_limited_add_source_is_retried_with_capped_retry_after(no_sleep):
+    calls: list[httpx.Request] = []
+    async with make_client(failing(429, calls, **{"Retry-After": "3600"})) as client:
+        with pytest.raises(NotebookLMError):
+            await client.add_source("Tài liệu", text="nội dung")
+    assert len(calls) == 4
+    assert no_sleep == [10.0, 10.0, 10.0]
+
+
+async def test_query_is_retried_after_a_server_error():
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) < 3:
+            return httpx.Response(502)
+        return httpx.Response(200, json={"answer": "Trả lời"})
+
+    async with make_client(handler) as client:
+        result = await client.query("Câu hỏi?")
+    assert result.answer == "Trả lời"
+    assert len(calls) == 3
+
+
+async def test_fake_gateway_deduplicates_sources_by_idempotency_key():
+    async with FakeNotebookLMServer(latency=0, jitter=0) as server:
+        settings = NotebookLMSettings(api_url=server.url, default_notebook_id="demo")
+        async with AsyncNotebookLMClient(settings) as client:
+            first = await client.add_source("A", text="a", idempotency_key="doc-1")
+            again = await client.add_source("A", text="a", idempotency_key="doc-1")
+            other = await client.add_source("B", text="b")
+    assert first == again != other
+    assert len(server.notebooks["demo"].sources) == 2